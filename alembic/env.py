@@ -3,7 +3,7 @@ from logging.config import fileConfig
 from sqlalchemy import create_engine, pool
 
 from alembic import context
-from app.core.config import settings
+from app.core.config import get_settings
 from app.db.database import Base
 
 config = context.config
@@ -19,7 +19,7 @@ def get_sync_url() -> str:
 
     Normalizes postgres:// to postgresql:// for compatibility.
     """
-    url = settings.database_url
+    url = get_settings().database_url
     # Handle postgres:// (common in Heroku, etc.)
     if url.startswith("postgres://"):
         return url.replace("postgres://", "postgresql://", 1)
@@ -41,7 +41,18 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
-    """Run migrations in 'online' mode with sync engine."""
+    """Run migrations in 'online' mode with sync engine.
+
+    Uses the connection passed in ``config.attributes`` when called from ``run_migrations``, which
+    holds the migration lock on it and commits.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     url = get_sync_url()
     connectable = create_engine(url, poolclass=pool.NullPool)
 
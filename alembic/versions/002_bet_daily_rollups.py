@@ -0,0 +1,47 @@
+"""Daily bet rollups
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bet_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("sport_id", sa.Integer(), nullable=False),
+        sa.Column("league_id", sa.Integer(), nullable=False),
+        sa.Column("bet_type", sa.String(length=32), nullable=False),
+        sa.Column("bet_count", sa.Integer(), nullable=False),
+        sa.Column("risk", sa.Float(), nullable=False),
+        sa.Column("win_loss", sa.Float(), nullable=False),
+        sa.Column("profit_stakes", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "sport_id", "league_id", "bet_type"),
+    )
+    watermarks = op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("rolled_up_to", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # The refresher locks this row, so it has to exist before the first refresh.
+    op.bulk_insert(watermarks, [{"name": "bet_daily_rollups", "rolled_up_to": None}])
+
+
+def downgrade() -> None:
+    op.drop_table("rollup_watermarks")
+    op.drop_table("bet_daily_rollups")
@@ -0,0 +1,35 @@
+"""Balance samples
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_samples",
+        sa.Column("sampled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("available_balance", sa.Float(), nullable=False),
+        sa.Column("outstanding_transactions", sa.Float(), nullable=False),
+        sa.Column("given_credit", sa.Float(), nullable=True),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.PrimaryKeyConstraint("sampled_at"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("balance_samples")
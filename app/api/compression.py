@@ -0,0 +1,136 @@
+"""Negotiated response compression.
+
+Picks the best of zstd, brotli and gzip the client accepts. zstd and brotli need the optional
+``compression`` extra and are only offered when installed. Only complete bodies are compressed:
+streamed responses such as Server-Sent Events pass through untouched, so they are never buffered.
+"""
+
+import gzip
+from collections.abc import Callable
+from typing import cast
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.timing import span
+
+try:
+    import brotli  # pyright: ignore[reportMissingTypeStubs]
+except ImportError:  # pragma: no cover - optional "compression" extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional "compression" extra
+    zstandard = None
+
+type Encoder = Callable[[bytes], bytes]
+
+THREADPOOL_THRESHOLD = 256 * 1024
+"""Bodies at least this large are compressed off the event loop."""
+
+
+def _available_encoders() -> dict[str, Encoder]:
+    """Encoders by content coding, in order of preference when the client has no preference."""
+    encoders: dict[str, Encoder] = {}
+    if zstandard is not None:
+        zstd = zstandard
+        # A ZstdCompressor must not be used from two threads at once, and large bodies are compressed
+        # in the threadpool, so every body gets its own.
+        encoders["zstd"] = lambda body: zstd.ZstdCompressor(level=3).compress(body)
+    if brotli is not None:
+        compress_brotli = cast(Callable[..., bytes], brotli.compress)  # pyright: ignore[reportUnknownMemberType]
+        encoders["br"] = lambda body: compress_brotli(body, quality=5)
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, available: list[str]) -> str | None:
+    """Choose a content coding from an ``Accept-Encoding`` header, honouring q-values.
+
+    Ties are broken by the order of ``available``. Returns None when identity should be used.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for coding in available:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = get_settings().compression_minimum_size if minimum_size is None else minimum_size
+        self.encoders = _available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body: bytes = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            encoder = self.encoders[encoding]
+            with span("compression"):
+                if len(body) >= THREADPOOL_THRESHOLD:
+                    body = await run_in_threadpool(encoder, body)
+                else:
+                    body = encoder(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            # The compressed bytes differ from what the strong validator was computed on.
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,56 @@
+"""Per-route request metrics."""
+
+import time
+
+import requests
+from ps3838api.models.errors import BasePS3838Error
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS, count_error
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with the route template, not the raw path.
+
+    Requests that match no route share the ``unmatched`` label, so arbitrary paths cannot grow the
+    number of series. Upstream failures are counted where they happen, so unhandled exceptions only
+    count as errors here when they come from the database or the application itself.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status == 422:
+                    count_error("validation")
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except (BasePS3838Error, requests.RequestException):
+            raise
+        except SQLAlchemyError:
+            count_error("database")
+            raise
+        except Exception:
+            count_error("internal")
+            raise
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                route=getattr(route, "path", "unmatched"), method=scope["method"], status=str(status)
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes.common import as_utc, conditional_json_response
+from app.core.config import get_settings
+from app.core.security import verify_api_key
+from app.db.database import get_db
+from app.db.models import APIKey
+from app.schemas import BalanceHistoryRequest, BalanceHistoryResponse
+from app.schemas.responses import BalancePoint
+from app.services.balance_history import balance_series, is_closed_balance_range
+
+router = APIRouter()
+
+
+@router.post("/balance_history", response_model=BalanceHistoryResponse)
+async def get_balance_history(
+    request: BalanceHistoryRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    api_key: APIKey = Depends(verify_api_key),
+) -> Response:
+    """Client balance over a date range from the recorded samples, downsampled on the server.
+
+    Never calls upstream; the range only covers what the background sampler has recorded.
+    """
+    from_date, to_date = as_utc(request.from_date), as_utc(request.to_date)
+    series = await balance_series(db, from_date, to_date, request.points, request.method, request.metric)
+    response = BalanceHistoryResponse(
+        from_date=from_date,
+        to_date=to_date,
+        metric=request.metric,
+        method=request.method,
+        currency=series.currency,
+        sample_count=series.sample_count,
+        points=[
+            BalancePoint(sampled_at=sampled_at, value=value)
+            for sampled_at, value in zip(series.times, series.values)
+        ],
+    )
+    immutable = is_closed_balance_range(to_date, get_settings().balance_sample_interval)
+    return conditional_json_response(http_request, response, immutable=immutable)
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any
+
+import requests
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import BasePS3838Error
+from pydantic import BaseModel
+
+from app.api.routes.billing import build_billing_period_report
+from app.api.routes.common import (
+    account_info,
+    collect_bets,
+    fetch_client_balance,
+    fetch_leagues,
+    get_pinnacle_client,
+    json_response,
+)
+from app.core.security import verify_api_key
+from app.db.models import APIKey
+from app.schemas import BatchRequest, BatchResponse
+from app.schemas.requests import (
+    AccountInfoSubRequest,
+    BatchSubRequest,
+    BetsSubRequest,
+    BillingPeriodBetsSubRequest,
+    ClientBalanceSubRequest,
+    LeaguesSubRequest,
+)
+from app.schemas.responses import BatchResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _run_sub_request(sub_request: BatchSubRequest, client: PinnacleClient) -> BaseModel | dict[str, Any]:
+    match sub_request:
+        case BetsSubRequest():
+            return collect_bets(sub_request, client)
+        case ClientBalanceSubRequest():
+            return fetch_client_balance(client)
+        case LeaguesSubRequest():
+            return fetch_leagues(client)
+        case BillingPeriodBetsSubRequest():
+            return build_billing_period_report(sub_request, client)
+        case AccountInfoSubRequest():
+            return account_info()
+
+
+async def _execute(sub_request: BatchSubRequest, client: PinnacleClient) -> BatchResult:
+    try:
+        data = await run_in_threadpool(_run_sub_request, sub_request, client)
+    except (BasePS3838Error, requests.RequestException, ValueError) as exc:
+        logger.warning(f"Batch sub-request {sub_request.type} failed: {exc!r}")
+        return BatchResult(type=sub_request.type, ok=False, error=str(exc) or type(exc).__name__)
+    return BatchResult(type=sub_request.type, ok=True, data=data)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    request: BatchRequest,
+    client: PinnacleClient = Depends(get_pinnacle_client),
+    api_key: APIKey = Depends(verify_api_key),
+) -> Response:
+    """Run several sub-requests concurrently with a single authentication.
+
+    Each sub-request runs in its own worker thread, so the response time is that of the slowest one.
+    A failing upstream call only fails its own result.
+    """
+    results = await asyncio.gather(*(_execute(sub_request, client) for sub_request in request.requests))
+    return json_response(BatchResponse(results=list(results)))
@@ -1,15 +1,33 @@
+import asyncio
+import logging
+import threading
 from calendar import monthrange
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from functools import cache
 
-from fastapi import APIRouter, Depends
+import requests
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import BasePS3838Error
 
-from app.api.routes.common import get_bets, get_pinnacle_client
-from app.core.config import settings
+from app.api.routes.common import (
+    build_bets_response,
+    conditional_json_response,
+    get_pinnacle_client,
+    is_closed_range,
+)
+from app.core.config import get_settings
 from app.core.security import verify_api_key
 from app.db.models import APIKey
-from app.schemas import BetsRequest, BillingPeriodBetsRequest, BillingPeriodBetsResponse
+from app.schemas import BetsResponseModel, BillingPeriodBetsRequest, BillingPeriodBetsResponse
 from app.schemas.requests import BillingPeriodSelector
+from app.services.bet_store import BET_KINDS
+from app.services.bets import fetch_bets
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -70,12 +88,186 @@ def _get_billing_period_bounds(
     return previous_period_start, current_period_start - timedelta(microseconds=1)
 
 
-@router.post("/billing_period_bets", response_model=BillingPeriodBetsResponse)
-async def get_billing_period_bets(
-    request: BillingPeriodBetsRequest,
-    client: PinnacleClient = Depends(get_pinnacle_client),
-    api_key: APIKey = Depends(verify_api_key),
+def _settings_schedule() -> tuple[datetime, int, tuple[int, int, int]]:
+    access_ts = get_settings().api_gained_access
+    return access_ts, access_ts.day, (access_ts.hour, access_ts.minute, access_ts.second)
+
+
+@dataclass(frozen=True, slots=True)
+class BillingReport:
+    """A billing period report together with its serialized body."""
+
+    response: BillingPeriodBetsResponse
+    body: bytes
+    built_at: datetime
+    closed: bool
+    """Whether every bet of the period is final, so the report never changes."""
+
+
+def _merge_bets(first: BetsResponseModel, second: BetsResponseModel) -> BetsResponseModel:
+    """Validated bets of two consecutive ranges, as one response."""
+    merged = BetsResponseModel.model_construct(
+        moreAvailable=first.moreAvailable or second.moreAvailable,
+        fromRecord=0,
+        straightBets=first.straightBets + second.straightBets,
+        parlayBets=first.parlayBets + second.parlayBets,
+        teaserBets=first.teaserBets + second.teaserBets,
+        specialBets=first.specialBets + second.specialBets,
+        manualBets=first.manualBets + second.manualBets,
+    )
+    merged.pageSize = merged.toRecord = sum(len(getattr(merged, kind)) for kind in BET_KINDS)
+    return merged
+
+
+@dataclass(slots=True)
+class _PeriodBets:
+    """The settled bets of one billing period, kept once they can no longer change."""
+
+    settled_to: datetime
+    """Bets settled before this are in ``bets``."""
+    bets: BetsResponseModel = field(
+        default_factory=lambda: BetsResponseModel(moreAvailable=False, pageSize=0, fromRecord=0, toRecord=0)
+    )
+    reports: dict[datetime, BillingReport] = field(default_factory=dict[datetime, BillingReport])
+    """Latest report per period end."""
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def settle(self, client: PinnacleClient, settled_to: datetime) -> None:
+        """Add the bets settled between ``self.settled_to`` and ``settled_to``."""
+        if settled_to <= self.settled_to:
+            return
+        fetched = fetch_bets(client, self.settled_to, settled_to)
+        # A truncated range is fetched again as part of the tail until upstream returns all of it.
+        if not fetched.more_available:
+            self.bets = _merge_bets(self.bets, build_bets_response(fetched))
+            self.settled_to = settled_to
+
+
+class BillingReportStore:
+    """Reports of the billing periods of the configured schedule, precomputed in the background.
+
+    A period's bets are validated once they are final, so bringing its report up to date only fetches
+    the bets settled since. Reports of closed periods are kept as they are; the open period's report is
+    rebuilt once it is older than ``billing_report_refresh_interval``. Each period is built by one
+    caller at a time, the others wait for its report.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._periods: dict[datetime, _PeriodBets] = {}
+        self.current_period_start: datetime | None = None
+
+    def _period(self, period_start: datetime) -> _PeriodBets:
+        with self._lock:
+            period = self._periods.get(period_start)
+            if period is None:
+                period = self._periods[period_start] = _PeriodBets(settled_to=period_start)
+            return period
+
+    def report(
+        self,
+        client: PinnacleClient,
+        period_start: datetime,
+        period_end: datetime,
+        now: datetime,
+        max_age: timedelta,
+    ) -> BillingReport:
+        """The report of ``[period_start, period_end)``, rebuilt if it is open and over ``max_age``."""
+        settings = get_settings()
+        period = self._period(period_start)
+        with period.lock:
+            report = period.reports.get(period_end)
+            if report is not None and (report.closed or now - report.built_at < max_age):
+                return report
+
+            period.settle(client, min(period_end, now - settings.bet_cache_settle_lag))
+            bets = period.bets
+            if period.settled_to < period_end:
+                bets = _merge_bets(
+                    bets, build_bets_response(fetch_bets(client, period.settled_to, period_end))
+                )
+            access_ts, billing_day, _ = _settings_schedule()
+            response = BillingPeriodBetsResponse(
+                api_gained_access=access_ts,
+                billing_period_day=billing_day,
+                period_start=period_start,
+                period_end=period_end,
+                bets=bets,
+            )
+            report = BillingReport(
+                response=response,
+                body=response.model_dump_json().encode(),
+                built_at=now,
+                closed=period.settled_to >= period_end,
+            )
+            period.reports[period_end] = report
+            return report
+
+    def refresh(self, client: PinnacleClient, now: datetime | None = None) -> None:
+        """Bring the reports of the previous and current period up to date.
+
+        On rollover, the period that just closed keeps the bets collected while it was current, and
+        periods before it are dropped.
+        """
+        now = now or datetime.now(timezone.utc)
+        _, billing_day, billing_time = _settings_schedule()
+        previous = _get_billing_period_bounds("PREVIOUS", billing_day, billing_time, now)
+        current = _get_billing_period_bounds("CURRENT", billing_day, billing_time, now)
+        if current[0] != self.current_period_start:
+            if self.current_period_start is not None:
+                logger.info(f"Billing period rolled over to {current[0]}")
+            self.current_period_start = current[0]
+            with self._lock:
+                for period_start in [start for start in self._periods if start < previous[0]]:
+                    del self._periods[period_start]
+
+        self.report(client, *previous, now, max_age=timedelta(0))
+        self.report(client, *current, now, max_age=timedelta(0))
+
+
+@cache
+def get_billing_reports() -> BillingReportStore:
+    return BillingReportStore()
+
+
+async def refresh_billing_reports_periodically(
+    client_factory: Callable[[], PinnacleClient], interval: timedelta
+) -> None:
+    while True:
+        try:
+            await run_in_threadpool(get_billing_reports().refresh, client_factory())
+        except (BasePS3838Error, requests.RequestException) as exc:
+            logger.warning(f"Billing report refresh failed: {exc!r}")
+        except Exception:
+            logger.exception("Unexpected error in billing report refresh")
+        await asyncio.sleep(interval.total_seconds())
+
+
+def precomputed_billing_period_report(
+    request: BillingPeriodBetsRequest, client: PinnacleClient
+) -> BillingReport | None:
+    """The report from the BillingReportStore, for requests on the configured billing schedule."""
+    settings = get_settings()
+    if not settings.billing_reports_enabled or request.api_gained_access not in (
+        None,
+        settings.api_gained_access,
+    ):
+        return None
+    now = datetime.now(timezone.utc)
+    _, billing_day, billing_time = _settings_schedule()
+    period_start, period_end = _get_billing_period_bounds(request.period, billing_day, billing_time, now)
+    return get_billing_reports().report(
+        client, period_start, period_end, now, settings.billing_report_refresh_interval
+    )
+
+
+def build_billing_period_report(
+    request: BillingPeriodBetsRequest, client: PinnacleClient
 ) -> BillingPeriodBetsResponse:
+    precomputed = precomputed_billing_period_report(request, client)
+    if precomputed is not None:
+        return precomputed.response
+
     now = datetime.now(timezone.utc)
 
     # Use provided api_gained_access or fall back to settings.api_gained_access
@@ -85,18 +277,11 @@ async def get_billing_period_bets(
         billing_time = (access_ts.hour, access_ts.minute, access_ts.second)
     else:
         # Fallback: use settings.api_gained_access
-        access_ts = settings.api_gained_access
-        billing_day = settings.api_gained_access.day
-        billing_time = (
-            settings.api_gained_access.hour,
-            settings.api_gained_access.minute,
-            settings.api_gained_access.second,
-        )
+        access_ts, billing_day, billing_time = _settings_schedule()
 
     period_start, period_end = _get_billing_period_bounds(request.period, billing_day, billing_time, now)
 
-    bets_request = BetsRequest(from_date=period_start, to_date=period_end)
-    merged_bets = await get_bets(request=bets_request, client=client, api_key=api_key)
+    merged_bets = build_bets_response(fetch_bets(client, period_start, period_end))
 
     return BillingPeriodBetsResponse(
         api_gained_access=access_ts,
@@ -105,3 +290,19 @@ async def get_billing_period_bets(
         period_end=period_end,
         bets=merged_bets,
     )
+
+
+@router.post("/billing_period_bets", response_model=BillingPeriodBetsResponse)
+async def get_billing_period_bets(
+    request: BillingPeriodBetsRequest,
+    http_request: Request,
+    client: PinnacleClient = Depends(get_pinnacle_client),
+    api_key: APIKey = Depends(verify_api_key),
+) -> Response:
+    precomputed = await run_in_threadpool(precomputed_billing_period_report, request, client)
+    if precomputed is not None:
+        return conditional_json_response(http_request, precomputed.body, precomputed.closed)
+    report = await run_in_threadpool(build_billing_period_report, request, client)
+    # A PREVIOUS period never changes once it is over, unless upstream truncated it.
+    immutable = is_closed_range(report.period_end) and not report.bets.moreAvailable
+    return conditional_json_response(http_request, report, immutable)
@@ -1,18 +1,18 @@
+import hashlib
+from collections.abc import Buffer
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from ps3838api.api import PinnacleClient
-from ps3838api.models.bets import (
-    ManualBet,
-    ParlayBetV2,
-    RejectedBet,
-    SpecialBetV3,
-    StraightBetV3,
-    TeaserBet,
-)
+from pydantic import BaseModel
+from pydantic_core import to_json
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.core.security import verify_api_key
+from app.core.timing import span
 from app.db.models import APIKey
 from app.schemas import (
     AccountInfoResponse,
@@ -21,78 +21,166 @@ from app.schemas import (
     ClientBalanceRequest,
     ClientBalanceResponse,
 )
-from app.schemas.responses import LeaguesResponse
+from app.schemas.responses import LeaguesResponse, ReadinessCheck, ReadinessResponse
+from app.services.bet_filters import BetFilter
+from app.services.bet_store import BET_KINDS
+from app.services.bets import FetchedBets, fetch_bets
+from app.services.leagues import get_leagues_cache
+from app.services.pinnacle import get_pinnacle_client
+from app.services.readiness import get_readiness
 
 router = APIRouter()
 
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
 
-def get_pinnacle_client() -> PinnacleClient:
-    return PinnacleClient(
-        login=settings.PS3838_LOGIN,
-        password=settings.PS3838_PASSWORD,
-        api_base_url=settings.PS3838_API_BASE_URL,
+def _resolve_date_range(request: BetsRequest) -> tuple[datetime, datetime]:
+    if request.from_date is not None and request.to_date is not None:
+        return as_utc(request.from_date), as_utc(request.to_date)
+    to_date = datetime.now(timezone.utc)
+    days = request.days or 1
+    return to_date - timedelta(days=days), to_date
+
+
+def _bet_filter(request: BetsRequest) -> BetFilter:
+    return BetFilter(
+        sport_ids=request.sport_ids,
+        league_ids=request.league_ids,
+        bet_types=request.bet_types,
+        bet_statuses=request.bet_statuses,
+        min_risk=request.min_risk,
+        max_risk=request.max_risk,
+        min_win_loss=request.min_win_loss,
+        max_win_loss=request.max_win_loss,
     )
 
 
+def _bets_header(fetched: FetchedBets) -> dict[str, Any]:
+    return {
+        "moreAvailable": fetched.more_available,
+        "pageSize": fetched.total,
+        "fromRecord": 0,
+        "toRecord": fetched.total,
+    }
+
+
+def _bets_payload(fetched: FetchedBets) -> dict[str, Any]:
+    return {**_bets_header(fetched), **fetched.bets}
+
+
+def bets_json(fetched: FetchedBets) -> bytes:
+    """The bets response body for ``fetched``, without schema validation.
+
+    Decoded bets are serialized and the raw upstream ones are spliced in after them as they are.
+    """
+    parts = [to_json(_bets_header(fetched))[:-1]]
+    for kind in BET_KINDS:
+        decoded = [to_json(fetched.bets[kind])[1:-1]] if fetched.bets[kind] else []
+        items: list[Buffer] = [*decoded, *fetched.raw[kind]]
+        parts.append(b',"%s":[%s]' % (kind.encode(), b",".join(items)))
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def build_bets_response(fetched: FetchedBets) -> BetsResponseModel:
+    with span("validation"):
+        return BetsResponseModel.model_validate(_bets_payload(fetched))
+
+
+def collect_bets(request: BetsRequest, client: PinnacleClient) -> BetsResponseModel | dict[str, Any]:
+    """Run a bets query. Projected queries return a plain payload that skips schema validation."""
+    from_date, to_date = _resolve_date_range(request)
+    fetched = fetch_bets(client, from_date, to_date, _bet_filter(request), request.fields)
+    if request.fields is not None:
+        return _bets_payload(fetched)
+    return build_bets_response(fetched)
+
+
+def collect_bets_json(request: BetsRequest, client: PinnacleClient) -> tuple[bytes, bool]:
+    """Run a bets query for /get_bets, keeping the upstream bets as raw JSON all the way to the body.
+
+    Returns the body and whether it holds every matching bet, which upstream truncation can prevent.
+    """
+    from_date, to_date = _resolve_date_range(request)
+    fetched = fetch_bets(client, from_date, to_date, _bet_filter(request), request.fields, raw=True)
+    with span("serialization"):
+        return bets_json(fetched), not fetched.more_available
+
+
+def fetch_leagues(client: PinnacleClient) -> LeaguesResponse:
+    return LeaguesResponse(leagues=get_leagues_cache().get(client))
+
+
+def fetch_client_balance(client: PinnacleClient) -> ClientBalanceResponse:
+    return ClientBalanceResponse(data=client.get_client_balance())
+
+
+def account_info() -> AccountInfoResponse:
+    settings = get_settings()
+    return AccountInfoResponse(
+        account_name=settings.PS3838_LOGIN,
+        base_api_url=settings.PS3838_API_BASE_URL,
+    )
+
+
+def json_response(content: BaseModel | dict[str, Any] | bytes) -> Response:
+    if isinstance(content, bytes):
+        return Response(content=content, media_type="application/json")
+    with span("serialization"):
+        if isinstance(content, BaseModel):
+            return Response(content=content.model_dump_json(), media_type="application/json")
+        return Response(content=to_json(content), media_type="application/json")
+
+
+def is_closed_range(to_date: datetime) -> bool:
+    """Whether no bet settled before ``to_date`` can change any more."""
+    return to_date <= datetime.now(timezone.utc) - get_settings().bet_cache_settle_lag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_json_response(
+    http_request: Request, content: BaseModel | dict[str, Any] | bytes, immutable: bool = False
+) -> Response:
+    """JSON response validated by a hash of its body.
+
+    A client that already holds the same body, per ``If-None-Match``, gets an empty 304 instead.
+    Immutable responses, those for closed ranges, may be reused without revalidation.
+    """
+    response = json_response(content)
+    with span("etag"):
+        etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+    }
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
 @router.post("/get_bets", response_model=BetsResponseModel)
 async def get_bets(
     request: BetsRequest,
+    http_request: Request,
     client: PinnacleClient = Depends(get_pinnacle_client),
     api_key: APIKey = Depends(verify_api_key),
-) -> BetsResponseModel:
-    if request.from_date is not None and request.to_date is not None:
-        from_date = request.from_date
-        to_date = request.to_date
-    else:
-        to_date = datetime.now(timezone.utc)
-        days = request.days or 1
-        from_date = to_date - timedelta(days=days)
-
-    # Split requests into 29-day chunks if necessary
-    # API requires date range to be strictly less than 30 days
-    max_span = timedelta(days=29, hours=23)
-    current_date = from_date
-    straight_and_rejected_bets: list[StraightBetV3 | RejectedBet] = []
-    parlay_bets: list[ParlayBetV2] = []
-    teaser_bets: list[TeaserBet] = []
-    special_bets: list[SpecialBetV3] = []
-    manual_bets: list[ManualBet] = []
-    more_available = False
-
-    while current_date < to_date:
-        chunk_end = min(current_date + max_span, to_date)
-        chunk_bets = client.get_bets(
-            betlist="SETTLED",
-            from_date=current_date,
-            to_date=chunk_end,
-        )
-
-        more_available = more_available or chunk_bets.get("moreAvailable", False)
-        straight_and_rejected_bets.extend(chunk_bets.get("straightBets", []))
-        parlay_bets.extend(chunk_bets.get("parlayBets", []))
-        teaser_bets.extend(chunk_bets.get("teaserBets", []))
-        special_bets.extend(chunk_bets.get("specialBets", []))
-        manual_bets.extend(chunk_bets.get("manualBets", []))
-
-        current_date = chunk_end
-
-    straight_bets = [bet for bet in straight_and_rejected_bets if bet["betStatus"] != "NOT_ACCEPTED"]
-
-    total_records = (
-        len(straight_bets) + len(parlay_bets) + len(teaser_bets) + len(special_bets) + len(manual_bets)
-    )
-
-    return BetsResponseModel(
-        moreAvailable=more_available,
-        pageSize=total_records,
-        fromRecord=0,
-        toRecord=total_records,
-        straightBets=straight_bets,
-        parlayBets=parlay_bets,
-        teaserBets=teaser_bets,
-        specialBets=special_bets,
-        manualBets=manual_bets,
-    )
+) -> Response:
+    content, complete = await run_in_threadpool(collect_bets_json, request, client)
+    # A truncated result would be cached for good, so only complete closed ranges are immutable.
+    immutable = complete and request.to_date is not None and is_closed_range(as_utc(request.to_date))
+    return conditional_json_response(http_request, content, immutable)
 
 
 @router.post("/get_leagues", response_model=LeaguesResponse)
@@ -100,9 +188,7 @@ async def get_leagues(
     client: PinnacleClient = Depends(get_pinnacle_client),
     api_key: APIKey = Depends(verify_api_key),
 ) -> LeaguesResponse:
-    leagues = client.get_leagues()
-
-    return LeaguesResponse(leagues=leagues)
+    return await run_in_threadpool(fetch_leagues, client)
 
 
 @router.post("/get_client_balance", response_model=ClientBalanceResponse)
@@ -111,21 +197,38 @@ async def get_client_balance(
     client: PinnacleClient = Depends(get_pinnacle_client),
     api_key: APIKey = Depends(verify_api_key),
 ) -> ClientBalanceResponse:
-    balance = client.get_client_balance()
-
-    return ClientBalanceResponse(data=balance)
+    return await run_in_threadpool(fetch_client_balance, client)
 
 
 @router.get("/account_info", response_model=AccountInfoResponse)
 async def get_account_info(
     api_key: APIKey = Depends(verify_api_key),
 ) -> AccountInfoResponse:
-    return AccountInfoResponse(
-        account_name=settings.PS3838_LOGIN,
-        base_api_url=settings.PS3838_API_BASE_URL,
-    )
+    return account_info()
 
 
 @router.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check() -> JSONResponse:
+    """Whether this worker should get traffic: 503 while it warms up or cannot reach the database.
+
+    Answers from the results of the background checks, without touching the database or upstream.
+    """
+    readiness = get_readiness()
+    response = ReadinessResponse(
+        status=readiness.status,
+        checks={
+            name: ReadinessCheck(
+                ok=result.ok,
+                checked_at=result.checked_at,
+                duration_ms=result.duration * 1000,
+                error=result.error,
+            )
+            for name, result in readiness.checks.items()
+        },
+    )
+    return JSONResponse(response.model_dump(mode="json"), status_code=200 if readiness.ready else 503)
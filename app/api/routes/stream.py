@@ -0,0 +1,41 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.config import get_settings
+from app.core.security import verify_api_key_once
+from app.db.models import APIKey
+from app.services.settlement_feed import get_settlement_feed
+
+router = APIRouter()
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+@router.get("/stream/settlements")
+async def stream_settlements(api_key: APIKey = Depends(verify_api_key_once)) -> StreamingResponse:
+    """Server-Sent Events stream of newly settled bets (`bet`) and balance changes (`balance`).
+
+    A `lagged` event reports how many events were dropped because the client read too slowly.
+    """
+    feed = get_settlement_feed()
+    heartbeat = get_settings().feed_heartbeat_interval.total_seconds()
+
+    async def events() -> AsyncIterator[bytes]:
+        async with feed.subscribe() as subscription:
+            yield KEEPALIVE
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                yield event.encode()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
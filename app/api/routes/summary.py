@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Request, Response
+from ps3838api.api import PinnacleClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes.common import as_utc, conditional_json_response
+from app.core.security import verify_api_key
+from app.db.database import get_db
+from app.db.models import APIKey
+from app.schemas import BetsSummaryRequest, BetsSummaryResponse
+from app.schemas.responses import BetsSummaryGroup
+from app.services.bet_filters import BetFilter
+from app.services.pinnacle import get_pinnacle_client
+from app.services.rollups import Totals, summarize_bets
+
+router = APIRouter()
+
+
+def _summary_group(totals: Totals, **dimensions: object) -> BetsSummaryGroup:
+    return BetsSummaryGroup.model_validate(
+        {
+            **dimensions,
+            "bet_count": totals.bet_count,
+            "risk": totals.risk,
+            "win_loss": totals.win_loss,
+            "profit_stakes": totals.profit_stakes,
+        }
+    )
+
+
+@router.post("/bets_summary", response_model=BetsSummaryResponse)
+async def get_bets_summary(
+    request: BetsSummaryRequest,
+    http_request: Request,
+    client: PinnacleClient = Depends(get_pinnacle_client),
+    db: AsyncSession = Depends(get_db),
+    api_key: APIKey = Depends(verify_api_key),
+) -> Response:
+    """Totals of the settled bets in a date range, optionally broken down by day, sport, league or type.
+
+    Whole days that are already rolled up are read from the daily rollups; only the partial days at
+    the edges and the most recent days are aggregated from raw bets.
+    """
+    from_date, to_date = as_utc(request.from_date), as_utc(request.to_date)
+    bet_filter = BetFilter(
+        sport_ids=request.sport_ids, league_ids=request.league_ids, bet_types=request.bet_types
+    )
+    summary = await summarize_bets(db, client, from_date, to_date, request.group_by, bet_filter)
+    field_names = {"day": "day", "sport": "sport_id", "league": "league_id", "bet_type": "bet_type"}
+    response = BetsSummaryResponse(
+        from_date=from_date,
+        to_date=to_date,
+        rolled_up_to=summary.rolled_up_to,
+        total=_summary_group(summary.total),
+        groups=[
+            _summary_group(
+                totals, **{field_names[dimension]: value for dimension, value in zip(request.group_by, key)}
+            )
+            for key, totals in sorted(summary.groups.items())
+        ],
+    )
+    return conditional_json_response(http_request, response)
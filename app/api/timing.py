@@ -0,0 +1,121 @@
+"""Request timing: the ``Server-Timing`` header and the opt-in sampling profiler."""
+
+import logging
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.profiler import SamplingProfiler
+from app.core.timing import start_request_timings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+_sampling = threading.Lock()
+"""Held while a sampled profile runs, so a process profiles at most one sampled request at a time."""
+
+
+class ServerTimingMiddleware:
+    """Reports the spans recorded while handling a request, and the total, in ``Server-Timing``."""
+
+    def __init__(self, app: ASGIApp, enabled: bool | None = None) -> None:
+        self.app = app
+        self.enabled = get_settings().server_timing_enabled if enabled is None else enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request_timings()
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header(total=time.perf_counter() - started))
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+class ProfilerMiddleware:
+    """Profiles requests carrying the admin ``X-Profile`` token, and a random sample of the others.
+
+    Requested profiles are always written and named in the ``X-Profile-File`` response header; sampled
+    ones only when the request took at least the slow threshold, and at most one at a time per process.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str | None = None,
+        sample_rate: float | None = None,
+        slow_threshold: float | None = None,
+        output_dir: Path | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.app = app
+        self.token = token if token is not None else settings.profiler_token
+        self.sample_rate = sample_rate if sample_rate is not None else settings.profiler_sample_rate
+        self.slow_threshold = (
+            slow_threshold if slow_threshold is not None else settings.profiler_slow_threshold.total_seconds()
+        )
+        self.output_dir = output_dir if output_dir is not None else settings.profiler_output_dir
+
+    def _requested(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        provided = Headers(scope=scope).get(PROFILE_HEADER)
+        return provided is not None and secrets.compare_digest(provided.encode(), self.token.encode())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        sampled = (
+            not requested
+            and self.sample_rate > 0
+            and random.random() < self.sample_rate
+            and _sampling.acquire(blocking=False)
+        )
+        if not requested and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        slug = scope["path"].strip("/").replace("/", "_") or "root"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"{stamp}-{scope['method']}-{slug}-{secrets.token_hex(4)}.folded"
+
+        async def send_with_profile_name(message: Message) -> None:
+            if message["type"] == "http.response.start" and requested:
+                MutableHeaders(scope=message).append("X-Profile-File", name)
+            await send(message)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_name)
+        finally:
+            elapsed = time.perf_counter() - started
+            try:
+                await run_in_threadpool(profiler.stop)
+                if requested or elapsed >= self.slow_threshold:
+                    await run_in_threadpool(profiler.write, self.output_dir / name)
+                    logger.info(
+                        f"Wrote profile of {scope['method']} {scope['path']} ({elapsed:.3f}s) to {name}"
+                    )
+            finally:
+                if sampled:
+                    _sampling.release()
@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import cache
+from pathlib import Path
 from warnings import deprecated
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,6 +13,75 @@ class Settings(BaseSettings):
     PS3838_API_BASE_URL: str | None = None
     api_gained_access: datetime
     """Timestamp when we receive API access."""
+    db_pool_size: int = 5
+    """Connections kept open in the async engine's pool."""
+    db_max_overflow: int = 10
+    """Connections opened beyond ``db_pool_size`` under load and closed once returned."""
+    db_pool_timeout: timedelta = timedelta(seconds=30)
+    """How long a request waits for a pooled connection before failing."""
+    db_pool_recycle: timedelta | None = timedelta(minutes=30)
+    """Connections older than this are replaced, before the server or a proxy drops them."""
+    db_pool_pre_ping: bool = True
+    """Check a connection is alive before handing it out, recovering from database restarts."""
+    migrate_on_startup: bool = True
+    """Upgrade an outdated database on startup. When disabled, startup fails until the one-shot
+    ``python -m app.db.migration`` step has run."""
+    api_key_cache_ttl: timedelta = timedelta(minutes=1)
+    """How long a verified API key is trusted without asking the database; a deactivated key keeps
+    working that long. Zero disables the cache."""
+    upstream_pool_size: int = 40
+    """Upstream connections kept open by the shared client. Upstream calls, including every ``/batch``
+    sub-request, run on the 40 threads of the default threadpool, so fewer makes them reconnect."""
+    leagues_cache_ttl: timedelta = timedelta(hours=1)
+    """How long the league list is served from memory."""
+    readiness_check_interval: timedelta = timedelta(seconds=30)
+    """How often the database and upstream checks behind ``/ready`` run."""
+    warmup_bet_days: int = 7
+    """Days of recent bets loaded into the bet history cache on startup, when there is no snapshot to
+    start from; 0 skips it."""
+    bet_cache_enabled: bool = True
+    """Keep settled bet history in memory and only fetch uncovered ranges from upstream."""
+    bet_cache_settle_lag: timedelta = timedelta(hours=1)
+    """Bets settled more recently than this are always fetched live and never cached."""
+    bet_cache_snapshot_path: Path | None = None
+    """File the bet history cache is saved to and mapped from on startup; snapshots are off when unset."""
+    bet_cache_snapshot_interval: timedelta = timedelta(minutes=15)
+    """How often bets added to the cache are written to the snapshot."""
+    feed_poll_interval: timedelta = timedelta(seconds=30)
+    """How often the settlement feed polls upstream while anybody is subscribed."""
+    feed_lookback: timedelta = timedelta(hours=1)
+    """Settlement window requested on each feed poll; must exceed the upstream settlement delay."""
+    feed_buffer_size: int = 256
+    """Events buffered per feed subscriber before the oldest are dropped."""
+    feed_heartbeat_interval: timedelta = timedelta(seconds=15)
+    """Idle time after which a keep-alive comment is sent on an event stream."""
+    compression_minimum_size: int = 1024
+    """Responses smaller than this many bytes are sent uncompressed."""
+    server_timing_enabled: bool = True
+    """Report where the time of each request went in a ``Server-Timing`` response header."""
+    profiler_token: str | None = None
+    """Requests with this ``X-Profile`` header value are profiled; on-demand profiling is off when unset."""
+    profiler_sample_rate: float = 0.0
+    """Fraction of all requests to profile; only the slow ones are kept."""
+    profiler_slow_threshold: timedelta = timedelta(seconds=1)
+    """Sampled requests faster than this are not written out."""
+    profiler_output_dir: Path = Path("profiles")
+    """Where profiles are written, in the folded stack format flamegraph tools read."""
+    balance_sampling_enabled: bool = True
+    """Record the client balance in the background for ``/balance_history``."""
+    balance_sample_interval: timedelta = timedelta(minutes=5)
+    """Time between two balance samples."""
+    rollups_enabled: bool = True
+    """Keep the daily bet rollups up to date in the background."""
+    rollup_refresh_interval: timedelta = timedelta(hours=1)
+    """How often newly closed days are rolled up."""
+    rollup_start: datetime | None = None
+    """First day to roll up. Defaults to the day API access was gained."""
+    billing_reports_enabled: bool = True
+    """Precompute the reports of the current and previous billing period in the background."""
+    billing_report_refresh_interval: timedelta = timedelta(minutes=1)
+    """How often the open billing period's report is brought up to date; reads serve it until it is
+    this old."""
 
     @property
     @deprecated("Use `settings.api_gained_access.day`")
@@ -20,4 +91,7 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
-settings = Settings()  # type: ignore[call-arg]
+@cache
+def get_settings() -> Settings:
+    """Settings parsed from the environment on first use."""
+    return Settings()  # type: ignore[call-arg]
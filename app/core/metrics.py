@@ -0,0 +1,117 @@
+"""Prometheus metrics.
+
+Metrics are plain in-process counters. When several workers serve the application, set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory shared by them before they start: every worker then
+keeps its values in memory-mapped files there, and ``/metrics`` aggregates all of them.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Literal
+
+import requests
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from ps3838api.models.errors import AccessBlockedError, BasePS3838Error
+
+type ErrorCause = Literal[
+    "upstream_network",
+    "upstream_blocked",
+    "upstream_api",
+    "auth_rejected",
+    "validation",
+    "database",
+    "internal",
+]
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to respond to an HTTP request, by route template.",
+    ["route", "method", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served.", multiprocess_mode="livesum"
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Time of a Pinnacle API call, by endpoint.",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+UPSTREAM_REQUESTS_IN_PROGRESS = Gauge(
+    "upstream_requests_in_progress", "Pinnacle API calls in flight.", multiprocess_mode="livesum"
+)
+BET_FETCH_CHUNKS = Histogram(
+    "bet_fetch_chunks",
+    "Upstream get_bets calls needed to answer one bets query.",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50),
+)
+BET_FETCH_BETS = Histogram(
+    "bet_fetch_bets",
+    "Bets returned by one bets query.",
+    buckets=(0, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+BET_CACHE_LOOKUPS = Counter(
+    "bet_cache_lookups",
+    "Bet history cache lookups; a miss has at least one range to fetch from upstream.",
+    ["result"],
+)
+API_KEY_VERIFY_DURATION = Histogram(
+    "api_key_verify_duration_seconds",
+    "Time spent looking up an API key in the database.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+ERRORS = Counter("errors", "Errors by cause.", ["cause"])
+
+
+def count_error(cause: ErrorCause) -> None:
+    ERRORS.labels(cause=cause).inc()
+
+
+@contextmanager
+def track_upstream(endpoint: str) -> Iterator[None]:
+    """Time a Pinnacle API call and count its failure by cause."""
+    UPSTREAM_REQUESTS_IN_PROGRESS.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except requests.RequestException:
+        count_error("upstream_network")
+        raise
+    except AccessBlockedError:
+        count_error("upstream_blocked")
+        raise
+    except BasePS3838Error:
+        count_error("upstream_api")
+        raise
+    finally:
+        UPSTREAM_REQUEST_DURATION.labels(endpoint=endpoint).observe(time.perf_counter() - started)
+        UPSTREAM_REQUESTS_IN_PROGRESS.dec()
+
+
+def _multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Metrics in the Prometheus text format, aggregated over all workers in multiprocess mode."""
+    if _multiprocess_dir() is None:
+        return generate_latest(), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the aggregate when it exits."""
+    if _multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(os.getpid())  # pyright: ignore[reportUnknownMemberType]
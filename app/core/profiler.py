@@ -0,0 +1,66 @@
+"""Minimal sampling profiler producing collapsed stacks.
+
+The output is the "folded" format read by ``flamegraph.pl``, speedscope and most flamegraph tools:
+one line per distinct stack, frames separated by ``;`` from the thread down to the leaf, followed by
+the number of samples. Every thread of the process is sampled, except while it is idle waiting for
+work, so concurrent requests can show up in a profile too.
+"""
+
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+_IDLE_LEAVES = frozenset({("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")})
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    @property
+    def samples(self) -> int:
+        return self._stacks.total()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.sample()
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():  # pyright: ignore[reportPrivateUsage]
+            if thread_id == self._thread.ident:
+                continue
+            code = frame.f_code
+            if (Path(code.co_filename).name, code.co_name) in _IDLE_LEAVES:
+                continue
+            stack: list[str] = []
+            current: FrameType | None = frame
+            while current is not None:
+                stack.append(_frame_label(current))
+                current = current.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+            self._stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded())
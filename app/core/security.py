@@ -1,20 +1,92 @@
+import time
+from datetime import timedelta
+from functools import cache
+
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.core.config import get_settings
+from app.core.metrics import API_KEY_VERIFY_DURATION, count_error
+from app.core.timing import span
+from app.db.database import get_db, get_session_maker
 from app.db.models import APIKey
 
 
+class APIKeyCache:
+    """Active API keys verified recently, so most requests skip the database.
+
+    A deactivated key keeps working for at most ``ttl`` on the workers that verified it before. Only
+    used from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, ttl: timedelta) -> None:
+        self.ttl = ttl.total_seconds()
+        self._keys: dict[str, tuple[APIKey, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, key: str) -> APIKey | None:
+        entry = self._keys.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._keys[key]
+            return None
+        return entry[0]
+
+    def add(self, api_key: APIKey) -> None:
+        if self.ttl > 0:
+            self._keys[api_key.key] = (api_key, time.monotonic() + self.ttl)
+
+
+@cache
+def get_api_key_cache() -> APIKeyCache:
+    return APIKeyCache(get_settings().api_key_cache_ttl)
+
+
+async def warm_api_key_cache() -> int:
+    """Load every active key into the cache, returning how many there are."""
+    api_key_cache = get_api_key_cache()
+    async with get_session_maker()() as db:
+        api_keys = (await db.scalars(select(APIKey).where(APIKey.is_active == True))).all()  # noqa: E712
+    for api_key in api_keys:
+        api_key_cache.add(api_key)
+    return len(api_keys)
+
+
 async def verify_api_key(
     x_api_key: str = Header(..., description="API key for authentication"),
     db: AsyncSession = Depends(get_db),
 ) -> APIKey:
-    result = await db.execute(select(APIKey).where(APIKey.key == x_api_key, APIKey.is_active == True))  # noqa: E712
-    db_key = result.scalar_one_or_none()
+    with span("auth"):
+        api_key_cache = get_api_key_cache()
+        db_key = api_key_cache.get(x_api_key)
+        if db_key is None:
+            with API_KEY_VERIFY_DURATION.time():
+                result = await db.execute(
+                    select(APIKey).where(APIKey.key == x_api_key, APIKey.is_active == True)  # noqa: E712
+                )
+            db_key = result.scalar_one_or_none()
+            if db_key is not None:
+                api_key_cache.add(db_key)
     if not db_key:
+        count_error("auth_rejected")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or inactive API key",
         )
     return db_key
+
+
+async def verify_api_key_once(
+    x_api_key: str = Header(..., description="API key for authentication"),
+) -> APIKey:
+    """Verify the API key with a session that is closed right away.
+
+    For long-lived streaming responses, which would otherwise hold a pooled connection open for as
+    long as the client stays connected.
+    """
+    async with get_session_maker()() as db:
+        return await verify_api_key(x_api_key, db)
@@ -0,0 +1,67 @@
+"""Per-request timing spans, reported in the ``Server-Timing`` response header.
+
+Spans are collected in a context variable, so they are recorded from anywhere a request's work runs,
+including the worker threads of ``run_in_threadpool``, without passing anything around. Spans with
+the same name add up, e.g. one ``upstream`` span covers every chunk fetched for a request.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+type SpanName = str
+
+
+class RequestTimings:
+    __slots__ = ("_lock", "_spans")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: dict[SpanName, tuple[float, int]] = {}
+
+    def record(self, name: SpanName, seconds: float) -> None:
+        # Sub-requests of a batch record concurrently from several threads.
+        with self._lock:
+            total, count = self._spans.get(name, (0.0, 0))
+            self._spans[name] = (total + seconds, count + 1)
+
+    def spans(self) -> dict[SpanName, tuple[float, int]]:
+        with self._lock:
+            return dict(self._spans)
+
+    def header(self, total: float | None = None) -> str:
+        """``Server-Timing`` value with durations in milliseconds; repeated spans note their count."""
+        metrics: list[str] = []
+        for name, (seconds, count) in self.spans().items():
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                metric += f';desc="{count}x"'
+            metrics.append(metric)
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+@contextmanager
+def span(name: SpanName) -> Iterator[None]:
+    """Add the time spent in the block to the current request's ``name`` span, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(name, time.perf_counter() - started)
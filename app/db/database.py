@@ -1,37 +1,68 @@
 from collections.abc import AsyncGenerator
+from functools import cache
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-from app.core.config import settings
+from app.core.config import get_settings
 
 
 def normalize_database_url(url: str, async_driver: bool = True) -> str:
     """Normalize database URL.
 
     Handles both postgres:// and postgresql:// prefixes.
-    If async_driver is True, uses asyncpg driver.
+    If async_driver is True, uses asyncpg driver (aiosqlite for SQLite).
     """
     if url.startswith("postgres://"):
         base_url = url.replace("postgres://", "postgresql://", 1)
     else:
         base_url = url
 
+    if async_driver and base_url.startswith("sqlite://"):
+        return base_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
     if async_driver and "+asyncpg" not in base_url:
         return base_url.replace("postgresql://", "postgresql+asyncpg://", 1)
     return base_url
 
 
-# Async engine and session for FastAPI
-ASYNC_DATABASE_URL = normalize_database_url(settings.database_url, async_driver=True)
-engine = create_async_engine(ASYNC_DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Engines are created on first use, so importing the application loads neither database driver, and
+# processes that only need one of them (the API, the CLI tools) never load the other.
 
-# Sync engine and session for CLI tools (alembic, manage_api_keys, etc.)
-SYNC_DATABASE_URL = normalize_database_url(settings.database_url, async_driver=False)
-sync_engine = create_engine(SYNC_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+@cache
+def get_engine() -> AsyncEngine:
+    """Async engine for FastAPI."""
+    settings = get_settings()
+    url = normalize_database_url(settings.database_url, async_driver=True)
+    if url.startswith("sqlite"):
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout.total_seconds(),
+        pool_recycle=int(settings.db_pool_recycle.total_seconds()) if settings.db_pool_recycle else -1,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+@cache
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+@cache
+def get_sync_engine() -> Engine:
+    """Sync engine for CLI tools (alembic, manage_api_keys, etc.)."""
+    return create_engine(
+        normalize_database_url(get_settings().database_url, async_driver=False), pool_pre_ping=True
+    )
+
+
+@cache
+def get_sync_session_maker() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
 
 
 class Base(DeclarativeBase):
@@ -39,5 +70,5 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
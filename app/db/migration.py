@@ -1,33 +1,97 @@
+import asyncio
 import logging
 from pathlib import Path
 
-from alembic.config import Config
+from sqlalchemy import Connection, Engine, inspect, text
 
-from alembic import command
+from app.core.config import get_settings
+from app.db.database import get_engine, get_sync_engine
 
 logger = logging.getLogger(__name__)
 
+HEAD_REVISION = "003"
+"""Latest revision in ``alembic/versions``. Bump it with every new migration."""
 
-def run_migrations() -> None:
+MIGRATION_LOCK_ID = 0x70696E6E
+"""Postgres advisory lock key held while migrating, so only one process upgrades at a time."""
+
+
+def current_revision(connection: Connection) -> str | None:
+    """The revision the database is at, or None when it was never migrated."""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def run_migrations(db_engine: Engine | None = None) -> None:
     """Run Alembic migrations to upgrade the database to the latest version.
 
     This function will:
     - Initialize all tables if the database is empty
     - Apply pending migrations if the database already exists
+
+    On Postgres the upgrade holds an advisory lock, so processes starting together wait for the first
+    one instead of racing it, and find the database already upgraded once they get the lock.
     """
+    # Alembic is only needed when there is something to upgrade.
+    from alembic.config import Config
+
+    from alembic import command
+
     try:
         # Get the project root directory (parent of app/)
         project_root = Path(__file__).parent.parent.parent
         alembic_ini_path = project_root / "alembic.ini"
 
-        # Create Alembic config
-        alembic_cfg = Config(str(alembic_ini_path))
+        with (db_engine or get_sync_engine()).connect() as connection:
+            locked = connection.dialect.name == "postgresql"
+            if locked:
+                connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+            try:
+                if current_revision(connection) == HEAD_REVISION:
+                    logger.info("Database is already at the latest revision")
+                    return
 
-        # Run migrations to the latest version
-        logger.info("Running database migrations...")
-        command.upgrade(alembic_cfg, "head")
-        logger.info("Database migrations completed successfully")
+                # Create Alembic config, sharing the locked connection with env.py
+                alembic_cfg = Config(str(alembic_ini_path))
+                alembic_cfg.attributes["connection"] = connection
+
+                # Run migrations to the latest version
+                logger.info("Running database migrations...")
+                command.upgrade(alembic_cfg, "head")
+                connection.commit()
+                logger.info("Database migrations completed successfully")
+            finally:
+                if locked:
+                    connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                    connection.commit()
 
     except Exception as e:
         logger.error(f"Failed to run database migrations: {e}")
         raise
+
+
+async def ensure_database_schema() -> None:
+    """Make sure the database is at the latest revision before serving requests.
+
+    The check is a single query, so restarts and new workers skip Alembic entirely. When the
+    database is behind, it is upgraded, or, with ``migrate_on_startup`` disabled, startup fails and
+    the upgrade is left to the one-shot ``python -m app.db.migration`` step.
+    """
+    async with get_engine().connect() as connection:
+        revision = await connection.run_sync(current_revision)
+    if revision == HEAD_REVISION:
+        logger.info(f"Database schema is up to date (revision {revision})")
+        return
+    if not get_settings().migrate_on_startup:
+        raise RuntimeError(
+            f"Database is at revision {revision}, expected {HEAD_REVISION}. "
+            "Run `python -m app.db.migration` before starting the application."
+        )
+    await asyncio.to_thread(run_migrations)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
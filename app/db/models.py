@@ -1,6 +1,6 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.database import Base
@@ -15,3 +15,42 @@ class APIKey(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
     )
+
+
+class BetDailyRollup(Base):
+    """Totals of the bets settled on one UTC day, per sport, league and bet type.
+
+    Bets without a sport or league (parlays, teasers, ...) are rolled up under id 0.
+    """
+
+    __tablename__ = "bet_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    sport_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    league_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bet_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    bet_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    risk: Mapped[float] = mapped_column(Float, nullable=False)
+    win_loss: Mapped[float] = mapped_column(Float, nullable=False)
+    profit_stakes: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class RollupWatermark(Base):
+    """How far a rollup table has been computed; everything before ``rolled_up_to`` is final."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    rolled_up_to: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class BalanceSample(Base):
+    """Client balance as sampled at the start of one sampling interval."""
+
+    __tablename__ = "balance_samples"
+
+    sampled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    available_balance: Mapped[float] = mapped_column(Float, nullable=False)
+    outstanding_transactions: Mapped[float] = mapped_column(Float, nullable=False)
+    given_credit: Mapped[float | None] = mapped_column(Float, nullable=True)
+    currency: Mapped[str] = mapped_column(String(8), nullable=False)
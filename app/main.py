@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
@@ -5,8 +6,21 @@ from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import billing, common
-from app.db.migration import run_migrations
+from app.api.compression import CompressionMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.api.routes import balance, batch, billing, common, metrics, stream, summary
+from app.api.routes.billing import refresh_billing_reports_periodically
+from app.api.timing import ProfilerMiddleware, ServerTimingMiddleware
+from app.core.config import get_settings
+from app.core.metrics import mark_process_dead
+from app.db.database import get_engine
+from app.db.migration import ensure_database_schema
+from app.services.balance_history import sample_balance_periodically
+from app.services.bet_cache import save_bet_snapshots_periodically
+from app.services.pinnacle import get_pinnacle_client
+from app.services.readiness import check_readiness_periodically, get_readiness
+from app.services.rollups import refresh_rollups_periodically
+from app.services.settlement_feed import get_settlement_feed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,15 +29,57 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan handler - runs on startup and shutdown."""
-    # Startup: Run database migrations
-    logger.info("Application startup: Running database migrations...")
-    run_migrations()
-    logger.info("Database migrations completed")
+    # Startup: Make sure the database schema is up to date
+    logger.info("Application startup: Checking database schema...")
+    await ensure_database_schema()
+
+    settings = get_settings()
+    # Warming up runs in the background: /health answers right away, /ready once it is done.
+    background_tasks = [
+        asyncio.create_task(
+            check_readiness_periodically(
+                get_readiness(), get_pinnacle_client, settings.readiness_check_interval
+            )
+        )
+    ]
+    if settings.bet_cache_enabled and settings.bet_cache_snapshot_path is not None:
+        background_tasks.append(
+            asyncio.create_task(
+                save_bet_snapshots_periodically(
+                    settings.bet_cache_snapshot_path, settings.bet_cache_snapshot_interval
+                )
+            )
+        )
+    if settings.rollups_enabled:
+        background_tasks.append(
+            asyncio.create_task(
+                refresh_rollups_periodically(get_pinnacle_client, settings.rollup_refresh_interval)
+            )
+        )
+    if settings.billing_reports_enabled:
+        background_tasks.append(
+            asyncio.create_task(
+                refresh_billing_reports_periodically(
+                    get_pinnacle_client, settings.billing_report_refresh_interval
+                )
+            )
+        )
+    if settings.balance_sampling_enabled:
+        background_tasks.append(
+            asyncio.create_task(
+                sample_balance_periodically(get_pinnacle_client, settings.balance_sample_interval)
+            )
+        )
 
     yield
 
-    # Shutdown (if needed in the future)
     logger.info("Application shutdown")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await get_settlement_feed().close()
+    await get_engine().dispose()
+    mark_process_dead()
 
 
 app = FastAPI(
@@ -39,7 +95,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
 app.include_router(common.router)
 app.include_router(billing.router)
+app.include_router(batch.router)
+app.include_router(stream.router)
+app.include_router(summary.router)
+app.include_router(balance.router)
+app.include_router(metrics.router)
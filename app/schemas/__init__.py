@@ -1,17 +1,33 @@
-from app.schemas.requests import BetsRequest, BillingPeriodBetsRequest, ClientBalanceRequest
+from app.schemas.requests import (
+    BalanceHistoryRequest,
+    BatchRequest,
+    BetsRequest,
+    BetsSummaryRequest,
+    BillingPeriodBetsRequest,
+    ClientBalanceRequest,
+)
 from app.schemas.responses import (
     AccountInfoResponse,
+    BalanceHistoryResponse,
+    BatchResponse,
     BetsResponseModel,
+    BetsSummaryResponse,
     BillingPeriodBetsResponse,
     ClientBalanceResponse,
 )
 
 __all__ = [
+    "BalanceHistoryRequest",
+    "BalanceHistoryResponse",
+    "BatchRequest",
+    "BatchResponse",
     "BetsRequest",
+    "BetsSummaryRequest",
     "BillingPeriodBetsRequest",
     "ClientBalanceRequest",
     "BillingPeriodBetsResponse",
     "BetsResponseModel",
+    "BetsSummaryResponse",
     "ClientBalanceResponse",
     "AccountInfoResponse",
 ]
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Literal
+from typing import Annotated, Literal
 
+from ps3838api.models.bets import BetStatus, BetTypeFull
 from pydantic import BaseModel, Field, model_validator
 
 
@@ -14,6 +15,21 @@ class BetsRequest(BaseModel):
         default=None,
         description="End of the period to retrieve bets (exclusive, ISO 8601). Mutually exclusive with days.",
     )
+    sport_ids: list[int] | None = Field(default=None, description="Only return bets on these sports.")
+    league_ids: list[int] | None = Field(default=None, description="Only return bets in these leagues.")
+    bet_types: list[BetTypeFull] | None = Field(default=None, description="Only return bets of these types.")
+    bet_statuses: list[BetStatus] | None = Field(
+        default=None, description="Only return bets with these statuses."
+    )
+    min_risk: float | None = Field(default=None, description="Only return bets risking at least this much.")
+    max_risk: float | None = Field(default=None, description="Only return bets risking at most this much.")
+    min_win_loss: float | None = Field(default=None, description="Only return bets with winLoss >= this.")
+    max_win_loss: float | None = Field(default=None, description="Only return bets with winLoss <= this.")
+    fields: list[str] | None = Field(
+        default=None,
+        min_length=1,
+        description="Only include these fields in every returned bet. All fields when omitted.",
+    )
 
     @model_validator(mode="after")
     def validate_date_range(self) -> "BetsRequest":
@@ -34,14 +50,70 @@ class BetsRequest(BaseModel):
             raise ValueError("days is required when from_date/to_date are not provided")
         return self
 
+    @model_validator(mode="after")
+    def validate_filter_ranges(self) -> "BetsRequest":
+        if self.min_risk is not None and self.max_risk is not None and self.min_risk > self.max_risk:
+            raise ValueError("min_risk must not be greater than max_risk")
+        if (
+            self.min_win_loss is not None
+            and self.max_win_loss is not None
+            and self.min_win_loss > self.max_win_loss
+        ):
+            raise ValueError("min_win_loss must not be greater than max_win_loss")
+        return self
+
 
 type BillingPeriodSelector = Literal["CURRENT", "PREVIOUS"]
 
+type SummaryDimension = Literal["day", "sport", "league", "bet_type"]
+
+
+class BetsSummaryRequest(BaseModel):
+    from_date: datetime = Field(description="Start of the period to summarize (ISO 8601).")
+    to_date: datetime = Field(description="End of the period to summarize (exclusive, ISO 8601).")
+    group_by: list[SummaryDimension] = Field(
+        default_factory=list[SummaryDimension],
+        description="Dimensions to break the totals down by. Only the overall total when empty.",
+    )
+    sport_ids: list[int] | None = Field(default=None, description="Only count bets on these sports.")
+    league_ids: list[int] | None = Field(default=None, description="Only count bets in these leagues.")
+    bet_types: list[BetTypeFull] | None = Field(default=None, description="Only count bets of these types.")
+
+    @model_validator(mode="after")
+    def validate_date_range(self) -> "BetsSummaryRequest":
+        if self.from_date >= self.to_date:
+            raise ValueError("to_date must be greater than from_date")
+        if len(set(self.group_by)) != len(self.group_by):
+            raise ValueError("group_by must not repeat a dimension")
+        return self
+
 
 class ClientBalanceRequest(BaseModel):
     pass
 
 
+type BalanceMetric = Literal["available_balance", "outstanding_transactions"]
+type DownsampleMethod = Literal["lttb", "minmax"]
+
+
+class BalanceHistoryRequest(BaseModel):
+    from_date: datetime = Field(description="Start of the period (ISO 8601).")
+    to_date: datetime = Field(description="End of the period (exclusive, ISO 8601).")
+    points: int = Field(default=500, ge=3, le=10_000, description="Maximum number of points to return.")
+    method: DownsampleMethod = Field(
+        default="lttb",
+        description="lttb keeps the points that preserve the shape of the chart; minmax keeps the lowest "
+        "and highest sample of every time bucket.",
+    )
+    metric: BalanceMetric = Field(default="available_balance", description="Balance field to chart.")
+
+    @model_validator(mode="after")
+    def validate_date_range(self) -> "BalanceHistoryRequest":
+        if self.from_date >= self.to_date:
+            raise ValueError("to_date must be greater than from_date")
+        return self
+
+
 class BillingPeriodBetsRequest(BaseModel):
     period: BillingPeriodSelector = Field(
         default="CURRENT",
@@ -52,3 +124,41 @@ class BillingPeriodBetsRequest(BaseModel):
         description="Timestamp when API access was gained. Used to determine billing period boundaries. "
         "If not provided, defaults to billing_period_day from settings.",
     )
+
+
+class BetsSubRequest(BetsRequest):
+    type: Literal["bets"]
+
+
+class ClientBalanceSubRequest(ClientBalanceRequest):
+    type: Literal["balance"]
+
+
+class LeaguesSubRequest(BaseModel):
+    type: Literal["leagues"]
+
+
+class BillingPeriodBetsSubRequest(BillingPeriodBetsRequest):
+    type: Literal["billing_period"]
+
+
+class AccountInfoSubRequest(BaseModel):
+    type: Literal["account_info"]
+
+
+type BatchSubRequest = Annotated[
+    BetsSubRequest
+    | ClientBalanceSubRequest
+    | LeaguesSubRequest
+    | BillingPeriodBetsSubRequest
+    | AccountInfoSubRequest,
+    Field(discriminator="type"),
+]
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(
+        min_length=1,
+        max_length=20,
+        description="Sub-requests to run concurrently. Results are returned in the same order.",
+    )
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
 from ps3838api.models.bets import ManualBet, ParlayBetV2, SpecialBetV3, StraightBetV3, TeaserBet
 from ps3838api.models.client import BalanceData, LeagueV3
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BetsResponseModel(BaseModel):
@@ -21,10 +22,37 @@ class ClientBalanceResponse(BaseModel):
     data: BalanceData
 
 
+class BalancePoint(BaseModel):
+    sampled_at: datetime
+    value: float
+
+
+class BalanceHistoryResponse(BaseModel):
+    from_date: datetime
+    to_date: datetime
+    metric: str
+    method: str
+    currency: str | None = Field(description="Currency of the samples; None when there are none.")
+    sample_count: int = Field(description="Samples in the range before downsampling.")
+    points: list[BalancePoint]
+
+
 class LeaguesResponse(BaseModel):
     leagues: list[LeagueV3]
 
 
+class ReadinessCheck(BaseModel):
+    ok: bool
+    checked_at: datetime
+    duration_ms: float
+    error: str | None = None
+
+
+class ReadinessResponse(BaseModel):
+    status: str = Field(description="warming_up, ready, degraded (upstream failing) or not_ready.")
+    checks: dict[str, ReadinessCheck]
+
+
 class AccountInfoResponse(BaseModel):
     account_name: str | None
     base_api_url: str | None
@@ -36,3 +64,35 @@ class BillingPeriodBetsResponse(BaseModel):
     period_start: datetime
     period_end: datetime
     bets: BetsResponseModel
+
+
+class BatchResult(BaseModel):
+    type: str
+    ok: bool
+    data: Any = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
+
+
+class BetsSummaryGroup(BaseModel):
+    day: date | None = None
+    sport_id: int | None = None
+    league_id: int | None = None
+    bet_type: str | None = None
+    bet_count: int
+    risk: float
+    win_loss: float
+    profit_stakes: float
+
+
+class BetsSummaryResponse(BaseModel):
+    from_date: datetime
+    to_date: datetime
+    rolled_up_to: datetime | None = Field(
+        description="Days before this were answered from the daily rollups, the rest from raw bets."
+    )
+    total: BetsSummaryGroup
+    groups: list[BetsSummaryGroup]
@@ -0,0 +1,216 @@
+"""Client balance history.
+
+A background sampler records the balance once per ``balance_sample_interval`` into ``balance_samples``.
+Samples are keyed by the start of their interval, so workers sampling together store it only once and
+a sample that is already there saves the upstream call. Charts read the series downsampled on the
+server, so any range renders from a few hundred points without calling upstream. The database picks the
+lowest and highest sample of each time bucket, so a long range never loads all its samples.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import BasePS3838Error
+from sqlalchemy import BigInteger, ColumnElement, Select, cast, extract, func, or_, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.db.database import get_session_maker
+from app.db.models import BalanceSample
+from app.schemas.requests import BalanceMetric, DownsampleMethod
+
+logger = logging.getLogger(__name__)
+
+_METRIC_COLUMNS = {
+    "available_balance": BalanceSample.available_balance,
+    "outstanding_transactions": BalanceSample.outstanding_transactions,
+}
+_LTTB_BUCKETS_PER_POINT = 4
+"""LTTB chooses from the extremes of this many time buckets per point it keeps, not from every sample."""
+
+
+@dataclass(slots=True)
+class BalanceSeries:
+    times: list[datetime] = field(default_factory=list[datetime])
+    values: list[float] = field(default_factory=list[float])
+    sample_count: int = 0
+    currency: str | None = None
+
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite hands timestamps back without their timezone.
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def sample_slot(now: datetime, interval: timedelta) -> datetime:
+    """Start of the sampling interval ``now`` falls in, aligned to the Unix epoch."""
+    seconds = interval.total_seconds()
+    return datetime.fromtimestamp(now.timestamp() // seconds * seconds, timezone.utc)
+
+
+def is_closed_balance_range(to_date: datetime, interval: timedelta, now: datetime | None = None) -> bool:
+    """Whether every sample before ``to_date`` has been recorded, or no longer can be.
+
+    A sample is recorded during the interval it is keyed by, which may run late, so the range is only
+    closed once a whole interval has passed after it.
+    """
+    return to_date <= sample_slot(now or datetime.now(timezone.utc), interval) - interval
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, from each of ``threshold - 2`` buckets in between, the point
+    forming the largest triangle with the point kept before it and the average of the next bucket.
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    every = (count - 2) / (threshold - 2)
+    kept = [0]
+    previous = 0
+    for bucket in range(threshold - 2):
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, count)
+        next_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        previous_x, previous_y = xs[previous], ys[previous]
+        best, best_area = -1, -1.0
+        for index in range(int(bucket * every) + 1, next_start):
+            area = abs(
+                (previous_x - next_x) * (ys[index] - previous_y)
+                - (previous_x - xs[index]) * (next_y - previous_y)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        kept.append(best)
+        previous = best
+    kept.append(count - 1)
+    return kept
+
+
+def min_max_buckets(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Indices of the lowest and highest point of each of ``threshold // 2`` equal time buckets.
+
+    Unlike LTTB it never hides a spike, at the cost of a less faithful shape between extremes.
+    """
+    count = len(xs)
+    buckets = threshold // 2
+    if threshold >= count or buckets < 1:
+        return list(range(count))
+
+    width = (xs[-1] - xs[0]) / buckets or 1.0
+    extremes: dict[int, tuple[int, int]] = {}
+    for index, y in enumerate(ys):
+        bucket = min(int((xs[index] - xs[0]) / width), buckets - 1)
+        low, high = extremes.get(bucket, (index, index))
+        extremes[bucket] = (index if y < ys[low] else low, index if y > ys[high] else high)
+    return sorted({index for pair in extremes.values() for index in pair})
+
+
+async def balance_series(
+    db: AsyncSession,
+    from_date: datetime,
+    to_date: datetime,
+    points: int,
+    method: DownsampleMethod = "lttb",
+    metric: BalanceMetric = "available_balance",
+) -> BalanceSeries:
+    """The ``metric`` samples in ``[from_date, to_date)``, downsampled to at most ``points`` points."""
+    in_range = (BalanceSample.sampled_at >= from_date, BalanceSample.sampled_at < to_date)
+    epoch = cast(extract("epoch", BalanceSample.sampled_at), BigInteger)
+    count, first, last = (
+        await db.execute(select(func.count(), func.min(epoch), func.max(epoch)).where(*in_range))
+    ).one()
+    if not count:
+        return BalanceSeries()
+    currency = await db.scalar(
+        select(BalanceSample.currency).where(*in_range).order_by(BalanceSample.sampled_at.desc()).limit(1)
+    )
+
+    buckets = points // 2 if method == "minmax" else points * _LTTB_BUCKETS_PER_POINT
+    column = _METRIC_COLUMNS[metric]
+    query: Select[Any] = select(BalanceSample.sampled_at, column).where(*in_range)
+    if count > 2 * buckets:
+        query = _bucket_extremes(query, column, epoch, int(first), int(last), buckets)
+    rows = (await db.execute(query.order_by(query.selected_columns[0]))).all()
+
+    times = [_utc(row[0]) for row in rows]
+    values = [row[1] for row in rows]
+    downsample = lttb if method == "lttb" else min_max_buckets
+    series = BalanceSeries(sample_count=count, currency=currency)
+    for index in downsample([moment.timestamp() for moment in times], values, points):
+        series.times.append(times[index])
+        series.values.append(values[index])
+    return series
+
+
+def _bucket_extremes(
+    query: Select[Any],
+    column: InstrumentedAttribute[float],
+    epoch: ColumnElement[int],
+    first: int,
+    last: int,
+    buckets: int,
+) -> Select[Any]:
+    """``query`` narrowed to the lowest and highest ``column`` sample of ``buckets`` equal time buckets."""
+    bucket = (epoch - first) * buckets // (last - first + 1)
+    ranked = query.add_columns(
+        func.row_number().over(partition_by=bucket, order_by=(column, BalanceSample.sampled_at)).label("low"),
+        func.row_number()
+        .over(partition_by=bucket, order_by=(column.desc(), BalanceSample.sampled_at))
+        .label("high"),
+    ).subquery()
+    return select(ranked.c.sampled_at, ranked.c[column.key]).where(or_(ranked.c.low == 1, ranked.c.high == 1))
+
+
+async def sample_balance(
+    db: AsyncSession, client: PinnacleClient, interval: timedelta, now: datetime | None = None
+) -> bool:
+    """Record the balance for the current interval. False when it was already recorded."""
+    slot = sample_slot(now or datetime.now(timezone.utc), interval)
+    if await db.get(BalanceSample, slot) is not None:
+        return False
+    balance = await run_in_threadpool(client.get_client_balance)
+    db.add(
+        BalanceSample(
+            sampled_at=slot,
+            available_balance=balance["availableBalance"],
+            outstanding_transactions=balance["outstandingTransactions"],
+            given_credit=balance.get("givenCredit"),
+            currency=balance["currency"],
+        )
+    )
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another worker recorded this interval in the meantime.
+        await db.rollback()
+        return False
+    return True
+
+
+async def sample_balance_periodically(
+    client_factory: Callable[[], PinnacleClient], interval: timedelta
+) -> None:
+    seconds = interval.total_seconds()
+    while True:
+        try:
+            async with get_session_maker()() as db:
+                await sample_balance(db, client_factory(), interval)
+        except (BasePS3838Error, requests.RequestException, SQLAlchemyError) as exc:
+            logger.warning(f"Balance sampling failed: {exc!r}")
+        except Exception:
+            logger.exception("Unexpected error in balance sampling")
+        # Wake up at the start of the next interval, together with the other workers.
+        await asyncio.sleep(seconds - datetime.now(timezone.utc).timestamp() % seconds)
@@ -0,0 +1,302 @@
+"""Process-wide cache of settled bet history.
+
+Settled bets for a closed time range do not change, so once a range has been downloaded completely
+it can be answered from memory. The cache tracks which ranges it covers and stores the bets in a
+compact ``BetStore``. Requests fetch from upstream concurrently in worker threads, so every access
+to the store and the covered ranges goes through a lock; upstream calls happen outside of it.
+
+The cache can be saved to a snapshot file and started from one. Bets read from a snapshot stay in the
+mapped file, and only bets added afterwards are held in the in-memory store. One worker per host writes
+the snapshots; the others switch to each newer file, so the bets it covers leave their memory too.
+"""
+
+import asyncio
+import bisect
+import fcntl
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Collection, Iterator, Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.bet_snapshot import BetSnapshot, write_snapshot
+from app.services.bet_store import BET_KINDS, BetKind, BetPredicate, BetStore
+
+logger = logging.getLogger(__name__)
+
+type BetSource = BetStore | BetSnapshot
+
+
+class BetHistoryCache:
+    """Settled bets plus the set of ``[start, end)`` ranges that are known to be complete."""
+
+    def __init__(self, store: BetStore | None = None) -> None:
+        self.store = store or BetStore()
+        self.snapshot: BetSnapshot | None = None
+        self._saving: BetStore | None = None
+        """The store being written to a snapshot, still read until the snapshot replaces it."""
+        self._rejected_inode: int | None = None
+        """The snapshot file ``reload_snapshot`` last turned down, not mapped again until it is replaced."""
+        self._covered: list[tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def covered(self) -> list[tuple[datetime, datetime]]:
+        with self._lock:
+            return [(_from_epoch(start), _from_epoch(end)) for start, end in self._covered]
+
+    def missing_ranges(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Sub-ranges of ``[start, end)`` that still have to be fetched from upstream."""
+        cursor, stop = start.timestamp(), end.timestamp()
+        missing: list[tuple[float, float]] = []
+        with self._lock:
+            covered = list(self._covered)
+        for covered_start, covered_end in covered:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= stop:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < stop:
+            missing.append((cursor, stop))
+        return [(_from_epoch(gap_start), _from_epoch(gap_end)) for gap_start, gap_end in missing]
+
+    def add_page(self, page: Mapping[str, Any]) -> int:
+        with self._lock:
+            return self.store.extend(page)
+
+    def mark_covered(self, start: datetime, end: datetime) -> None:
+        """Record that every bet settled in ``[start, end)`` has been added."""
+        with self._lock:
+            self._mark_covered(start.timestamp(), end.timestamp())
+
+    def bets_between(
+        self,
+        start: datetime,
+        end: datetime,
+        predicate: BetPredicate | None = None,
+        fields: Collection[str] | None = None,
+    ) -> dict[BetKind, list[dict[str, Any]]]:
+        """Cached bets settled in ``[start, end)``, grouped by kind and ordered by settlement time."""
+        with self._lock:
+            selected = [
+                (source, indices)
+                for source in self._sources()
+                if (indices := source.select(start.timestamp(), end.timestamp(), predicate))
+            ]
+            if len(selected) == 1:
+                source, indices = selected[0]
+                return source.to_response(indices, fields)
+            grouped: dict[BetKind, list[dict[str, Any]]] = {kind: [] for kind in BET_KINDS}
+            merged = heapq.merge(
+                *[
+                    [(source.settled_at(index), number, index) for index in indices]
+                    for number, (source, indices) in enumerate(selected)
+                ]
+            )
+            for _, number, index in merged:
+                source = selected[number][0]
+                grouped[source.kind(index)].append(source.get(index, fields))
+            return grouped
+
+    def load_snapshot(self, path: Path) -> BetSnapshot:
+        """Serve the bets of the snapshot at ``path`` from the mapped file, before anything is cached."""
+        snapshot = BetSnapshot(path)
+        with self._lock:
+            self.snapshot = snapshot
+            for start, end in snapshot.covered:
+                self._mark_covered(start, end)
+        return snapshot
+
+    def reload_snapshot(self, path: Path) -> BetSnapshot | None:
+        """Serve the bets from the snapshot at ``path`` when another process has replaced it.
+
+        The new snapshot is only used when it covers every range the current one does. Bets it covers
+        are dropped from the in-memory store and the replaced snapshot is unmapped. Returns the new
+        snapshot, or None when the file did not change or cannot replace the current one.
+        """
+        with self._lock:
+            current = self.snapshot
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            return None
+        if inode == self._rejected_inode or (current is not None and inode == current.inode):
+            return None
+        try:
+            snapshot = BetSnapshot(path)
+        except ValueError:
+            self._rejected_inode = inode
+            raise
+        if current is not None and not all(
+            _contains(snapshot.covered, start, end) for start, end in current.covered
+        ):
+            self._rejected_inode = snapshot.inode
+            snapshot.close()
+            return None
+
+        with self._lock:
+            if self.snapshot is not current:
+                snapshot.close()
+                return None
+            store, self.store = self.store, BetStore()
+            for index in range(len(store)):
+                if not _is_covered(snapshot.covered, store.settled_at(index)):
+                    self.store.add(store.kind(index), store.get(index))
+            self.snapshot = snapshot
+            for start, end in snapshot.covered:
+                self._mark_covered(start, end)
+            # Readers only use the snapshot under the lock, so none is left reading the replaced one.
+            if current is not None:
+                current.close()
+        return snapshot
+
+    def save_snapshot(self, path: Path) -> int | None:
+        """Write the covered bets to a snapshot at ``path`` and serve them from it from now on.
+
+        Only the bets added since the previous snapshot are encoded; the rest is copied from it. Bets
+        in ranges that are not covered yet stay in memory. Returns the number of bets written, or None
+        when nothing was added since the previous snapshot.
+        """
+        with self._lock:
+            covered = list(self._covered)
+            if not any(self.store.select(start, end) for start, end in covered):
+                return None
+            saving, self.store = self.store, BetStore()
+            self._saving = saving
+            base = self.snapshot
+
+        # Nothing adds to ``saving`` any more, so it is read without the lock.
+        written: list[int] = []
+        uncovered: list[tuple[BetKind, dict[str, Any]]] = []
+        for index in range(len(saving)):
+            if _is_covered(covered, saving.settled_at(index)):
+                written.append(index)
+            else:
+                uncovered.append((saving.kind(index), saving.get(index)))
+        try:
+            count = write_snapshot(
+                path,
+                ((saving.kind(index), saving.settled_at(index), saving.get(index)) for index in written),
+                covered,
+                base,
+            )
+            snapshot = BetSnapshot(path)
+        except BaseException:
+            with self._lock:
+                for index in range(len(self.store)):
+                    saving.add(self.store.kind(index), self.store.get(index))
+                self.store, self._saving = saving, None
+            raise
+
+        with self._lock:
+            self.snapshot, self._saving = snapshot, None
+            for kind, bet in uncovered:
+                self.store.add(kind, bet)
+            if base is not None:
+                base.close()
+        return count
+
+    def _sources(self) -> list[BetSource]:
+        sources: list[BetSource] = []
+        for source in (self.snapshot, self._saving, self.store):
+            if source is not None and len(source):
+                sources.append(source)
+        return sources
+
+    def _mark_covered(self, new_start: float, new_end: float) -> None:
+        merged: list[tuple[float, float]] = []
+        for covered_start, covered_end in self._covered:
+            if covered_end < new_start or covered_start > new_end:
+                merged.append((covered_start, covered_end))
+            else:
+                new_start = min(new_start, covered_start)
+                new_end = max(new_end, covered_end)
+        merged.append((new_start, new_end))
+        merged.sort()
+        self._covered = merged
+
+
+def _is_covered(covered: list[tuple[float, float]], moment: float) -> bool:
+    """Whether ``moment`` falls in one of the sorted, disjoint ``covered`` ranges."""
+    position = bisect.bisect_right(covered, (moment, math.inf))
+    return position > 0 and moment < covered[position - 1][1]
+
+
+def _contains(covered: list[tuple[float, float]], start: float, end: float) -> bool:
+    """Whether ``[start, end)`` lies within one of the sorted, disjoint ``covered`` ranges."""
+    position = bisect.bisect_right(covered, (start, math.inf))
+    return position > 0 and end <= covered[position - 1][1]
+
+
+def _from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+@cache
+def get_bet_cache() -> BetHistoryCache:
+    return BetHistoryCache()
+
+
+@contextmanager
+def snapshot_writer_lock(path: Path) -> Iterator[bool]:
+    """Try to become the one process on this host that writes snapshots to ``path``.
+
+    Yields whether the lock next to ``path`` was taken; it is held until the context exits.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f"{path.name}.lock").open("a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+        else:
+            yield True
+
+
+async def save_bet_snapshot(path: Path) -> None:
+    started = time.perf_counter()
+    try:
+        count = await run_in_threadpool(get_bet_cache().save_snapshot, path)
+    except OSError as exc:
+        logger.warning(f"Saving the bet cache snapshot failed: {exc!r}")
+    except Exception:
+        logger.exception("Unexpected error saving the bet cache snapshot")
+    else:
+        if count is not None:
+            logger.info(f"Saved {count} bets to {path} in {time.perf_counter() - started:.2f}s")
+
+
+async def reload_bet_snapshot(path: Path) -> None:
+    try:
+        snapshot = await run_in_threadpool(get_bet_cache().reload_snapshot, path)
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Mapping the newer bet cache snapshot {path} failed: {exc}")
+    else:
+        if snapshot is not None:
+            logger.info(f"Mapped {len(snapshot)} bets from the newer snapshot {path}")
+
+
+async def save_bet_snapshots_periodically(path: Path, interval: timedelta) -> None:
+    """Snapshot the bet history cache to ``path`` every ``interval``.
+
+    Only one worker per host writes the snapshots. The others map each newer one instead.
+    """
+    with snapshot_writer_lock(path) as writer:
+        while True:
+            await asyncio.sleep(interval.total_seconds())
+            if writer:
+                await save_bet_snapshot(path)
+            else:
+                await reload_bet_snapshot(path)
@@ -0,0 +1,125 @@
+"""Bet filtering and field projection shared by the upstream and cached bet sources."""
+
+from collections.abc import Callable, Collection, Iterable
+from typing import Any
+
+from app.services.bet_store import BetKind
+
+KIND_BET_TYPES: dict[BetKind, str] = {
+    "parlayBets": "PARLAY",
+    "teaserBets": "TEASER",
+    "specialBets": "SPECIAL",
+    "manualBets": "MANUAL",
+}
+"""Bet type implied by the response list a non-straight bet comes from."""
+
+UPSTREAM_BET_TYPES = frozenset({"MONEYLINE", "TEAM_TOTAL_POINTS", "SPREAD", "TOTAL_POINTS"})
+"""Bet types the upstream ``betType`` query parameter can filter on."""
+
+
+class BetFilter:
+    """Predicate over a single bet, evaluated through a field getter.
+
+    Taking a getter instead of a dict lets the compact ``BetStore`` evaluate the filter against its
+    columns without materializing bets that do not match. Straight bets with a ``NOT_ACCEPTED``
+    status are never returned.
+    """
+
+    __slots__ = (
+        "bet_statuses",
+        "bet_types",
+        "league_ids",
+        "max_risk",
+        "max_win_loss",
+        "min_risk",
+        "min_win_loss",
+        "sport_ids",
+    )
+
+    def __init__(
+        self,
+        *,
+        sport_ids: Iterable[int] | None = None,
+        league_ids: Iterable[int] | None = None,
+        bet_types: Iterable[str] | None = None,
+        bet_statuses: Iterable[str] | None = None,
+        min_risk: float | None = None,
+        max_risk: float | None = None,
+        min_win_loss: float | None = None,
+        max_win_loss: float | None = None,
+    ) -> None:
+        self.sport_ids = frozenset(sport_ids) if sport_ids is not None else None
+        self.league_ids = frozenset(league_ids) if league_ids is not None else None
+        self.bet_types = frozenset(bet_types) if bet_types is not None else None
+        self.bet_statuses = frozenset(bet_statuses) if bet_statuses is not None else None
+        self.min_risk = min_risk
+        self.max_risk = max_risk
+        self.min_win_loss = min_win_loss
+        self.max_win_loss = max_win_loss
+
+    def upstream_params(self) -> dict[str, Any]:
+        """Keyword arguments for ``PinnacleClient.get_bets`` that pre-filter on the upstream side."""
+        params: dict[str, Any] = {}
+        if self.bet_statuses is not None:
+            params["bet_statuses"] = sorted(self.bet_statuses)
+        if self.bet_types is not None and self.bet_types <= UPSTREAM_BET_TYPES:
+            params["bet_type"] = sorted(self.bet_types)
+        return params
+
+    def accepts_kind(self, kind: BetKind) -> bool:
+        """Whether any bet of ``kind`` can match, so whole lists can be skipped."""
+        if self.bet_types is None or kind == "straightBets":
+            return True
+        return KIND_BET_TYPES[kind] in self.bet_types
+
+    def reads_bets(self, kind: BetKind) -> bool:
+        """Whether evaluating the filter on a bet of an accepted ``kind`` reads any of its fields.
+
+        The ``NOT_ACCEPTED`` check on straight bets is left out: it reads a single field callers can
+        often rule out without decoding the bet.
+        """
+        if kind == "straightBets" and self.bet_types is not None:
+            return True
+        return any(
+            value is not None
+            for value in (
+                self.sport_ids,
+                self.league_ids,
+                self.bet_statuses,
+                self.min_risk,
+                self.max_risk,
+                self.min_win_loss,
+                self.max_win_loss,
+            )
+        )
+
+    def matches(self, kind: BetKind, get: Callable[[str], Any]) -> bool:
+        status = get("betStatus")
+        if kind == "straightBets" and status == "NOT_ACCEPTED":
+            return False
+        if self.bet_statuses is not None and status not in self.bet_statuses:
+            return False
+        if self.bet_types is not None and (get("betType") or KIND_BET_TYPES.get(kind)) not in self.bet_types:
+            return False
+        if self.sport_ids is not None and get("sportId") not in self.sport_ids:
+            return False
+        if self.league_ids is not None and get("leagueId") not in self.league_ids:
+            return False
+        return _in_range(get("risk"), self.min_risk, self.max_risk) and _in_range(
+            get("winLoss"), self.min_win_loss, self.max_win_loss
+        )
+
+
+def _in_range(value: Any, low: float | None, high: float | None) -> bool:
+    if low is None and high is None:
+        return True
+    if not isinstance(value, int | float):
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def project(bet: dict[str, Any], fields: Collection[str] | None) -> dict[str, Any]:
+    """Keep only ``fields`` of ``bet``; the bet itself when ``fields`` is None."""
+    if fields is None:
+        return bet
+    return {field: bet[field] for field in fields if field in bet}
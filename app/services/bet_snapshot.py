@@ -0,0 +1,425 @@
+"""On-disk snapshots of the bet history cache.
+
+A snapshot stores the cached bets column-wise in the layout ``BetStore`` keeps in memory: a typed array
+per straight bet field, low-cardinality strings as indices into a shared symbol table, the key order of
+every straight bet as an index into a table of layouts, and everything else as JSON records.
+``BetSnapshot`` maps the file read-only instead of loading it, so every worker on a host shares the same
+pages through the OS page cache, and bets are decoded only when they are read.
+
+The file is a sequence of 8-byte aligned sections followed by a JSON footer describing them::
+
+    MAGIC | section ... | footer JSON | footer length (u64) | MAGIC
+
+A snapshot only holds bets settled in the ranges it covers, so the ranges a worker fetches after
+loading it never overlap the bets it already holds. Workers that do not write snapshots map each newer
+file as it replaces the previous one.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Buffer, Callable, Collection, Iterable, Mapping, Sequence
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from app.services.bet_store import (
+    BET_KINDS,
+    STATE_ABSENT,
+    STATE_INT,
+    STATE_NULL,
+    STATE_SET,
+    STRAIGHT_BET_SCHEMA,
+    BetKind,
+    BetPredicate,
+    ColumnKind,
+    SymbolTable,
+    value_state,
+)
+
+MAGIC = b"PABETS01"
+FORMAT_VERSION = 2
+_FOOTER_LENGTH = struct.Struct("<Q")
+_ALIGNMENT = 8
+
+type _IntFormat = Literal["b", "B", "i", "q"]
+
+_TYPECODES: dict[ColumnKind, str] = {"int": "q", "float": "d", "bool": "b", "symbol": "i"}
+_SCHEMA_KINDS = dict(STRAIGHT_BET_SCHEMA)
+
+
+class _Blobs:
+    """Variable-length byte strings appended back to back, with ``len + 1`` offsets."""
+
+    def __init__(self) -> None:
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def append(self, value: bytes) -> None:
+        self.data += value
+        self.offsets.append(len(self.data))
+
+
+class _Delta:
+    """Bets added on top of a base snapshot, encoded section by section."""
+
+    def __init__(self, symbols: SymbolTable, layouts: Iterable[Sequence[str]]) -> None:
+        self.symbols = symbols
+        self.layouts = [list(keys) for keys in layouts]
+        self._layout_ids = {tuple(keys): index for index, keys in enumerate(self.layouts)}
+        self.kinds = array("b")
+        self.settled = array("d")
+        self.bet_layouts = array("i")
+        self.states = {name: array("b") for name, _ in STRAIGHT_BET_SCHEMA}
+        self.values: dict[str, array[Any]] = {
+            name: array(_TYPECODES[kind]) for name, kind in STRAIGHT_BET_SCHEMA if kind != "text"
+        }
+        self.texts = {name: _Blobs() for name, kind in STRAIGHT_BET_SCHEMA if kind == "text"}
+        self.records = _Blobs()
+
+    def add(self, kind: BetKind, settled: float, bet: Mapping[str, Any]) -> None:
+        kind_index = BET_KINDS.index(kind)
+        self.kinds.append(kind_index)
+        self.settled.append(settled)
+        straight = kind_index == 0
+        self.bet_layouts.append(self._layout(tuple(bet)) if straight else 0)
+        for name, column_kind in STRAIGHT_BET_SCHEMA:
+            value: Any = bet.get(name)
+            state = value_state(column_kind, value) if straight and name in bet else STATE_ABSENT
+            self.states[name].append(state)
+            if column_kind == "text":
+                self.texts[name].append(value.encode() if state == STATE_SET else b"")
+            elif state not in (STATE_SET, STATE_INT):
+                self.values[name].append(0)
+            elif column_kind == "symbol":
+                self.values[name].append(self.symbols.intern(value))
+            else:
+                self.values[name].append(value)
+
+        if straight:
+            extras = {
+                key: value
+                for key, value in bet.items()
+                if key not in _SCHEMA_KINDS or value_state(_SCHEMA_KINDS[key], value) == STATE_ABSENT
+            }
+        else:
+            extras = dict(bet)
+        self.records.append(json.dumps(extras, separators=(",", ":")).encode() if extras else b"")
+
+    def _layout(self, keys: tuple[str, ...]) -> int:
+        layout_id = self._layout_ids.get(keys)
+        if layout_id is None:
+            layout_id = self._layout_ids[keys] = len(self.layouts)
+            self.layouts.append(list(keys))
+        return layout_id
+
+
+class _SectionWriter:
+    """Writes every section as the base snapshot's copy of it followed by the new part."""
+
+    def __init__(self, file: IO[bytes], base: "BetSnapshot | None") -> None:
+        self.file = file
+        self.base = base
+        self.offset = file.tell()
+        self.sections: dict[str, tuple[int, int]] = {}
+
+    def write(self, name: str, part: Buffer, copy_base: bool = True) -> None:
+        padding = -self.offset % _ALIGNMENT
+        self.offset += self.file.write(b"\0" * padding)
+        start = self.offset
+        if copy_base and self.base is not None:
+            self.offset += self.file.write(self.base.raw(name))
+        self.offset += self.file.write(part)
+        self.sections[name] = (start, self.offset - start)
+
+    def write_blobs(self, name: str, blobs: _Blobs) -> None:
+        if self.base is None:
+            self.write(f"{name}.offsets", blobs.offsets)
+        else:
+            # The base offsets already start with a zero; the new ones continue past the base bytes.
+            shift = len(self.base.raw(f"{name}.data"))
+            self.write(f"{name}.offsets", array("q", (offset + shift for offset in blobs.offsets[1:])))
+        self.write(f"{name}.data", blobs.data)
+
+
+def write_snapshot(
+    path: Path,
+    bets: Iterable[tuple[BetKind, float, Mapping[str, Any]]],
+    covered: Sequence[tuple[float, float]],
+    base: "BetSnapshot | None" = None,
+) -> int:
+    """Write ``base`` plus ``bets`` (kind, settlement epoch seconds, bet) as a snapshot covering ``covered``.
+
+    The sections of ``base`` are copied as they are, so only the new bets are encoded. The file is
+    written next to ``path`` and moved over it once complete: processes that mapped the previous file
+    keep reading it undisturbed. Returns the number of bets written.
+    """
+    symbols = SymbolTable(base.symbols if base is not None else ())
+    delta = _Delta(symbols, base.layouts if base is not None else ())
+    for kind, settled, bet in bets:
+        delta.add(kind, settled, bet)
+
+    settled = array("d")
+    if base is not None:
+        settled.frombytes(base.raw("settled"))
+    settled.extend(delta.settled)
+    order = array("i", sorted(range(len(settled)), key=settled.__getitem__))
+    sorted_settled = array("d", map(settled.__getitem__, order))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as file:
+        try:
+            file.write(MAGIC)
+            sections = _SectionWriter(file, base)
+            sections.write("kinds", delta.kinds)
+            sections.write("layouts", delta.bet_layouts)
+            sections.write("settled", settled, copy_base=False)
+            sections.write("order", order, copy_base=False)
+            sections.write("sorted_settled", sorted_settled, copy_base=False)
+            for name, kind in STRAIGHT_BET_SCHEMA:
+                sections.write(f"{name}.states", delta.states[name])
+                if kind == "text":
+                    sections.write_blobs(name, delta.texts[name])
+                else:
+                    sections.write(f"{name}.values", delta.values[name])
+            sections.write_blobs("records", delta.records)
+
+            footer = json.dumps(
+                {
+                    "version": FORMAT_VERSION,
+                    "byteorder": sys.byteorder,
+                    "count": len(settled),
+                    "covered": [list(span) for span in covered],
+                    "symbols": symbols.symbols,
+                    "layouts": delta.layouts,
+                    "schema": [list(column) for column in STRAIGHT_BET_SCHEMA],
+                    "sections": sections.sections,
+                }
+            ).encode()
+            file.write(footer)
+            file.write(_FOOTER_LENGTH.pack(len(footer)))
+            file.write(MAGIC)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+    return len(settled)
+
+
+class _MappedViews:
+    """The typed section views readers keep, remembered so ``BetSnapshot.close`` can release them."""
+
+    def __init__(self, raw: Callable[[str], memoryview]) -> None:
+        self._raw = raw
+        self._views: list[memoryview[Any]] = []
+
+    def ints(self, name: str, format: _IntFormat = "B") -> "memoryview[int]":
+        view = self._raw(name).cast(format)
+        self._views.append(view)
+        return view
+
+    def floats(self, name: str) -> "memoryview[float]":
+        view = self._raw(name).cast("d")
+        self._views.append(view)
+        return view
+
+    def release(self) -> None:
+        for view in self._views:
+            view.release()
+
+
+class _Sections:
+    """Typed views of the sections every snapshot has."""
+
+    def __init__(self, views: _MappedViews) -> None:
+        self.kinds = views.ints("kinds", "b")
+        self.layouts = views.ints("layouts", "i")
+        self.settled = views.floats("settled")
+        self.order = views.ints("order", "i")
+        self.sorted_settled = views.floats("sorted_settled")
+        self.record_offsets = views.ints("records.offsets", "q")
+        self.records = views.ints("records.data")
+
+
+class _MappedColumn:
+    """One straight bet field read from the mapped file."""
+
+    __slots__ = ("_load", "name", "states")
+
+    def __init__(self, name: str, kind: ColumnKind, views: _MappedViews, symbols: list[str]) -> None:
+        self.name = name
+        self.states = views.ints(f"{name}.states", "b")
+        self._load: Callable[[int], Any]
+        match kind:
+            case "text":
+                offsets = views.ints(f"{name}.offsets", "q")
+                data = views.ints(f"{name}.data")
+                self._load = lambda row: str(data[offsets[row] : offsets[row + 1]], "utf-8")
+            case "symbol":
+                indices = views.ints(f"{name}.values", "i")
+                self._load = lambda row: symbols[indices[row]]
+            case "bool":
+                flags = views.ints(f"{name}.values", "b")
+                self._load = lambda row: flags[row] == 1
+            case "int":
+                self._load = views.ints(f"{name}.values", "q").__getitem__
+            case "float":
+                self._load = views.floats(f"{name}.values").__getitem__
+
+    def get(self, row: int) -> tuple[bool, Any]:
+        """Return ``(present, value)`` for ``row``."""
+        state = self.states[row]
+        if state == STATE_ABSENT:
+            return False, None
+        if state == STATE_NULL:
+            return True, None
+        if state == STATE_INT:
+            return True, int(self._load(row))
+        return True, self._load(row)
+
+
+class BetSnapshot:
+    """Read-only bets mapped from a snapshot file, with the read interface of ``BetStore``.
+
+    Raises ``ValueError`` when the file is not a snapshot this version can read.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as file:
+            # Tells this file apart from a newer snapshot moved over it under the same path.
+            self.inode = os.fstat(file.fileno()).st_ino
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise ValueError(f"{path} is empty") from exc
+        try:
+            footer = self._footer()
+        except BaseException:
+            self._mmap.close()
+            raise
+
+        self._view = memoryview(self._mmap)
+        self._views = _MappedViews(self.raw)
+        self._sections: dict[str, list[int]] = footer["sections"]
+        self.count: int = footer["count"]
+        self.covered: list[tuple[float, float]] = [(start, end) for start, end in footer["covered"]]
+        self.symbols: list[str] = [sys.intern(symbol) for symbol in footer["symbols"]]
+        self.layouts: list[list[str]] = footer["layouts"]
+        self.sections = _Sections(self._views)
+        self._columns = tuple(
+            _MappedColumn(name, kind, self._views, self.symbols) for name, kind in STRAIGHT_BET_SCHEMA
+        )
+        self._column_index = {column.name: index for index, column in enumerate(self._columns)}
+        columns = {column.name: column for column in self._columns}
+        self._layouts = [tuple((key, columns.get(key)) for key in keys) for keys in self.layouts]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """Unmap the file. The snapshot cannot be read afterwards."""
+        self._views.release()
+        self._view.release()
+        self._mmap.close()
+
+    @property
+    def watermark(self) -> float | None:
+        """End of the latest covered range: bets settled after it have to be fetched."""
+        return self.covered[-1][1] if self.covered else None
+
+    def raw(self, name: str) -> memoryview:
+        start, length = self._sections[name]
+        return self._view[start : start + length]
+
+    def _footer(self) -> dict[str, Any]:
+        size = len(self._mmap)
+        trailer = size - len(MAGIC) - _FOOTER_LENGTH.size
+        if trailer < len(MAGIC) or self._mmap[: len(MAGIC)] != MAGIC or self._mmap[-len(MAGIC) :] != MAGIC:
+            raise ValueError(f"{self.path} is not a bet snapshot")
+        (footer_length,) = _FOOTER_LENGTH.unpack(self._mmap[trailer : trailer + _FOOTER_LENGTH.size])
+        footer: dict[str, Any] = json.loads(self._mmap[trailer - footer_length : trailer])
+        if footer.get("version") != FORMAT_VERSION or footer.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{self.path} was written by an incompatible version")
+        if footer.get("schema") != [list(column) for column in STRAIGHT_BET_SCHEMA]:
+            raise ValueError(f"{self.path} was written for another bet schema")
+        return footer
+
+    def kind(self, index: int) -> BetKind:
+        return BET_KINDS[self.sections.kinds[index]]
+
+    def settled_at(self, index: int) -> float:
+        return self.sections.settled[index]
+
+    def get(self, index: int, fields: Collection[str] | None = None) -> dict[str, Any]:
+        """Decode the bet at ``index`` into its upstream dict shape, or only ``fields`` of it."""
+        if self.sections.kinds[index] != 0:
+            record = self._record(index)
+            return record if fields is None else {key: record[key] for key in fields if key in record}
+
+        bet: dict[str, Any] = {}
+        if fields is not None:
+            for name in fields:
+                present, value = self._straight_field(index, name)
+                if present:
+                    bet[name] = value
+            return bet
+
+        # As in ``BetStore.get``, keys without a column value take the extras in their original order.
+        extra_values = iter(self._record(index).values())
+        for key, column in self._layouts[self.sections.layouts[index]]:
+            if column is not None:
+                present, value = column.get(index)
+                if present:
+                    bet[key] = value
+                    continue
+            bet[key] = next(extra_values)
+        return bet
+
+    def field(self, index: int, name: str) -> Any:
+        """Read a single field of the bet at ``index`` without decoding the whole bet."""
+        if self.sections.kinds[index] != 0:
+            return self._record(index).get(name)
+        return self._straight_field(index, name)[1]
+
+    def select(self, start: float, end: float, predicate: BetPredicate | None = None) -> list[int]:
+        """Indices of bets settled in ``[start, end)`` (epoch seconds), ordered by settlement time."""
+        sorted_settled = self.sections.sorted_settled
+        lo = bisect.bisect_left(sorted_settled, start)
+        hi = bisect.bisect_left(sorted_settled, end, lo)
+        indices = self.sections.order[lo:hi].tolist()
+        if predicate is None:
+            return indices
+        return [index for index in indices if predicate(self.kind(index), partial(self.field, index))]
+
+    def to_response(
+        self, indices: Iterable[int], fields: Collection[str] | None = None
+    ) -> dict[BetKind, list[dict[str, Any]]]:
+        """Group the bets at ``indices`` by kind, in the shape of an upstream ``BetsResponse``."""
+        grouped: dict[BetKind, list[dict[str, Any]]] = {kind: [] for kind in BET_KINDS}
+        for index in indices:
+            grouped[self.kind(index)].append(self.get(index, fields))
+        return grouped
+
+    def _record(self, index: int) -> dict[str, Any]:
+        offsets = self.sections.record_offsets
+        start, end = offsets[index], offsets[index + 1]
+        return json.loads(bytes(self.sections.records[start:end])) if end > start else {}
+
+    def _straight_field(self, index: int, name: str) -> tuple[bool, Any]:
+        column_index = self._column_index.get(name)
+        if column_index is not None:
+            present, value = self._columns[column_index].get(index)
+            if present:
+                return present, value
+        record = self._record(index)
+        if name in record:
+            return True, record[name]
+        return False, None
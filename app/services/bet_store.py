@@ -0,0 +1,506 @@
+"""Compact in-memory storage for settled bets.
+
+Upstream bets are dicts with a few dozen string keys each, which costs several kilobytes per bet
+once they are held in a long-lived cache. ``BetStore`` keeps straight bets column-wise in typed
+arrays, with low-cardinality strings (statuses, sport/league/team names) stored once in a shared
+symbol table. The remaining bet kinds are kept as slotted records whose key tuples are shared between
+bets of the same shape. Bets are turned back into the ``ps3838api`` response dicts, with their
+original key order and value types, only when they are read for serialization.
+"""
+
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Collection, Iterable, Mapping
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Literal
+
+type BetKind = Literal["straightBets", "parlayBets", "teaserBets", "specialBets", "manualBets"]
+type ColumnKind = Literal["int", "float", "bool", "symbol", "text"]
+type BetPredicate = Callable[[BetKind, Callable[[str], Any]], bool]
+"""Called with a bet's kind and a getter for its fields, as ``BetFilter.matches`` is."""
+
+BET_KINDS: tuple[BetKind, ...] = ("straightBets", "parlayBets", "teaserBets", "specialBets", "manualBets")
+
+STRAIGHT_BET_SCHEMA: tuple[tuple[str, ColumnKind], ...] = (
+    ("betId", "int"),
+    ("wagerNumber", "int"),
+    ("placedAt", "text"),
+    ("settledAt", "text"),
+    ("betStatus", "symbol"),
+    ("betStatus2", "symbol"),
+    ("betType", "symbol"),
+    ("win", "float"),
+    ("risk", "float"),
+    ("winLoss", "float"),
+    ("customerCommission", "float"),
+    ("oddsFormat", "symbol"),
+    ("updateSequence", "int"),
+    ("price", "float"),
+    ("isLive", "bool"),
+    ("eventStartTime", "text"),
+    ("sportId", "int"),
+    ("sportName", "symbol"),
+    ("leagueId", "int"),
+    ("leagueName", "symbol"),
+    ("eventId", "int"),
+    ("eventName", "symbol"),
+    ("handicap", "float"),
+    ("teamName", "symbol"),
+    ("side", "symbol"),
+    ("pitcher1", "symbol"),
+    ("pitcher2", "symbol"),
+    ("pitcher1MustStart", "bool"),
+    ("pitcher2MustStart", "bool"),
+    ("team1", "symbol"),
+    ("team2", "symbol"),
+    ("periodNumber", "int"),
+    ("team1Score", "float"),
+    ("team2Score", "float"),
+    ("ftTeam1Score", "float"),
+    ("ftTeam2Score", "float"),
+    ("pTeam1Score", "float"),
+    ("pTeam2Score", "float"),
+    ("resultingUnit", "symbol"),
+)
+"""Straight bet fields stored column-wise. Any other key is kept in a per-bet extras record."""
+
+STATE_ABSENT = 0
+STATE_NULL = 1
+STATE_SET = 2
+STATE_INT = 3
+"""Per-row states of a straight bet column. ``STATE_INT`` marks an int held exactly in a float column."""
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+_MAX_EXACT_FLOAT_INT = 2**53
+_MAX_INTERNED_LENGTH = 64
+
+
+def value_state(kind: ColumnKind, value: Any) -> int:
+    """The state a column of ``kind`` stores ``value`` with; ``STATE_ABSENT`` when it does not fit.
+
+    Values that do not fit are kept in the bet's extras instead, so every value reads back unchanged.
+    """
+    if value is None:
+        return STATE_NULL
+    match kind:
+        case "int":
+            fits = type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+        case "float":
+            if type(value) is int and -_MAX_EXACT_FLOAT_INT <= value <= _MAX_EXACT_FLOAT_INT:
+                return STATE_INT
+            fits = type(value) is float
+        case "bool":
+            fits = type(value) is bool
+        case "symbol" | "text":
+            fits = type(value) is str
+    return STATE_SET if fits else STATE_ABSENT
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an upstream ISO 8601 timestamp into epoch seconds, assuming UTC when naive."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class SymbolTable:
+    """Stores each distinct string once and refers to it by index."""
+
+    __slots__ = ("_index", "symbols")
+
+    def __init__(self, symbols: Iterable[str] = ()) -> None:
+        self.symbols: list[str] = []
+        self._index: dict[str, int] = {}
+        for symbol in symbols:
+            self.intern(symbol)
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.symbols)
+            value = sys.intern(value)
+            self.symbols.append(value)
+            self._index[value] = index
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        return self.symbols[index]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+class _Column(ABC):
+    """One field of the straight bet schema, with a per-row ``STATE_*`` state."""
+
+    __slots__ = ("name", "states")
+
+    kind: ColumnKind
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.states = array("b")
+
+    def append_absent(self) -> None:
+        self.states.append(STATE_ABSENT)
+        self._append_placeholder()
+
+    def set(self, row: int, value: Any) -> bool:
+        """Store ``value`` at ``row``. Returns False when the value does not fit the column type."""
+        state = value_state(self.kind, value)
+        if state in (STATE_SET, STATE_INT):
+            self._store(row, value)
+        self.states[row] = state
+        return state != STATE_ABSENT
+
+    def clear(self, row: int) -> None:
+        self.states[row] = STATE_ABSENT
+
+    def get(self, row: int) -> tuple[bool, Any]:
+        """Return ``(present, value)`` for ``row``."""
+        state = self.states[row]
+        if state == STATE_ABSENT:
+            return False, None
+        if state == STATE_NULL:
+            return True, None
+        if state == STATE_INT:
+            return True, int(self._load(row))
+        return True, self._load(row)
+
+    @abstractmethod
+    def _append_placeholder(self) -> None: ...
+
+    @abstractmethod
+    def _store(self, row: int, value: Any) -> None: ...
+
+    @abstractmethod
+    def _load(self, row: int) -> Any: ...
+
+
+class _IntColumn(_Column):
+    __slots__ = ("values",)
+
+    kind = "int"
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.values = array("q")
+
+    def _append_placeholder(self) -> None:
+        self.values.append(0)
+
+    def _store(self, row: int, value: Any) -> None:
+        self.values[row] = value
+
+    def _load(self, row: int) -> Any:
+        return self.values[row]
+
+
+class _FloatColumn(_Column):
+    __slots__ = ("values",)
+
+    kind = "float"
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.values = array("d")
+
+    def _append_placeholder(self) -> None:
+        self.values.append(0.0)
+
+    def _store(self, row: int, value: Any) -> None:
+        self.values[row] = value
+
+    def _load(self, row: int) -> Any:
+        return self.values[row]
+
+
+class _BoolColumn(_Column):
+    __slots__ = ("values",)
+
+    kind = "bool"
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.values = array("b")
+
+    def _append_placeholder(self) -> None:
+        self.values.append(0)
+
+    def _store(self, row: int, value: Any) -> None:
+        self.values[row] = 1 if value else 0
+
+    def _load(self, row: int) -> Any:
+        return self.values[row] == 1
+
+
+class _SymbolColumn(_Column):
+    __slots__ = ("symbols", "values")
+
+    kind = "symbol"
+
+    def __init__(self, name: str, symbols: SymbolTable) -> None:
+        super().__init__(name)
+        self.symbols = symbols
+        self.values = array("i")
+
+    def _append_placeholder(self) -> None:
+        self.values.append(0)
+
+    def _store(self, row: int, value: Any) -> None:
+        self.values[row] = self.symbols.intern(value)
+
+    def _load(self, row: int) -> Any:
+        return self.symbols[self.values[row]]
+
+
+class _TextColumn(_Column):
+    """High-cardinality strings such as timestamps, which gain nothing from interning."""
+
+    __slots__ = ("values",)
+
+    kind = "text"
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.values: list[str] = []
+
+    def _append_placeholder(self) -> None:
+        self.values.append("")
+
+    def _store(self, row: int, value: Any) -> None:
+        self.values[row] = value
+
+    def _load(self, row: int) -> Any:
+        return self.values[row]
+
+
+def _make_column(name: str, kind: ColumnKind, symbols: SymbolTable) -> _Column:
+    match kind:
+        case "int":
+            return _IntColumn(name)
+        case "float":
+            return _FloatColumn(name)
+        case "bool":
+            return _BoolColumn(name)
+        case "symbol":
+            return _SymbolColumn(name, symbols)
+        case "text":
+            return _TextColumn(name)
+
+
+class _Record:
+    """A bet stored as a shared key tuple plus its own value tuple."""
+
+    __slots__ = ("keys", "values")
+
+    def __init__(self, keys: tuple[str, ...], values: tuple[Any, ...]) -> None:
+        self.keys = keys
+        self.values = values
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(zip(self.keys, self.values, strict=True))
+
+
+class BetStore:
+    """Compact, de-duplicated collection of settled bets indexed by settlement time.
+
+    Bets are keyed by ``(kind, betId)``; adding a bet that is already stored replaces it when its
+    ``updateSequence`` is not older. Bets without a ``betId`` or without a ``settledAt``/``placedAt``
+    timestamp cannot be indexed and are ignored.
+    """
+
+    def __init__(self) -> None:
+        self.symbols = SymbolTable()
+        self._columns = tuple(_make_column(name, kind, self.symbols) for name, kind in STRAIGHT_BET_SCHEMA)
+        self._column_index = {column.name: index for index, column in enumerate(self._columns)}
+        self._straight_extras: list[_Record | None] = []
+        self._straight_layouts = array("i")
+        self._layouts: list[tuple[tuple[str, _Column | None], ...]] = []
+        self._layout_ids: dict[tuple[str, ...], int] = {}
+        self._records: list[_Record] = []
+        self._shapes: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+        self._kinds = array("b")
+        self._rows = array("i")
+        self._settled = array("d")
+        self._ids: tuple[dict[int, int], ...] = tuple({} for _ in BET_KINDS)
+        self._order: array[int] | None = None
+        self._sorted_settled: array[float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def add(self, kind: BetKind, bet: Mapping[str, Any]) -> bool:
+        """Add or replace a single bet. Returns True when the store changed."""
+        bet_id = bet.get("betId")
+        timestamp = bet.get("settledAt") or bet.get("placedAt")
+        if type(bet_id) is not int or not isinstance(timestamp, str):
+            return False
+
+        kind_index = BET_KINDS.index(kind)
+        settled = parse_timestamp(timestamp)
+        existing = self._ids[kind_index].get(bet_id)
+
+        if existing is not None:
+            if _update_sequence(bet) < _update_sequence(self.get(existing)):
+                return False
+            self._write(kind_index, self._rows[existing], bet)
+            self._settled[existing] = settled
+        else:
+            existing = len(self._kinds)
+            self._kinds.append(kind_index)
+            self._rows.append(self._allocate(kind_index))
+            self._settled.append(settled)
+            self._write(kind_index, self._rows[existing], bet)
+            self._ids[kind_index][bet_id] = existing
+
+        self._order = None
+        self._sorted_settled = None
+        return True
+
+    def extend(self, page: Mapping[str, Any]) -> int:
+        """Add every bet of an upstream ``BetsResponse`` page. Returns the number of bets stored."""
+        added = 0
+        for kind in BET_KINDS:
+            bets: list[Mapping[str, Any]] = page.get(kind) or []
+            for bet in bets:
+                added += self.add(kind, bet)
+        return added
+
+    def kind(self, index: int) -> BetKind:
+        return BET_KINDS[self._kinds[index]]
+
+    def settled_at(self, index: int) -> float:
+        return self._settled[index]
+
+    def get(self, index: int, fields: Collection[str] | None = None) -> dict[str, Any]:
+        """Materialize the bet at ``index`` back into its upstream dict shape.
+
+        When ``fields`` is given, only those keys are materialized.
+        """
+        row = self._rows[index]
+        if self._kinds[index] != 0:
+            record = self._records[row].to_dict()
+            return record if fields is None else {key: record[key] for key in fields if key in record}
+
+        bet: dict[str, Any] = {}
+        if fields is not None:
+            for name in fields:
+                present, value = self._straight_field(row, name)
+                if present:
+                    bet[name] = value
+            return bet
+
+        # The layout lists the bet's keys in their original order; keys without a stored column value
+        # take the extras in turn, as they were set aside in that same order.
+        extras = self._straight_extras[row]
+        extra_values = iter(extras.values if extras is not None else ())
+        for key, column in self._layouts[self._straight_layouts[row]]:
+            if column is not None:
+                present, value = column.get(row)
+                if present:
+                    bet[key] = value
+                    continue
+            bet[key] = next(extra_values)
+        return bet
+
+    def field(self, index: int, name: str) -> Any:
+        """Read a single field of the bet at ``index`` without materializing the whole bet."""
+        row = self._rows[index]
+        if self._kinds[index] != 0:
+            record = self._records[row]
+            return record.values[record.keys.index(name)] if name in record.keys else None
+        return self._straight_field(row, name)[1]
+
+    def select(self, start: float, end: float, predicate: BetPredicate | None = None) -> list[int]:
+        """Indices of bets settled in ``[start, end)`` (epoch seconds), ordered by settlement time.
+
+        ``predicate`` is evaluated against the stored columns, so filtered-out bets are never
+        materialized.
+        """
+        if self._order is None or self._sorted_settled is None:
+            settled = self._settled
+            self._order = array("i", sorted(range(len(settled)), key=settled.__getitem__))
+            self._sorted_settled = array("d", (settled[index] for index in self._order))
+        lo = bisect_left(self._sorted_settled, start)
+        hi = bisect_left(self._sorted_settled, end, lo)
+        indices = self._order[lo:hi].tolist()
+        if predicate is None:
+            return indices
+        return [index for index in indices if predicate(self.kind(index), partial(self.field, index))]
+
+    def to_response(
+        self, indices: Iterable[int], fields: Collection[str] | None = None
+    ) -> dict[BetKind, list[dict[str, Any]]]:
+        """Group the bets at ``indices`` by kind, in the shape of an upstream ``BetsResponse``."""
+        grouped: dict[BetKind, list[dict[str, Any]]] = {kind: [] for kind in BET_KINDS}
+        for index in indices:
+            grouped[BET_KINDS[self._kinds[index]]].append(self.get(index, fields))
+        return grouped
+
+    def _straight_field(self, row: int, name: str) -> tuple[bool, Any]:
+        column_index = self._column_index.get(name)
+        if column_index is not None:
+            present, value = self._columns[column_index].get(row)
+            if present:
+                return present, value
+        extras = self._straight_extras[row]
+        if extras is not None and name in extras.keys:
+            return True, extras.values[extras.keys.index(name)]
+        return False, None
+
+    def _allocate(self, kind_index: int) -> int:
+        if kind_index != 0:
+            self._records.append(_Record((), ()))
+            return len(self._records) - 1
+        for column in self._columns:
+            column.append_absent()
+        self._straight_extras.append(None)
+        self._straight_layouts.append(0)
+        return len(self._straight_extras) - 1
+
+    def _write(self, kind_index: int, row: int, bet: Mapping[str, Any]) -> None:
+        if kind_index != 0:
+            self._records[row] = self._record(bet.items())
+            return
+
+        for column in self._columns:
+            column.clear(row)
+        extras: list[tuple[str, Any]] = []
+        for key, value in bet.items():
+            column_index = self._column_index.get(key)
+            if column_index is None or not self._columns[column_index].set(row, value):
+                extras.append((key, value))
+        self._straight_extras[row] = self._record(extras) if extras else None
+        self._straight_layouts[row] = self._layout(tuple(bet))
+
+    def _layout(self, keys: tuple[str, ...]) -> int:
+        """Id of the layout with ``keys``, registered on first use; bets mostly share a handful."""
+        layout_id = self._layout_ids.get(keys)
+        if layout_id is None:
+            layout_id = self._layout_ids[keys] = len(self._layouts)
+            columns = {column.name: column for column in self._columns}
+            self._layouts.append(tuple((key, columns.get(key)) for key in keys))
+        return layout_id
+
+    def _record(self, items: Iterable[tuple[str, Any]]) -> _Record:
+        keys: list[str] = []
+        values: list[Any] = []
+        for key, value in items:
+            keys.append(key)
+            if type(value) is str and len(value) <= _MAX_INTERNED_LENGTH:
+                value = sys.intern(value)
+            values.append(value)
+        shape = tuple(keys)
+        return _Record(self._shapes.setdefault(shape, shape), tuple(values))
+
+
+def _update_sequence(bet: Mapping[str, Any]) -> int:
+    sequence = bet.get("updateSequence")
+    return sequence if type(sequence) is int else 0
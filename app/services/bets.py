@@ -0,0 +1,140 @@
+"""Fetching settled bets from upstream and the bet history cache."""
+
+import re
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import msgspec
+from ps3838api.api import PinnacleClient
+
+from app.core.config import get_settings
+from app.core.metrics import BET_CACHE_LOOKUPS, BET_FETCH_BETS, BET_FETCH_CHUNKS
+from app.core.timing import span
+from app.services.bet_cache import get_bet_cache
+from app.services.bet_filters import BetFilter, project
+from app.services.bet_store import BET_KINDS, BetKind
+from app.services.pinnacle import get_raw_bets
+
+MAX_CHUNK_SPAN = timedelta(days=29, hours=23)
+"""The upstream API requires the date range to be strictly less than 30 days."""
+
+
+def plan_chunks(from_date: datetime, to_date: datetime) -> list[tuple[datetime, datetime]]:
+    """Split a date range into chunks the upstream API accepts."""
+    chunks: list[tuple[datetime, datetime]] = []
+    current_date = from_date
+    while current_date < to_date:
+        chunk_end = min(current_date + MAX_CHUNK_SPAN, to_date)
+        chunks.append((current_date, chunk_end))
+        current_date = chunk_end
+    return chunks
+
+
+@dataclass(slots=True)
+class FetchedBets:
+    """Bets merged from every source, grouped by upstream response list.
+
+    ``raw`` holds the upstream bets kept as undecoded JSON, which all settled after those in ``bets``.
+    """
+
+    bets: dict[BetKind, list[dict[str, Any]]] = field(
+        default_factory=lambda: {kind: [] for kind in BET_KINDS}
+    )
+    raw: dict[BetKind, list[msgspec.Raw]] = field(default_factory=lambda: {kind: [] for kind in BET_KINDS})
+    more_available: bool = False
+    upstream_calls: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(len(bets) for bets in self.bets.values()) + sum(len(bets) for bets in self.raw.values())
+
+
+_decode_bet = msgspec.json.Decoder(dict[str, Any]).decode
+_NOT_ACCEPTED = re.compile(rb'"NOT_ACCEPTED"')
+
+
+def _matching_raw_bets(kind: BetKind, bets: list[msgspec.Raw], bet_filter: BetFilter) -> list[msgspec.Raw]:
+    """The raw ``bets`` matching ``bet_filter``, decoding only those the filter has to read."""
+    if bet_filter.reads_bets(kind):
+        return [bet for bet in bets if bet_filter.matches(kind, _decode_bet(bet).get)]
+    if kind != "straightBets":
+        return bets
+    # A bet whose JSON never mentions the status cannot be NOT_ACCEPTED.
+    return [
+        bet
+        for bet in bets
+        if _NOT_ACCEPTED.search(bet) is None or bet_filter.matches(kind, _decode_bet(bet).get)
+    ]
+
+
+def fetch_bets(
+    client: PinnacleClient,
+    from_date: datetime,
+    to_date: datetime,
+    bet_filter: BetFilter | None = None,
+    fields: Collection[str] | None = None,
+    raw: bool = False,
+) -> FetchedBets:
+    """Collect settled bets for ``[from_date, to_date)`` matching ``bet_filter``.
+
+    Closed ranges are served from the bet history cache, where the filter is evaluated against the
+    compact columns; only the gaps the cache does not cover yet are downloaded, unfiltered, so they
+    can be cached. The most recent, still settling, tail is always requested from upstream with as
+    much of the filter as the API supports. ``fields`` limits the keys of every returned bet.
+
+    With ``raw`` and no ``fields``, the upstream tail is kept in ``FetchedBets.raw`` as undecoded JSON
+    and only the bets the filter reads are decoded.
+    """
+    bet_filter = bet_filter or BetFilter()
+    result = FetchedBets()
+    live_from = from_date
+
+    settings = get_settings()
+    cached_to = min(to_date, datetime.now(timezone.utc) - settings.bet_cache_settle_lag)
+    if settings.bet_cache_enabled and cached_to > from_date:
+        cache = get_bet_cache()
+        gaps = cache.missing_ranges(from_date, cached_to)
+        BET_CACHE_LOOKUPS.labels(result="miss" if gaps else "hit").inc()
+        for gap_start, gap_end in gaps:
+            for chunk_start, chunk_end in plan_chunks(gap_start, gap_end):
+                chunk_bets = client.get_bets(betlist="SETTLED", from_date=chunk_start, to_date=chunk_end)
+                result.upstream_calls += 1
+                cache.add_page(chunk_bets)
+                if chunk_bets.get("moreAvailable", False):
+                    result.more_available = True
+                else:
+                    cache.mark_covered(chunk_start, chunk_end)
+        with span("cache"):
+            for kind, bets in cache.bets_between(from_date, cached_to, bet_filter.matches, fields).items():
+                result.bets[kind].extend(bets)
+        live_from = cached_to
+
+    upstream_params = bet_filter.upstream_params()
+    for chunk_start, chunk_end in plan_chunks(live_from, to_date):
+        if raw and fields is None:
+            page = get_raw_bets(
+                client, betlist="SETTLED", from_date=chunk_start, to_date=chunk_end, **upstream_params
+            )
+            result.upstream_calls += 1
+            result.more_available = result.more_available or page.moreAvailable
+            for kind in BET_KINDS:
+                if bet_filter.accepts_kind(kind):
+                    result.raw[kind].extend(_matching_raw_bets(kind, page.bets(kind), bet_filter))
+            continue
+        chunk_bets: Mapping[str, Any] = client.get_bets(
+            betlist="SETTLED", from_date=chunk_start, to_date=chunk_end, **upstream_params
+        )
+        result.upstream_calls += 1
+        result.more_available = result.more_available or chunk_bets.get("moreAvailable", False)
+        for kind in BET_KINDS:
+            if not bet_filter.accepts_kind(kind):
+                continue
+            result.bets[kind].extend(
+                project(bet, fields) for bet in chunk_bets.get(kind, []) if bet_filter.matches(kind, bet.get)
+            )
+
+    BET_FETCH_CHUNKS.observe(result.upstream_calls)
+    BET_FETCH_BETS.observe(result.total)
+    return result
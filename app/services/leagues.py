@@ -0,0 +1,33 @@
+"""Process-wide cache of the league list, which changes a few times a day at most."""
+
+import threading
+import time
+from datetime import timedelta
+from functools import cache
+
+from ps3838api.api import PinnacleClient
+from ps3838api.models.client import LeagueV3
+
+from app.core.config import get_settings
+
+
+class LeaguesCache:
+    def __init__(self, ttl: timedelta) -> None:
+        self.ttl = ttl.total_seconds()
+        self._leagues: list[LeagueV3] | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, client: PinnacleClient) -> list[LeagueV3]:
+        """The leagues of the client's default sport, fetched again once ``ttl`` has passed."""
+        # Held during the upstream call, so concurrent requests after expiry share a single one.
+        with self._lock:
+            if self._leagues is None or time.monotonic() >= self._expires_at:
+                self._leagues = client.get_leagues()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._leagues
+
+
+@cache
+def get_leagues_cache() -> LeaguesCache:
+    return LeaguesCache(get_settings().leagues_cache_ttl)
@@ -0,0 +1,129 @@
+import threading
+from functools import cache
+from typing import Any, Literal
+
+import msgspec
+from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import AccessBlockedError, PS3838APIError
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from app.core.config import get_settings
+from app.core.metrics import track_upstream
+from app.core.timing import span
+from app.services.bet_store import BetKind
+
+
+class RawBetsPage(msgspec.Struct):
+    """A ``/v3/bets`` response whose bets are left as undecoded JSON.
+
+    Each bet is a ``msgspec.Raw`` slice of the response body: it can be written to another JSON
+    document as is, or decoded on its own when something has to read it.
+    """
+
+    moreAvailable: bool = False
+    straightBets: list[msgspec.Raw] | None = None
+    parlayBets: list[msgspec.Raw] | None = None
+    teaserBets: list[msgspec.Raw] | None = None
+    specialBets: list[msgspec.Raw] | None = None
+    manualBets: list[msgspec.Raw] | None = None
+    code: str | None = None
+    message: str | None = None
+
+    def bets(self, kind: BetKind) -> list[msgspec.Raw]:
+        return getattr(self, kind) or []
+
+
+_any_decoder = msgspec.json.Decoder()
+_page_decoder = msgspec.json.Decoder(RawBetsPage)
+_raw_pages = threading.local()
+"""``raw_pages`` is set on the thread whose ``get_bets`` response is decoded as a RawBetsPage."""
+
+
+class InstrumentedPinnacleClient(PinnacleClient):
+    """PinnacleClient that records the latency and failures of every upstream call.
+
+    Responses are decoded with msgspec rather than ``Response.json()``, and ``get_raw_bets`` skips
+    decoding the bets altogether.
+
+    The client is shared by every request thread, so its session keeps up to ``pool_size`` upstream
+    connections open instead of the ``requests`` default of 10.
+    """
+
+    def __init__(self, *args: Any, pool_size: int = 10, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def _request(
+        self,
+        method: Literal["GET", "POST"],
+        endpoint: str,
+        *,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> Any:
+        with track_upstream(endpoint), span("upstream"):
+            return super()._request(method, endpoint, params=params, body=body)
+
+    def _handle_response(self, response: Response) -> Any:
+        if getattr(_raw_pages, "raw_pages", False):
+            page = self._decode(response, _page_decoder)
+            if page.code is not None and page.message is not None:
+                raise PS3838APIError(code=page.code, message=page.message)
+            return page
+        result = self._decode(response, _any_decoder)
+        match result:
+            case {"code": str(code), "message": str(message)}:
+                raise PS3838APIError(code=code, message=message)
+            case _:
+                return result
+
+    def _decode[T](self, response: Response, decoder: msgspec.json.Decoder[T]) -> T:
+        if not response.ok:
+            # Error responses are rare and mapped to exceptions by the base client.
+            super()._handle_response(response)
+        try:
+            return decoder.decode(response.content)
+        except msgspec.DecodeError as exc:
+            raise AccessBlockedError("Empty response") from exc
+
+    def get_raw_bets(self, **params: Any) -> RawBetsPage:
+        """``get_bets(**params)`` with every bet left as raw JSON.
+
+        The parameters are checked and sent by the library's ``get_bets``; only decoding the response
+        differs.
+        """
+        _raw_pages.raw_pages = True
+        try:
+            page: Any = self.get_bets(**params)
+        finally:
+            _raw_pages.raw_pages = False
+        return page
+
+
+def get_raw_bets(client: PinnacleClient, **params: Any) -> RawBetsPage:
+    """``client.get_bets(**params)`` as a RawBetsPage.
+
+    Clients other than InstrumentedPinnacleClient, like test stand-ins, have their decoded response
+    encoded again.
+    """
+    if isinstance(client, InstrumentedPinnacleClient):
+        return client.get_raw_bets(**params)
+    return _page_decoder.decode(msgspec.json.encode(client.get_bets(**params)))
+
+
+@cache
+def get_pinnacle_client() -> PinnacleClient:
+    """The process-wide client, created on first use.
+
+    Sharing it lets every request reuse the client's pooled upstream connections.
+    """
+    settings = get_settings()
+    return InstrumentedPinnacleClient(
+        login=settings.PS3838_LOGIN,
+        password=settings.PS3838_PASSWORD,
+        api_base_url=settings.PS3838_API_BASE_URL,
+        pool_size=settings.upstream_pool_size,
+    )
@@ -0,0 +1,171 @@
+"""Readiness of this worker to take traffic.
+
+``/health`` only says the process is alive. ``/ready`` says whether the worker should get traffic: it
+turns ready once the start-up warm-up has opened the database pool and filled the caches, and stays
+ready while the database answers. The checks run in the background every ``readiness_check_interval``,
+so probes never wait on the database or upstream. A failing upstream is reported as degraded but keeps
+the worker in rotation, since every worker would be equally affected.
+
+The bet history cache starts from its snapshot when there is one, so only the bets settled after it are
+fetched on startup.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import Literal
+
+from fastapi.concurrency import run_in_threadpool
+from ps3838api.api import PinnacleClient
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.security import warm_api_key_cache
+from app.db.database import get_engine
+from app.services.bet_cache import get_bet_cache
+from app.services.bets import fetch_bets
+from app.services.leagues import get_leagues_cache
+
+logger = logging.getLogger(__name__)
+
+type CheckName = Literal["database", "upstream"]
+type ReadinessStatus = Literal["warming_up", "ready", "degraded", "not_ready"]
+
+
+@dataclass(slots=True, frozen=True)
+class CheckResult:
+    ok: bool
+    checked_at: datetime
+    duration: float
+    error: str | None = None
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self.warmed_up = False
+        self.checks: dict[CheckName, CheckResult] = {}
+
+    @property
+    def status(self) -> ReadinessStatus:
+        if not self.warmed_up:
+            return "warming_up"
+        database = self.checks.get("database")
+        if database is None or not database.ok:
+            return "not_ready"
+        upstream = self.checks.get("upstream")
+        if upstream is not None and not upstream.ok:
+            return "degraded"
+        return "ready"
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "degraded")
+
+    async def run_check(self, name: CheckName, check: Callable[[], Awaitable[object]]) -> CheckResult:
+        checked_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            await check()
+        except Exception as exc:
+            result = CheckResult(False, checked_at, time.perf_counter() - started, repr(exc))
+        else:
+            result = CheckResult(True, checked_at, time.perf_counter() - started)
+        if not result.ok and self.checks.get(name, result).ok:
+            logger.warning(f"Readiness check {name} failed: {result.error}")
+        self.checks[name] = result
+        return result
+
+    async def refresh(self, client_factory: Callable[[], PinnacleClient]) -> None:
+        await asyncio.gather(
+            self.run_check("database", check_database),
+            self.run_check("upstream", lambda: check_upstream(client_factory)),
+        )
+
+
+async def check_database() -> None:
+    async with get_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def check_upstream(client_factory: Callable[[], PinnacleClient]) -> None:
+    await run_in_threadpool(client_factory().get_client_balance)
+
+
+async def warm_database_pool(size: int) -> None:
+    """Open ``size`` connections at once, so they are pooled before the first requests arrive."""
+    engine = get_engine()
+    async with AsyncExitStack() as stack:
+        for _ in range(size):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+
+async def warm_recent_bets(client_factory: Callable[[], PinnacleClient], since: datetime) -> None:
+    """Fetch the bets settled since ``since``, which leaves their closed part in the bet history cache."""
+    await run_in_threadpool(fetch_bets, client_factory(), since, datetime.now(timezone.utc))
+
+
+async def warm_bet_cache(client_factory: Callable[[], PinnacleClient]) -> None:
+    """Map the bet cache snapshot and fetch the bets settled after it, or the last ``warmup_bet_days``."""
+    settings = get_settings()
+    since: datetime | None = None
+    path = settings.bet_cache_snapshot_path
+    if path is not None and path.exists():
+        try:
+            snapshot = await run_in_threadpool(get_bet_cache().load_snapshot, path)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring bet cache snapshot {path}: {exc}")
+        else:
+            logger.info(f"Mapped {len(snapshot)} bets from {path}")
+            if snapshot.watermark is not None:
+                since = datetime.fromtimestamp(snapshot.watermark, timezone.utc)
+    if since is None and settings.warmup_bet_days > 0:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.warmup_bet_days)
+    if since is not None:
+        await warm_recent_bets(client_factory, since)
+
+
+async def _warm(name: str, step: Callable[[], Awaitable[object]]) -> None:
+    started = time.perf_counter()
+    try:
+        await step()
+    except Exception as exc:
+        # A cold cache only makes the first requests slower; the checks decide whether to serve.
+        logger.warning(f"Warming up {name} failed: {exc!r}")
+    else:
+        logger.info(f"Warmed up {name} in {time.perf_counter() - started:.2f}s")
+
+
+async def warm_up(readiness: Readiness, client_factory: Callable[[], PinnacleClient]) -> None:
+    """Open the database pool and fill the caches, then run the first checks and report ready."""
+    settings = get_settings()
+    steps = [
+        _warm("database pool", lambda: warm_database_pool(settings.db_pool_size)),
+        _warm("API key cache", warm_api_key_cache),
+        _warm("leagues", lambda: run_in_threadpool(get_leagues_cache().get, client_factory())),
+    ]
+    if settings.bet_cache_enabled:
+        steps.append(_warm("bet cache", lambda: warm_bet_cache(client_factory)))
+    await asyncio.gather(*steps)
+    await readiness.refresh(client_factory)
+    readiness.warmed_up = True
+    logger.info(f"Worker is {readiness.status}")
+
+
+async def check_readiness_periodically(
+    readiness: Readiness, client_factory: Callable[[], PinnacleClient], interval: timedelta
+) -> None:
+    await warm_up(readiness, client_factory)
+    while True:
+        await asyncio.sleep(interval.total_seconds())
+        await readiness.refresh(client_factory)
+
+
+@cache
+def get_readiness() -> Readiness:
+    return Readiness()
@@ -0,0 +1,292 @@
+"""Daily bet rollups for long-range summaries.
+
+Every closed UTC day is rolled up once into ``bet_daily_rollups``, per sport, league and bet type. A
+summary over any range reads the rollups for the whole days it covers and only aggregates raw bets for
+the partial days at its edges and for the days not rolled up yet, so its cost depends on the number of
+days and groups rather than on the number of bets.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import BasePS3838Error
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.database import get_session_maker
+from app.db.models import BetDailyRollup, RollupWatermark
+from app.schemas.requests import SummaryDimension
+from app.services.bet_filters import KIND_BET_TYPES, BetFilter
+from app.services.bet_store import BetKind, parse_timestamp
+from app.services.bets import fetch_bets
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "bet_daily_rollups"
+
+MAX_REFRESH_SPAN = timedelta(days=30)
+"""Days rolled up per transaction, bounding the bets held in memory while catching up."""
+
+type RollupKey = tuple[date, int, int, str]
+
+DIMENSIONS: tuple[SummaryDimension, ...] = ("day", "sport", "league", "bet_type")
+_DIMENSION_COLUMNS = {
+    "day": BetDailyRollup.day,
+    "sport": BetDailyRollup.sport_id,
+    "league": BetDailyRollup.league_id,
+    "bet_type": BetDailyRollup.bet_type,
+}
+_ACCEPTED = BetFilter()
+
+
+@dataclass(slots=True)
+class Totals:
+    bet_count: int = 0
+    risk: float = 0.0
+    win_loss: float = 0.0
+    profit_stakes: float = 0.0
+
+    def add_bet(self, risk: float, win_loss: float) -> None:
+        self.bet_count += 1
+        self.risk += risk
+        self.win_loss += win_loss
+        # Same convention as the spreadsheet importer: a bet without a risk counts as one stake.
+        self.profit_stakes += win_loss / (risk or 1)
+
+    def merge(self, other: "Totals") -> None:
+        self.bet_count += other.bet_count
+        self.risk += other.risk
+        self.win_loss += other.win_loss
+        self.profit_stakes += other.profit_stakes
+
+
+@dataclass(slots=True)
+class BetsSummary:
+    groups: dict[tuple[Any, ...], Totals] = field(default_factory=dict[tuple[Any, ...], Totals])
+    rolled_up_to: datetime | None = None
+
+    def add(self, key: tuple[Any, ...], totals: Totals) -> None:
+        self.groups.setdefault(key, Totals()).merge(totals)
+
+    @property
+    def total(self) -> Totals:
+        total = Totals()
+        for totals in self.groups.values():
+            total.merge(totals)
+        return total
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, int | float) else 0.0
+
+
+def _start_of_day(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_key(kind: BetKind, bet: Mapping[str, Any]) -> RollupKey | None:
+    """The rollup row ``bet`` belongs to, or None for bets that are not counted."""
+    if not _ACCEPTED.matches(kind, bet.get):
+        return None
+    settled_at = bet.get("settledAt") or bet.get("placedAt")
+    if not isinstance(settled_at, str):
+        return None
+    day = datetime.fromtimestamp(parse_timestamp(settled_at), timezone.utc).date()
+    sport_id = bet.get("sportId")
+    league_id = bet.get("leagueId")
+    return (
+        day,
+        sport_id if type(sport_id) is int else 0,
+        league_id if type(league_id) is int else 0,
+        bet.get("betType") or KIND_BET_TYPES.get(kind) or "UNKNOWN",
+    )
+
+
+def aggregate_bets(bets: Mapping[BetKind, Iterable[Mapping[str, Any]]]) -> dict[RollupKey, Totals]:
+    """Roll up settled bets by day, sport, league and bet type."""
+    rollups: dict[RollupKey, Totals] = {}
+    for kind, kind_bets in bets.items():
+        for bet in kind_bets:
+            key = rollup_key(kind, bet)
+            if key is not None:
+                rollups.setdefault(key, Totals()).add_bet(
+                    _number(bet.get("risk")), _number(bet.get("winLoss"))
+                )
+    return rollups
+
+
+def split_range(
+    from_date: datetime, to_date: datetime, rolled_up_to: datetime | None
+) -> tuple[tuple[date, date] | None, list[tuple[datetime, datetime]]]:
+    """Split ``[from_date, to_date)`` into whole rolled-up days and the raw ranges around them.
+
+    Returns the ``[first, end)`` days to read from the rollups, if any, and the ranges to aggregate
+    from raw bets.
+    """
+    first_day = _start_of_day(from_date)
+    if first_day < from_date:
+        first_day += timedelta(days=1)
+    end_day = _start_of_day(to_date)
+    if rolled_up_to is not None:
+        end_day = min(end_day, rolled_up_to)
+    if rolled_up_to is None or first_day >= end_day:
+        return None, [(from_date, to_date)]
+
+    raw_ranges: list[tuple[datetime, datetime]] = []
+    if from_date < first_day:
+        raw_ranges.append((from_date, first_day))
+    if end_day < to_date:
+        raw_ranges.append((end_day, to_date))
+    return (first_day.date(), end_day.date()), raw_ranges
+
+
+def _group_key(key: RollupKey, group_by: Sequence[SummaryDimension]) -> tuple[Any, ...]:
+    return tuple(key[DIMENSIONS.index(dimension)] for dimension in group_by)
+
+
+async def get_rolled_up_to(db: AsyncSession) -> datetime | None:
+    return await db.scalar(select(RollupWatermark.rolled_up_to).where(RollupWatermark.name == WATERMARK_NAME))
+
+
+async def summarize_bets(
+    db: AsyncSession,
+    client: PinnacleClient,
+    from_date: datetime,
+    to_date: datetime,
+    group_by: Sequence[SummaryDimension] = (),
+    bet_filter: BetFilter | None = None,
+) -> BetsSummary:
+    """Totals of the bets settled in ``[from_date, to_date)``, grouped by ``group_by``.
+
+    ``bet_filter`` may only restrict sports, leagues and bet types, the dimensions the rollups keep.
+    """
+    bet_filter = bet_filter or BetFilter()
+    rolled_up_to = await get_rolled_up_to(db)
+    if rolled_up_to is not None:
+        rolled_up_to = rolled_up_to.astimezone(timezone.utc)
+    summary = BetsSummary(rolled_up_to=rolled_up_to)
+    rollup_days, raw_ranges = split_range(from_date, to_date, rolled_up_to)
+
+    if rollup_days is not None:
+        columns = [_DIMENSION_COLUMNS[dimension] for dimension in group_by]
+        query = (
+            select(
+                *columns,
+                func.sum(BetDailyRollup.bet_count),
+                func.sum(BetDailyRollup.risk),
+                func.sum(BetDailyRollup.win_loss),
+                func.sum(BetDailyRollup.profit_stakes),
+            )
+            .where(BetDailyRollup.day >= rollup_days[0], BetDailyRollup.day < rollup_days[1])
+            .group_by(*columns)
+        )
+        if bet_filter.sport_ids is not None:
+            query = query.where(BetDailyRollup.sport_id.in_(bet_filter.sport_ids))
+        if bet_filter.league_ids is not None:
+            query = query.where(BetDailyRollup.league_id.in_(bet_filter.league_ids))
+        if bet_filter.bet_types is not None:
+            query = query.where(BetDailyRollup.bet_type.in_(bet_filter.bet_types))
+        for row in await db.execute(query):
+            *key, bet_count, risk, win_loss, profit_stakes = row
+            if bet_count:
+                summary.add(tuple(key), Totals(bet_count, risk, win_loss, profit_stakes))
+
+    for range_start, range_end in raw_ranges:
+        fetched = await run_in_threadpool(fetch_bets, client, range_start, range_end, bet_filter)
+        for key, totals in aggregate_bets(fetched.bets).items():
+            summary.add(_group_key(key, group_by), totals)
+    return summary
+
+
+async def _refresh_span(client: PinnacleClient, closed_until: datetime) -> bool:
+    """Roll up the next span of closed days. False when there is nothing to do.
+
+    The bets are fetched outside any transaction; the rollups are written only if the watermark is
+    still where it was read, so a worker that lost the race discards its fetch.
+    """
+    settings = get_settings()
+    async with get_session_maker()() as db:
+        read = (
+            await db.execute(
+                select(RollupWatermark.rolled_up_to).where(RollupWatermark.name == WATERMARK_NAME)
+            )
+        ).one_or_none()
+    if read is None:
+        return False
+    rolled_up_to = read[0]
+    start = (
+        rolled_up_to.astimezone(timezone.utc)
+        if rolled_up_to is not None
+        else _start_of_day(settings.rollup_start or settings.api_gained_access)
+    )
+    if start >= closed_until:
+        return False
+    end = min(start + MAX_REFRESH_SPAN, closed_until)
+
+    fetched = await run_in_threadpool(fetch_bets, client, start, end)
+    if fetched.more_available:
+        logger.warning(f"Upstream truncated bets between {start} and {end}; rollups not advanced")
+        return False
+
+    async with get_session_maker()() as db:
+        # Workers that find the row locked or moved leave the refresh to whoever got there first.
+        watermark = await db.scalar(
+            select(RollupWatermark)
+            .where(RollupWatermark.name == WATERMARK_NAME)
+            .with_for_update(skip_locked=True)
+        )
+        if watermark is None or watermark.rolled_up_to != rolled_up_to:
+            return False
+        await db.execute(
+            delete(BetDailyRollup).where(BetDailyRollup.day >= start.date(), BetDailyRollup.day < end.date())
+        )
+        db.add_all(
+            BetDailyRollup(
+                day=day,
+                sport_id=sport_id,
+                league_id=league_id,
+                bet_type=bet_type,
+                bet_count=totals.bet_count,
+                risk=totals.risk,
+                win_loss=totals.win_loss,
+                profit_stakes=totals.profit_stakes,
+            )
+            for (day, sport_id, league_id, bet_type), totals in aggregate_bets(fetched.bets).items()
+        )
+        watermark.rolled_up_to = end
+        await db.commit()
+        logger.info(f"Rolled up bets settled between {start} and {end}")
+        return True
+
+
+async def refresh_rollups(client: PinnacleClient, now: datetime | None = None) -> None:
+    """Roll up every day that closed since the last refresh.
+
+    A day is closed once its bets can no longer change, ``bet_cache_settle_lag`` after it ended.
+    """
+    now = now or datetime.now(timezone.utc)
+    closed_until = _start_of_day(now - get_settings().bet_cache_settle_lag)
+    while await _refresh_span(client, closed_until):
+        pass
+
+
+async def refresh_rollups_periodically(
+    client_factory: Callable[[], PinnacleClient], interval: timedelta
+) -> None:
+    while True:
+        try:
+            await refresh_rollups(client_factory())
+        except (BasePS3838Error, requests.RequestException, SQLAlchemyError) as exc:
+            logger.warning(f"Rollup refresh failed: {exc!r}")
+        except Exception:
+            logger.exception("Unexpected error in rollup refresh")
+        await asyncio.sleep(interval.total_seconds())
@@ -0,0 +1,175 @@
+"""Push feed of newly settled bets and balance changes.
+
+A single poller per process asks upstream for recently settled bets and the client balance, and fans
+out what changed to every subscriber. Each subscriber has a bounded buffer; a subscriber that does
+not keep up loses its oldest events and is told how many it missed, instead of slowing down the
+poller or the other subscribers.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import Any, Literal
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+from ps3838api.api import PinnacleClient
+from ps3838api.models.errors import BasePS3838Error
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+from app.services.bet_store import BET_KINDS
+from app.services.pinnacle import get_pinnacle_client
+
+logger = logging.getLogger(__name__)
+
+type FeedEventType = Literal["bet", "balance", "lagged"]
+
+
+@dataclass(slots=True, frozen=True)
+class FeedEvent:
+    event: FeedEventType
+    data: Any
+
+    def encode(self) -> bytes:
+        """Server-Sent Events wire format."""
+        return b"event: " + self.event.encode() + b"\ndata: " + to_json(self.data) + b"\n\n"
+
+
+class Subscription:
+    """Bounded per-subscriber buffer that drops its oldest events when full."""
+
+    def __init__(self, buffer_size: int) -> None:
+        self._queue: asyncio.Queue[FeedEvent] = asyncio.Queue(buffer_size)
+        self.dropped = 0
+
+    def publish(self, event: FeedEvent) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self) -> FeedEvent:
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return FeedEvent("lagged", {"dropped": dropped})
+        return await self._queue.get()
+
+
+class SettlementFeed:
+    """Shares one upstream poller between all subscribers of this process.
+
+    The poller runs only while somebody is subscribed. Its first poll after starting only records
+    what is already settled, so subscribers receive bets settled after they connected.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], PinnacleClient],
+        poll_interval: timedelta,
+        lookback: timedelta,
+        buffer_size: int,
+    ) -> None:
+        self._client_factory = client_factory
+        self._client: PinnacleClient | None = None
+        self._poll_interval = poll_interval.total_seconds()
+        self._lookback = lookback
+        self._buffer_size = buffer_size
+        self._subscribers: set[Subscription] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._seen: dict[tuple[int, int], tuple[int, float]] = {}
+        self._balance: Mapping[str, Any] | None = None
+        self._primed = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncGenerator[Subscription]:
+        subscription = Subscription(self._buffer_size)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                await self.close()
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        self._primed = False
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                events = await run_in_threadpool(self.poll)
+            except (BasePS3838Error, requests.RequestException) as exc:
+                logger.warning(f"Settlement feed poll failed: {exc!r}")
+            except Exception:
+                # Keep the shared poller alive for the other subscribers whatever goes wrong.
+                logger.exception("Unexpected error in settlement feed poll")
+            else:
+                for event in events:
+                    for subscription in self._subscribers:
+                        subscription.publish(event)
+            await asyncio.sleep(self._poll_interval)
+
+    def poll(self) -> list[FeedEvent]:
+        """Fetch recent settlements and the balance once, returning what changed since the last poll."""
+        if self._client is None:
+            self._client = self._client_factory()
+        now = datetime.now(timezone.utc)
+        events: list[FeedEvent] = []
+
+        page: Mapping[str, Any] = self._client.get_bets(
+            betlist="SETTLED", from_date=now - self._lookback, to_date=now
+        )
+        for kind_index, kind in enumerate(BET_KINDS):
+            bets: list[Mapping[str, Any]] = page.get(kind) or []
+            for bet in bets:
+                bet_id = bet.get("betId")
+                if type(bet_id) is not int or bet.get("betStatus") == "NOT_ACCEPTED":
+                    continue
+                sequence = bet.get("updateSequence")
+                sequence = sequence if type(sequence) is int else 0
+                previous = self._seen.get((kind_index, bet_id))
+                if previous is None or sequence > previous[0]:
+                    self._seen[(kind_index, bet_id)] = (sequence, now.timestamp())
+                    if self._primed:
+                        events.append(FeedEvent("bet", {"kind": kind, "bet": bet}))
+
+        balance: Mapping[str, Any] = self._client.get_client_balance()
+        if balance != self._balance:
+            if self._primed:
+                events.append(FeedEvent("balance", balance))
+            self._balance = balance
+
+        # Bets first seen more than two lookback windows ago can no longer be returned by upstream.
+        horizon = (now - 2 * self._lookback).timestamp()
+        self._seen = {key: value for key, value in self._seen.items() if value[1] >= horizon}
+        self._primed = True
+        return events
+
+
+@cache
+def get_settlement_feed() -> SettlementFeed:
+    settings = get_settings()
+    return SettlementFeed(
+        client_factory=get_pinnacle_client,
+        poll_interval=settings.feed_poll_interval,
+        lookback=settings.feed_lookback,
+        buffer_size=settings.feed_buffer_size,
+    )
@@ -0,0 +1,55 @@
+"""Shared fixtures of the benchmark suite.
+
+Run with ``uv run pytest benchmarks``; see the README for comparing against a baseline.
+"""
+
+from collections.abc import Callable
+from typing import Any, cast
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.core.config import get_settings
+from tests.fakes import make_straight_bet
+
+DEFAULT_BET_COUNTS = "1000,100000,1000000"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--bet-counts",
+        default=DEFAULT_BET_COUNTS,
+        help="Comma-separated numbers of synthetic bets for the size-dependent benchmarks.",
+    )
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "bet_count" in metafunc.fixturenames:
+        counts = [int(count) for count in metafunc.config.getoption("--bet-counts").split(",")]
+        metafunc.parametrize("bet_count", counts, ids=[f"{count}bets" for count in counts])
+
+
+@pytest.fixture(autouse=True)
+def no_bet_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "bet_cache_enabled", False)
+
+
+def make_bets(count: int) -> list[dict[str, Any]]:
+    return [make_straight_bet(bet_id) for bet_id in range(1, count + 1)]
+
+
+def rounds_for(bet_count: int) -> int:
+    """Fewer rounds for the large sizes, which take seconds each."""
+    return max(3, min(20, 500_000 // bet_count))
+
+
+def measure[T](
+    benchmark: BenchmarkFixture, target: Callable[..., T], *args: Any, rounds: int | None = None
+) -> T:
+    """Benchmark ``target(*args)`` and return its result.
+
+    Without ``rounds`` the number of rounds is calibrated automatically, which suits fast functions.
+    """
+    if rounds is None:
+        return cast(T, benchmark(target, *args))
+    return cast(T, benchmark.pedantic(target, args=args, rounds=rounds, warmup_rounds=1))  # pyright: ignore[reportUnknownMemberType]
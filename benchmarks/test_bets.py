@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import msgspec
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.api.routes.common import bets_json, build_bets_response, json_response
+from app.schemas import BetsResponseModel
+from app.services.bets import FetchedBets, fetch_bets, plan_chunks
+from benchmarks.conftest import make_bets, measure, rounds_for
+from tests.fakes import FakePinnacleClient
+
+FROM_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+TO_DATE = FROM_DATE + timedelta(days=365)
+
+
+def paged_client(bets: list[dict[str, Any]]) -> FakePinnacleClient:
+    """Serves pre-built pages, spreading the bets evenly over the chunks of a year."""
+    chunk_count = len(plan_chunks(FROM_DATE, TO_DATE))
+    size = -(-len(bets) // chunk_count)
+    return FakePinnacleClient(
+        pages=[
+            {"moreAvailable": False, "straightBets": bets[start : start + size]}
+            for start in range(0, chunk_count * size, size)
+        ]
+    )
+
+
+@pytest.fixture
+def fetched(bet_count: int) -> FetchedBets:
+    result = FetchedBets()
+    result.bets["straightBets"] = make_bets(bet_count)
+    return result
+
+
+def test_plan_chunks_multi_year(benchmark: BenchmarkFixture):
+    chunks = measure(benchmark, plan_chunks, FROM_DATE, FROM_DATE + timedelta(days=5 * 365))
+
+    assert len(chunks) == 61
+
+
+def test_fetch_bets_merge(benchmark: BenchmarkFixture, bet_count: int):
+    client: Any = paged_client(make_bets(bet_count))
+
+    result = measure(benchmark, fetch_bets, client, FROM_DATE, TO_DATE, rounds=rounds_for(bet_count))
+
+    assert result.total == bet_count
+
+
+def test_build_bets_response(benchmark: BenchmarkFixture, fetched: FetchedBets, bet_count: int):
+    response = measure(benchmark, build_bets_response, fetched, rounds=rounds_for(bet_count))
+
+    assert len(response.straightBets) == bet_count
+
+
+def test_serialize_bets_response(benchmark: BenchmarkFixture, fetched: FetchedBets, bet_count: int):
+    model: BetsResponseModel = build_bets_response(fetched)
+
+    response = measure(benchmark, json_response, model, rounds=rounds_for(bet_count))
+
+    assert bytes(response.body).startswith(b'{"moreAvailable":false')
+
+
+def test_splice_raw_bets(benchmark: BenchmarkFixture, bet_count: int):
+    raw = FetchedBets()
+    raw.raw["straightBets"] = msgspec.json.decode(
+        msgspec.json.encode(make_bets(bet_count)), type=list[msgspec.Raw]
+    )
+
+    body = measure(benchmark, bets_json, raw, rounds=rounds_for(bet_count))
+
+    assert body.startswith(b'{"moreAvailable":false')
@@ -0,0 +1,14 @@
+from datetime import datetime, timezone
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.api.routes.billing import _get_billing_period_bounds  # pyright: ignore[reportPrivateUsage]
+from benchmarks.conftest import measure
+
+NOW = datetime(2026, 3, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+
+def test_billing_period_bounds(benchmark: BenchmarkFixture):
+    start, end = measure(benchmark, _get_billing_period_bounds, "PREVIOUS", 31, (7, 5, 33), NOW)
+
+    assert start < end
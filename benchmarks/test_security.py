@@ -0,0 +1,46 @@
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.security import get_api_key_cache, verify_api_key
+from app.db.models import APIKey
+from benchmarks.conftest import measure
+
+KEY_COUNT = 10_000
+
+
+@pytest.fixture
+def session(tmp_path: Path) -> Iterator[tuple[asyncio.Runner, AsyncSession]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'keys.db'}")
+
+    async def populate() -> None:
+        async with engine.begin() as connection:
+            await connection.run_sync(APIKey.metadata.create_all)
+        async with async_sessionmaker(engine)() as db:
+            db.add_all(APIKey(key=f"key-{index:05d}") for index in range(KEY_COUNT))
+            await db.commit()
+
+    with asyncio.Runner() as runner:
+        runner.run(populate())
+        db = async_sessionmaker(engine)()
+        yield runner, db
+        runner.run(db.close())
+        runner.run(engine.dispose())
+
+
+def test_verify_api_key_sqlite(
+    benchmark: BenchmarkFixture, session: tuple[asyncio.Runner, AsyncSession], monkeypatch: pytest.MonkeyPatch
+):
+    runner, db = session
+    # Measure the database lookup rather than the in-process key cache.
+    monkeypatch.setattr(get_api_key_cache(), "ttl", 0)
+
+    key = f"key-{KEY_COUNT // 2:05d}"
+
+    api_key = measure(benchmark, lambda: runner.run(verify_api_key(key, db)))
+
+    assert api_key.is_active
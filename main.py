@@ -2,8 +2,9 @@ from datetime import datetime, timedelta, timezone
 
 from ps3838api.api import PinnacleClient
 
-from app.core.config import settings
+from app.core.config import get_settings
 
+settings = get_settings()
 client = PinnacleClient(settings.PS3838_LOGIN, settings.PS3838_PASSWORD, settings.PS3838_API_BASE_URL)
 
 
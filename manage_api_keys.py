@@ -1,11 +1,49 @@
+"""Manage the API keys clients authenticate with.
+
+Besides the single-key commands, keys can be handled in bulk, each bulk command in one transaction:
+``import`` reads keys from a file or stdin, ``generate`` creates new ones, ``deactivate-bulk`` retires
+keys by pattern or age, and ``list --format json|csv`` streams every key without loading it into an
+ORM object.
+"""
+
+import argparse
+import csv
+import io
+import json
 import secrets
 import sys
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, TextIO, cast
 
+from sqlalchemy import (
+    Column,
+    CursorResult,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.db.database import get_sync_session_maker
 from app.db.models import APIKey
 
+MAX_KEY_LENGTH = 255
+"""Length of the ``api_keys.key`` column."""
+
+LOOKUP_CHUNK_SIZE = 500
+"""Keys checked for existence per query when importing without COPY."""
+
+STREAM_BATCH_SIZE = 1000
+"""Rows fetched at a time when listing."""
+
 
 def create_api_key() -> str:
     return secrets.token_urlsafe(32)
@@ -31,19 +69,139 @@ def add_key(db: Session, key: str | None = None) -> str:
     return key
 
 
-def list_keys(db: Session) -> None:
-    keys = db.query(APIKey).all()
-    if not keys:
-        print("No API keys found.")
+def read_keys(lines: Iterable[str]) -> list[str]:
+    """Keys listed one per line, without blank lines and repeated keys.
+
+    Exits with an error when a key does not fit the database column.
+    """
+    keys: dict[str, None] = {}
+    for number, line in enumerate(lines, start=1):
+        key = line.strip()
+        if not key:
+            continue
+        if len(key) > MAX_KEY_LENGTH:
+            print(f"Error: API key on line {number} is longer than {MAX_KEY_LENGTH} characters")
+            sys.exit(1)
+        keys[key] = None
+    return list(keys)
+
+
+def _copy_new_keys(db: Session, keys: Sequence[str], created_at: datetime) -> int:
+    """Insert ``keys`` on PostgreSQL: COPY them into a staging table, then insert the new ones."""
+    staging = Table(
+        "api_key_import",
+        MetaData(),
+        Column("key", String(MAX_KEY_LENGTH), nullable=False),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    connection = db.connection()
+    staging.create(connection)
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([key] for key in keys)
+    buffer.seek(0)
+    driver_connection: Any = connection.connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {staging.name} (key) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    result = db.execute(
+        postgresql_insert(APIKey)
+        .from_select(["key", "is_active", "created_at"], select(staging.c.key, true(), literal(created_at)))
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    return cast(CursorResult[Any], result).rowcount
+
+
+def _insert_new_keys(db: Session, keys: Sequence[str], created_at: datetime) -> int:
+    """Insert the ``keys`` that do not exist yet, for databases without COPY."""
+    existing: set[str] = set()
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start : start + LOOKUP_CHUNK_SIZE]
+        existing.update(db.scalars(select(APIKey.key).where(APIKey.key.in_(chunk))))
+    new_keys = [key for key in keys if key not in existing]
+    if new_keys:
+        db.execute(
+            insert(APIKey),
+            [{"key": key, "is_active": True, "created_at": created_at} for key in new_keys],
+        )
+    return len(new_keys)
+
+
+def import_keys(db: Session, keys: Sequence[str]) -> int:
+    """Add ``keys`` in one transaction, skipping the ones that exist. Returns the number added."""
+    created_at = datetime.now(timezone.utc)
+    if db.get_bind().dialect.name == "postgresql":
+        added = _copy_new_keys(db, keys, created_at)
+    else:
+        added = _insert_new_keys(db, keys, created_at)
+    db.commit()
+    return added
+
+
+def generate_keys(db: Session, count: int) -> list[str]:
+    """Create ``count`` new active keys in one transaction."""
+    keys = [create_api_key() for _ in range(count)]
+    import_keys(db, keys)
+    return keys
+
+
+def deactivate_keys(
+    db: Session, pattern: str | None = None, older_than: timedelta | None = None, dry_run: bool = False
+) -> int:
+    """Deactivate the active keys matching the SQL LIKE ``pattern`` and created over ``older_than`` ago.
+
+    Returns the number of keys deactivated, or that would be with ``dry_run``.
+    """
+    statement = update(APIKey).where(APIKey.is_active.is_(True)).values(is_active=False)
+    if pattern is not None:
+        statement = statement.where(APIKey.key.like(pattern))
+    if older_than is not None:
+        statement = statement.where(APIKey.created_at < datetime.now(timezone.utc) - older_than)
+    count = cast(CursorResult[Any], db.execute(statement)).rowcount
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return count
+
+
+def iter_keys(db: Session) -> Iterator[tuple[int, str, bool, datetime]]:
+    """Every key as a plain row, fetched in batches from a server-side cursor where supported."""
+    yield from db.execute(
+        select(APIKey.id, APIKey.key, APIKey.is_active, APIKey.created_at)
+        .order_by(APIKey.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    ).tuples()
+
+
+def list_keys(db: Session, output_format: str = "text", output: TextIO = sys.stdout) -> None:
+    if output_format == "json":
+        output.write("[")
+        for number, (key_id, key, is_active, created_at) in enumerate(iter_keys(db)):
+            record = {"id": key_id, "key": key, "is_active": is_active, "created_at": created_at.isoformat()}
+            output.write(("," if number else "") + "\n  " + json.dumps(record))
+        output.write("\n]\n")
+        return
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(["id", "key", "is_active", "created_at"])
+        for key_id, key, is_active, created_at in iter_keys(db):
+            writer.writerow([key_id, key, is_active, created_at.isoformat()])
+        return
+
+    count = db.scalar(select(func.count()).select_from(APIKey))
+    if not count:
+        print("No API keys found.", file=output)
         return
 
-    print(f"Found {len(keys)} API key(s):")
-    for key in keys:
-        status = "Active" if key.is_active else "Inactive"
-        print(f"  - {key.key}")
-        print(f"    ID: {key.id}")
-        print(f"    Status: {status}")
-        print(f"    Created: {key.created_at}")
+    print(f"Found {count} API key(s):", file=output)
+    for key_id, key, is_active, created_at in iter_keys(db):
+        status = "Active" if is_active else "Inactive"
+        print(f"  - {key}", file=output)
+        print(f"    ID: {key_id}", file=output)
+        print(f"    Status: {status}", file=output)
+        print(f"    Created: {created_at}", file=output)
 
 
 def deactivate_key(db: Session, key: str) -> None:
@@ -79,43 +237,72 @@ def delete_key(db: Session, key: str) -> None:
     print(f"API key deleted successfully: {key}")
 
 
-def main() -> None:
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python manage_api_keys.py add [key]        # Add a new API key")
-        print("  python manage_api_keys.py list             # List all API keys")
-        print("  python manage_api_keys.py activate <key>   # Activate an API key")
-        print("  python manage_api_keys.py deactivate <key> # Deactivate an API key")
-        print("  python manage_api_keys.py delete <key>     # Delete an API key")
-        sys.exit(1)
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
 
-    command = sys.argv[1]
-    db = SessionLocal()
+    add = commands.add_parser("add", help="add an API key, generated unless given")
+    add.add_argument("key", nargs="?")
+    for command, help_text in (
+        ("activate", "activate an API key"),
+        ("deactivate", "deactivate an API key"),
+        ("delete", "delete an API key"),
+    ):
+        commands.add_parser(command, help=help_text).add_argument("key")
+
+    listing = commands.add_parser("list", help="list all API keys")
+    listing.add_argument("--format", choices=["text", "json", "csv"], default="text")
+
+    importing = commands.add_parser("import", help="add the keys listed one per line, skipping existing ones")
+    importing.add_argument("file", nargs="?", type=argparse.FileType("r"), default=sys.stdin)
+
+    generate = commands.add_parser("generate", help="create new keys and print them one per line")
+    generate.add_argument("count", type=int)
+
+    bulk = commands.add_parser("deactivate-bulk", help="deactivate the active keys matching every filter")
+    bulk.add_argument("--pattern", help="SQL LIKE pattern, e.g. 'acme-%%'")
+    bulk.add_argument("--older-than", type=int, metavar="DAYS", help="created more than DAYS days ago")
+    bulk.add_argument("--dry-run", action="store_true", help="only count the keys that would be deactivated")
+
+    args = parser.parse_args(argv)
+    if args.command == "deactivate-bulk" and args.pattern is None and args.older_than is None:
+        parser.error("deactivate-bulk needs --pattern, --older-than or both")
+    if args.command == "generate" and args.count < 1:
+        parser.error("count must be positive")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    db = get_sync_session_maker()()
 
     try:
-        if command == "add":
-            key = sys.argv[2] if len(sys.argv) > 2 else None
-            add_key(db, key)
-        elif command == "list":
-            list_keys(db)
-        elif command == "activate":
-            if len(sys.argv) < 3:
-                print("Error: Please provide the API key to activate")
-                sys.exit(1)
-            activate_key(db, sys.argv[2])
-        elif command == "deactivate":
-            if len(sys.argv) < 3:
-                print("Error: Please provide the API key to deactivate")
-                sys.exit(1)
-            deactivate_key(db, sys.argv[2])
-        elif command == "delete":
-            if len(sys.argv) < 3:
-                print("Error: Please provide the API key to delete")
-                sys.exit(1)
-            delete_key(db, sys.argv[2])
-        else:
-            print(f"Error: Unknown command '{command}'")
-            sys.exit(1)
+        if args.command == "add":
+            add_key(db, args.key)
+        elif args.command == "list":
+            list_keys(db, args.format)
+        elif args.command == "activate":
+            activate_key(db, args.key)
+        elif args.command == "deactivate":
+            deactivate_key(db, args.key)
+        elif args.command == "delete":
+            delete_key(db, args.key)
+        elif args.command == "import":
+            keys = read_keys(args.file)
+            added = import_keys(db, keys)
+            print(f"Imported {added} API key(s); {len(keys) - added} already existed")
+        elif args.command == "generate":
+            # Keys go to stdout so they can be piped to a file; the summary goes to stderr.
+            for key in generate_keys(db, args.count):
+                print(key)
+            print(f"Generated {args.count} API key(s)", file=sys.stderr)
+        elif args.command == "deactivate-bulk":
+            older_than = timedelta(days=args.older_than) if args.older_than is not None else None
+            count = deactivate_keys(db, args.pattern, older_than, args.dry_run)
+            verb = "Would deactivate" if args.dry_run else "Deactivated"
+            print(f"{verb} {count} API key(s)")
     finally:
         db.close()
 
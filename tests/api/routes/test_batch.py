@@ -0,0 +1,76 @@
+import time
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from ps3838api.models.errors import AccessBlockedError
+
+from tests.fakes import FakePinnacleClient
+
+DELAY = 0.3
+
+
+@pytest.fixture
+def fake_pinnacle() -> FakePinnacleClient:
+    """Every upstream call takes DELAY seconds, and the league list is blocked."""
+    client = FakePinnacleClient(delay=DELAY)
+    client.errors["get_leagues"] = AccessBlockedError("blocked")
+    return client
+
+
+class TestBatch:
+    """Tests for the /batch endpoint."""
+
+    def test_results_in_request_order(self, api_client: TestClient):
+        response = api_client.post(
+            "/batch",
+            json={"requests": [{"type": "account_info"}, {"type": "balance"}, {"type": "bets", "days": 1}]},
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["type"] for result in results] == ["account_info", "balance", "bets"]
+        assert all(result["ok"] for result in results)
+        assert results[1]["data"]["data"]["currency"] == "USD"
+        assert results[2]["data"]["straightBets"] == []
+
+    def test_sub_requests_run_concurrently(self, api_client: TestClient):
+        started = time.perf_counter()
+        response = api_client.post(
+            "/batch",
+            json={"requests": [{"type": "balance"}, {"type": "balance"}, {"type": "balance"}]},
+        )
+        elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert elapsed < DELAY * 2
+
+    def test_upstream_error_only_fails_its_sub_request(self, api_client: TestClient):
+        response = api_client.post(
+            "/batch", json={"requests": [{"type": "leagues"}, {"type": "account_info"}]}
+        )
+
+        results = response.json()["results"]
+        assert results[0] == {"type": "leagues", "ok": False, "data": None, "error": "blocked"}
+        assert results[1]["ok"]
+
+    def test_network_error_only_fails_its_sub_request(
+        self, api_client: TestClient, fake_pinnacle: FakePinnacleClient
+    ):
+        fake_pinnacle.errors["get_client_balance"] = requests.ConnectionError("connection reset")
+        response = api_client.post(
+            "/batch", json={"requests": [{"type": "balance"}, {"type": "account_info"}]}
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0] == {"type": "balance", "ok": False, "data": None, "error": "connection reset"}
+        assert results[1]["ok"]
+
+    def test_invalid_sub_request_is_rejected(self, api_client: TestClient):
+        response = api_client.post("/batch", json={"requests": [{"type": "bets", "days": 0}]})
+        assert response.status_code == 422
+
+    def test_empty_batch_is_rejected(self, api_client: TestClient):
+        response = api_client.post("/batch", json={"requests": []})
+        assert response.status_code == 422
@@ -1,10 +1,19 @@
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
 
 from app.api.routes.billing import (
+    BillingReportStore,
     _get_billing_period_bounds,  # pyright: ignore[reportPrivateUsage]
     _get_current_period_start,  # pyright: ignore[reportPrivateUsage]
     _normalize_billing_day,  # pyright: ignore[reportPrivateUsage]
+    get_billing_reports,
 )
+from app.core.config import get_settings
+from tests.fakes import FakePinnacleClient, make_straight_bet
 
 
 class TestNormalizeBillingDay:
@@ -271,3 +280,131 @@ class TestEdgeCases:
         assert prev_end == datetime(2026, 1, 13, 7, 5, 33, tzinfo=timezone.utc) - __import__(
             "datetime"
         ).timedelta(microseconds=1)
+
+
+ACCESS = datetime(2025, 12, 13, 7, 5, 33, tzinfo=timezone.utc)
+NOW = datetime(2026, 1, 19, 12, 0, 0, tzinfo=timezone.utc)
+CURRENT = _get_billing_period_bounds("CURRENT", 13, (7, 5, 33), NOW)
+PREVIOUS = _get_billing_period_bounds("PREVIOUS", 13, (7, 5, 33), NOW)
+
+
+def settled_bet(bet_id: int, settled_at: datetime) -> dict[str, Any]:
+    return make_straight_bet(bet_id, settledAt=settled_at.strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+
+@pytest.fixture(autouse=True)
+def billing_settings(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    settings = get_settings()
+    monkeypatch.setattr(settings, "api_gained_access", ACCESS)
+    monkeypatch.setattr(settings, "bet_cache_enabled", False)
+    get_billing_reports.cache_clear()
+    yield
+    get_billing_reports.cache_clear()
+
+
+@pytest.fixture
+def fake_pinnacle() -> FakePinnacleClient:
+    return FakePinnacleClient(
+        [
+            settled_bet(1, datetime(2025, 12, 20, tzinfo=timezone.utc)),
+            settled_bet(2, datetime(2026, 1, 15, tzinfo=timezone.utc)),
+            settled_bet(3, NOW - timedelta(minutes=30)),
+            settled_bet(4, NOW + timedelta(minutes=5)),
+        ],
+        settled_in_range=True,
+    )
+
+
+@pytest.fixture
+def upstream(fake_pinnacle: FakePinnacleClient) -> Any:
+    """``fake_pinnacle``, typed to be passed where a ``PinnacleClient`` is expected."""
+    return fake_pinnacle
+
+
+def bet_ids(
+    store: BillingReportStore, client: Any, bounds: tuple[datetime, datetime], now: datetime
+) -> list[int]:
+    report = store.report(client, *bounds, now, max_age=timedelta(0))
+    return [bet["betId"] for bet in report.response.bets.straightBets]
+
+
+class TestBillingReportStore:
+    """Tests for precomputing billing period reports."""
+
+    def test_closed_period_is_built_once(self, upstream: Any):
+        store = BillingReportStore()
+
+        assert bet_ids(store, upstream, PREVIOUS, NOW) == [1]
+        calls = len(upstream.bet_ranges)
+        report = store.report(upstream, *PREVIOUS, NOW + timedelta(days=1), max_age=timedelta(0))
+
+        assert report.closed
+        assert len(upstream.bet_ranges) == calls
+
+    def test_open_period_only_fetches_new_bets(self, upstream: Any):
+        store = BillingReportStore()
+        settled_to = NOW - get_settings().bet_cache_settle_lag
+
+        assert bet_ids(store, upstream, CURRENT, NOW) == [2, 3, 4]
+        assert bet_ids(store, upstream, CURRENT, NOW + timedelta(minutes=10)) == [2, 3, 4]
+
+        assert upstream.bet_ranges == [
+            (CURRENT[0], settled_to),
+            (settled_to, CURRENT[1]),
+            (settled_to, settled_to + timedelta(minutes=10)),
+            (settled_to + timedelta(minutes=10), CURRENT[1]),
+        ]
+
+    def test_open_period_report_is_reused_until_max_age(self, upstream: Any):
+        store = BillingReportStore()
+        first = store.report(upstream, *CURRENT, NOW, max_age=timedelta(minutes=1))
+
+        assert store.report(upstream, *CURRENT, NOW + timedelta(seconds=30), timedelta(minutes=1)) is first
+        assert not first.closed
+        assert len(upstream.bet_ranges) == 2
+
+    def test_rollover_keeps_bets_of_the_period_that_closed(self, upstream: Any):
+        store = BillingReportStore()
+        store.refresh(upstream, NOW)
+        upstream.bet_ranges.clear()
+
+        rollover = CURRENT[1] + timedelta(minutes=5)
+        store.refresh(upstream, rollover)
+
+        assert store.current_period_start == CURRENT[1]
+        assert min(start for start, _ in upstream.bet_ranges) == NOW - get_settings().bet_cache_settle_lag
+        previous = _get_billing_period_bounds("PREVIOUS", 13, (7, 5, 33), rollover)
+        assert bet_ids(store, upstream, previous, rollover) == [2, 3, 4]
+
+
+class TestBillingPeriodBetsEndpoint:
+    """Tests for /billing_period_bets served from precomputed reports."""
+
+    def test_previous_period_is_served_from_the_report(self, api_client: TestClient, upstream: Any):
+        first = api_client.post("/billing_period_bets", json={"period": "PREVIOUS"})
+        calls = len(upstream.bet_ranges)
+        second = api_client.post("/billing_period_bets", json={"period": "PREVIOUS"})
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert "immutable" in first.headers["cache-control"]
+        assert len(upstream.bet_ranges) == calls
+
+    def test_other_schedules_are_computed_on_request(self, api_client: TestClient, upstream: Any):
+        access = "2025-11-02T00:00:00Z"
+        api_client.post("/billing_period_bets", json={"period": "PREVIOUS", "api_gained_access": access})
+        calls = len(upstream.bet_ranges)
+        api_client.post("/billing_period_bets", json={"period": "PREVIOUS", "api_gained_access": access})
+
+        assert len(upstream.bet_ranges) == 2 * calls
+
+    def test_truncated_previous_period_is_not_immutable(
+        self, api_client: TestClient, upstream: Any, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(get_settings(), "billing_reports_enabled", False)
+        upstream.more_available = True
+
+        response = api_client.post("/billing_period_bets", json={"period": "PREVIOUS"})
+
+        assert response.json()["bets"]["moreAvailable"] is True
+        assert response.headers["cache-control"] == "private, no-cache"
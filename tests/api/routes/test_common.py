@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from tests.fakes import FakePinnacleClient, make_straight_bet
+
+
+@pytest.fixture
+def fake_pinnacle() -> FakePinnacleClient:
+    return FakePinnacleClient([make_straight_bet(1)])
+
+
+@pytest.fixture(autouse=True)
+def no_bet_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "bet_cache_enabled", False)
+
+
+class TestGetBetsCaching:
+    """Tests for validators and caching headers of /get_bets."""
+
+    def test_matching_etag_gets_not_modified(self, api_client: TestClient):
+        first = api_client.post("/get_bets", json={"days": 1})
+        etag = first.headers["etag"]
+
+        second = api_client.post("/get_bets", json={"days": 1}, headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_weak_and_listed_etags_match(self, api_client: TestClient):
+        etag = api_client.post("/get_bets", json={"days": 1}).headers["etag"]
+
+        response = api_client.post(
+            "/get_bets", json={"days": 1}, headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert response.status_code == 304
+
+    def test_stale_etag_gets_full_response(self, api_client: TestClient):
+        response = api_client.post("/get_bets", json={"days": 1}, headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == 200
+        assert response.json()["straightBets"][0]["betId"] == 1
+
+    def test_open_range_must_revalidate(self, api_client: TestClient):
+        response = api_client.post("/get_bets", json={"days": 1})
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_closed_range_is_immutable(self, api_client: TestClient):
+        to_date = datetime.now(timezone.utc) - timedelta(days=2)
+        response = api_client.post(
+            "/get_bets",
+            json={"from_date": (to_date - timedelta(days=1)).isoformat(), "to_date": to_date.isoformat()},
+        )
+        assert "immutable" in response.headers["cache-control"]
+
+
+class TestGetBetsBody:
+    """Tests for the /get_bets body spliced from raw upstream bets."""
+
+    @pytest.fixture
+    def fake_pinnacle(self) -> FakePinnacleClient:
+        page: dict[str, Any] = {
+            "moreAvailable": True,
+            "straightBets": [
+                make_straight_bet(1),
+                make_straight_bet(2, betStatus="NOT_ACCEPTED"),
+                make_straight_bet(3, sportId=4, betStatus="LOSE"),
+            ],
+            "parlayBets": [{"betId": 4, "betStatus": "WON", "legs": []}],
+        }
+        return FakePinnacleClient(pages=[page])
+
+    def test_bets_are_returned_as_upstream_sent_them(self, api_client: TestClient):
+        body = api_client.post("/get_bets", json={"days": 1}).json()
+
+        assert body["moreAvailable"] is True
+        assert (body["pageSize"], body["fromRecord"], body["toRecord"]) == (3, 0, 3)
+        assert body["straightBets"] == [
+            make_straight_bet(1),
+            make_straight_bet(3, sportId=4, betStatus="LOSE"),
+        ]
+        assert body["parlayBets"] == [{"betId": 4, "betStatus": "WON", "legs": []}]
+        assert body["teaserBets"] == body["specialBets"] == body["manualBets"] == []
+
+    def test_truncated_closed_range_is_not_immutable(self, api_client: TestClient):
+        to_date = datetime.now(timezone.utc) - timedelta(days=2)
+        response = api_client.post(
+            "/get_bets",
+            json={"from_date": (to_date - timedelta(days=1)).isoformat(), "to_date": to_date.isoformat()},
+        )
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_filters_read_the_bets(self, api_client: TestClient):
+        body = api_client.post("/get_bets", json={"days": 1, "sport_ids": [4]}).json()
+
+        assert [bet["betId"] for bet in body["straightBets"]] == [3]
+        assert body["parlayBets"] == []
+
+    def test_projected_bets(self, api_client: TestClient):
+        body = api_client.post("/get_bets", json={"days": 1, "fields": ["betId"]}).json()
+
+        assert body["straightBets"] == [{"betId": 1}, {"betId": 3}]
@@ -0,0 +1,87 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = b'{"bets": [' + b'{"betStatus": "WON", "betType": "MONEYLINE"},' * 200 + b"{}]}"
+OPTIONAL_ENCODER_MODULES = {"br": "brotli", "zstd": "zstandard"}
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@app.get("/large")
+async def large() -> Response:
+    return Response(BODY, media_type="application/json", headers={"ETag": '"abc"'})
+
+
+@app.get("/small")
+async def small() -> Response:
+    return Response(b"{}", media_type="application/json")
+
+
+@app.get("/events")
+async def events() -> StreamingResponse:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"data: 1\n\n" * 200
+        yield b"data: 2\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+class TestNegotiateEncoding:
+    """Tests for negotiate_encoding."""
+
+    def test_server_preference_breaks_ties(self):
+        assert negotiate_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+
+    def test_client_quality_wins(self):
+        assert negotiate_encoding("zstd;q=0.5, gzip;q=0.9", ["zstd", "br", "gzip"]) == "gzip"
+
+    def test_wildcard_and_exclusions(self):
+        assert negotiate_encoding("*, zstd;q=0", ["zstd", "br", "gzip"]) == "br"
+
+    def test_identity_only(self):
+        assert negotiate_encoding("identity", ["zstd", "br", "gzip"]) is None
+        assert negotiate_encoding("", ["gzip"]) is None
+
+
+class TestCompressionMiddleware:
+    """Tests for CompressionMiddleware."""
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+    def test_compresses_with_negotiated_encoding(self, client: TestClient, encoding: str):
+        if encoding in OPTIONAL_ENCODER_MODULES:
+            pytest.importorskip(OPTIONAL_ENCODER_MODULES[encoding])
+        response = client.get("/large", headers={"Accept-Encoding": encoding})
+
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(BODY) // 10
+        assert response.content == BODY
+
+    def test_small_bodies_are_not_compressed(self, client: TestClient):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_event_streams_pass_through(self, client: TestClient):
+        response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content.endswith(b"data: 2\n\n")
+
+    def test_no_accept_encoding(self, client: TestClient):
+        response = client.get("/large", headers={"Accept-Encoding": ""})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == BODY
@@ -0,0 +1,226 @@
+import json
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from ps3838api.models.errors import AccessBlockedError, PS3838APIError
+from requests.adapters import HTTPAdapter
+
+from app.core.security import verify_api_key
+from app.main import app
+from app.services.pinnacle import InstrumentedPinnacleClient, get_pinnacle_client
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+FROM_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class FakeResponse:
+    def __init__(self, payload: Any, status_code: int = 200) -> None:
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self.payload).encode()
+
+    def json(self) -> Any:
+        return self.payload
+
+
+class FakeSession(requests.Session):
+    def __init__(self, response: FakeResponse | Exception) -> None:
+        super().__init__()
+        self.response = response
+        self.requests: list[tuple[str | bytes, dict[str, Any]]] = []
+
+    def request(self, method: str | bytes, url: str | bytes, *args: Any, **kwargs: Any) -> Any:
+        self.requests.append((url, kwargs))
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def make_client(response: FakeResponse | Exception) -> InstrumentedPinnacleClient:
+    return InstrumentedPinnacleClient(login="login", password="password", session=FakeSession(response))
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    app.dependency_overrides[get_pinnacle_client] = lambda: None
+    app.dependency_overrides[verify_api_key] = lambda: None
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+class TestMetricsEndpoint:
+    """Tests for /metrics and the request metrics middleware."""
+
+    def test_requests_are_labelled_by_route_template(self, client: TestClient):
+        before = sample("http_request_duration_seconds_count", route="/health", method="GET", status="200")
+        client.get("/health")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            b'http_request_duration_seconds_count{method="GET",route="/health",status="200"}'
+            in response.content
+        )
+        assert (
+            sample("http_request_duration_seconds_count", route="/health", method="GET", status="200")
+            == before + 1
+        )
+
+    def test_unknown_paths_share_one_label(self, client: TestClient):
+        before = sample("http_request_duration_seconds_count", route="unmatched", method="GET", status="404")
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+        after = sample("http_request_duration_seconds_count", route="unmatched", method="GET", status="404")
+        assert after == before + 2
+
+    def test_validation_errors_are_counted(self, client: TestClient):
+        before = sample("errors_total", cause="validation")
+        client.post("/get_bets", json={"days": 0})
+        assert sample("errors_total", cause="validation") == before + 1
+
+
+class TestInstrumentedPinnacleClient:
+    """Tests for InstrumentedPinnacleClient."""
+
+    def test_latency_is_recorded_per_endpoint(self):
+        before = sample("upstream_request_duration_seconds_count", endpoint="/v1/client/balance")
+        make_client(FakeResponse({"availableBalance": 1.0})).get_client_balance()
+        assert sample("upstream_request_duration_seconds_count", endpoint="/v1/client/balance") == before + 1
+        assert sample("upstream_requests_in_progress") == 0
+
+    @pytest.mark.parametrize(
+        ("response", "error", "cause"),
+        [
+            (requests.ConnectionError("down"), requests.ConnectionError, "upstream_network"),
+            (FakeResponse({}, status_code=403), AccessBlockedError, "upstream_blocked"),
+            (FakeResponse({"code": "INVALID", "message": "bad"}), Exception, "upstream_api"),
+        ],
+    )
+    def test_errors_are_counted_by_cause(
+        self, response: FakeResponse | Exception, error: type[Exception], cause: str
+    ):
+        before = sample("errors_total", cause=cause)
+        with pytest.raises(error):
+            make_client(response).get_client_balance()
+        assert sample("errors_total", cause=cause) == before + 1
+
+    def test_session_pools_enough_connections(self):
+        client = InstrumentedPinnacleClient(login="login", password="password", pool_size=40)
+        adapter = client._session.get_adapter("https://api.ps3838.com/v3/bets")  # pyright: ignore[reportPrivateUsage]
+
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 40
+
+    def test_raw_bets_are_left_undecoded(self):
+        page = {"moreAvailable": False, "straightBets": [{"betId": 1, "legs": [{"price": 2.0}]}]}
+        client = make_client(FakeResponse(page))
+
+        raw = client.get_raw_bets(
+            betlist="SETTLED", from_date=FROM_DATE, to_date=FROM_DATE + timedelta(days=1)
+        )
+
+        assert [bytes(bet) for bet in raw.bets("straightBets")] == [b'{"betId": 1, "legs": [{"price": 2.0}]}']
+        assert raw.bets("parlayBets") == []
+
+    def test_raw_bets_send_the_query_of_get_bets(self):
+        session = FakeSession(FakeResponse({"moreAvailable": False}))
+        client = InstrumentedPinnacleClient(login="login", password="password", session=session)
+        params: dict[str, Any] = {
+            "betlist": "SETTLED",
+            "from_date": FROM_DATE,
+            "to_date": FROM_DATE + timedelta(days=1),
+            "bet_statuses": ["WON", "LOSE"],
+            "bet_type": ["SPREAD"],
+            "page_size": 500,
+        }
+
+        client.get_bets(**params)
+        client.get_raw_bets(**params)
+
+        assert session.requests[0] == session.requests[1]
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"to_date": FROM_DATE},
+            {"page_size": 0},
+            {"page_size": 1001},
+            {"from_record": -1},
+        ],
+    )
+    def test_raw_bets_check_parameters_as_get_bets(self, params: dict[str, Any]):
+        client = make_client(FakeResponse({"moreAvailable": False}))
+        with pytest.raises(ValueError):
+            client.get_raw_bets(
+                **{
+                    "betlist": "SETTLED",
+                    "from_date": FROM_DATE,
+                    "to_date": FROM_DATE + timedelta(days=1),
+                    **params,
+                }
+            )
+
+    def test_raw_bets_error_payload_raises(self):
+        client = make_client(FakeResponse({"code": "INVALID", "message": "bad"}))
+        with pytest.raises(PS3838APIError):
+            client.get_raw_bets(betlist="SETTLED", from_date=FROM_DATE, to_date=FROM_DATE + timedelta(days=1))
+
+
+PROBE = """
+import sys
+from app.core.metrics import count_error, render_metrics
+if sys.argv[1] == "count":
+    count_error("internal")
+else:
+    print(render_metrics()[0].decode())
+"""
+
+
+class TestMultiprocess:
+    """Metrics of several workers are aggregated through PROMETHEUS_MULTIPROC_DIR."""
+
+    def test_counters_of_all_workers_are_summed(self, tmp_path: Path):
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+        def run(mode: str) -> str:
+            result = subprocess.run(
+                [sys.executable, "-c", PROBE, mode],
+                cwd=PROJECT_ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            return result.stdout
+
+        run("count")
+        run("count")
+        assert 'errors_total{cause="internal"} 2.0' in run("render")
@@ -0,0 +1,67 @@
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import timing
+from app.api.timing import ProfilerMiddleware, ServerTimingMiddleware
+from app.core.timing import span
+
+
+def slow() -> dict[str, str]:
+    with span("upstream"):
+        time.sleep(0.02)
+    return {"status": "ok"}
+
+
+def make_app(tmp_path: Path, **profiler_options: float) -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/slow", slow)
+    app.add_middleware(ServerTimingMiddleware, enabled=True)
+    app.add_middleware(ProfilerMiddleware, token="secret", output_dir=tmp_path, **profiler_options)
+    return app
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header and the profiler middleware."""
+
+    def test_reports_spans_and_total(self, tmp_path: Path):
+        response = TestClient(make_app(tmp_path)).get("/slow")
+
+        metrics = dict(metric.split(";dur=") for metric in response.headers["server-timing"].split(", "))
+        assert set(metrics) == {"upstream", "total"}
+        assert 20 <= float(metrics["upstream"]) <= float(metrics["total"])
+
+    def test_profiles_request_with_admin_token(self, tmp_path: Path):
+        response = TestClient(make_app(tmp_path)).get("/slow", headers={"X-Profile": "secret"})
+
+        profile = tmp_path / response.headers["x-profile-file"]
+        assert "-GET-slow-" in profile.name
+        assert profile.exists()
+
+    def test_ignores_wrong_token(self, tmp_path: Path):
+        response = TestClient(make_app(tmp_path)).get("/slow", headers={"X-Profile": "guess"})
+
+        assert "x-profile-file" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_keeps_only_slow_sampled_requests(self, tmp_path: Path):
+        fast = make_app(tmp_path / "fast", sample_rate=1.0, slow_threshold=60.0)
+        slow = make_app(tmp_path / "slow", sample_rate=1.0, slow_threshold=0.0)
+
+        TestClient(fast).get("/slow")
+        response = TestClient(slow).get("/slow")
+
+        assert "x-profile-file" not in response.headers
+        assert not (tmp_path / "fast").exists()
+        assert len(list((tmp_path / "slow").iterdir())) == 1
+
+    def test_samples_one_request_at_a_time(self, tmp_path: Path):
+        app = make_app(tmp_path, sample_rate=1.0, slow_threshold=0.0)
+
+        with timing._sampling:  # pyright: ignore[reportPrivateUsage]
+            TestClient(app).get("/slow")
+        TestClient(app).get("/slow")
+
+        assert len(list(tmp_path.iterdir())) == 1
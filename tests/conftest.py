@@ -0,0 +1,26 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import verify_api_key
+from app.main import app
+from app.services.pinnacle import get_pinnacle_client
+from tests.fakes import FakePinnacleClient
+
+
+@pytest.fixture
+def fake_pinnacle() -> FakePinnacleClient:
+    """The upstream client the app is given by ``api_client``; override it to change the responses."""
+    return FakePinnacleClient()
+
+
+@pytest.fixture
+def api_client(fake_pinnacle: FakePinnacleClient) -> Iterator[TestClient]:
+    """A client of the app talking to ``fake_pinnacle``, with API key checks turned off."""
+    app.dependency_overrides[get_pinnacle_client] = lambda: fake_pinnacle
+    app.dependency_overrides[verify_api_key] = lambda: None
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,47 @@
+import threading
+import time
+from pathlib import Path
+
+from app.core.profiler import SamplingProfiler
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Tests for the folded stack output."""
+
+    def test_samples_busy_thread_in_folded_format(self, tmp_path: Path):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        time.sleep(0.1)
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+        path = tmp_path / "profiles" / "request.folded"
+        profiler.write(path)
+
+        lines = path.read_text().splitlines()
+        busy = [line for line in lines if line.startswith("busy-worker;")]
+        assert busy
+        stack, count = busy[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert "busy_loop (test_profiler.py:" in stack
+        assert not any("sampling-profiler" in line for line in lines)
+
+    def test_idle_threads_are_skipped(self):
+        stop = threading.Event()
+        idle = threading.Thread(target=stop.wait, name="idle-worker")
+        idle.start()
+        profiler = SamplingProfiler()
+        profiler.sample()
+        stop.set()
+        idle.join()
+
+        assert "idle-worker" not in profiler.folded()
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import security
+from app.core.security import APIKeyCache, verify_api_key
+from app.db.database import Base
+from app.db.models import APIKey
+
+
+class TestAPIKeyCache:
+    """Tests for the API key cache in front of the database."""
+
+    def test_entries_expire(self, monkeypatch: pytest.MonkeyPatch):
+        clock = [100.0]
+        monkeypatch.setattr(security.time, "monotonic", lambda: clock[0])
+        cache = APIKeyCache(timedelta(seconds=60))
+        cache.add(APIKey(key="abc", is_active=True))
+
+        assert cache.get("abc") is not None
+        clock[0] += 61
+        assert cache.get("abc") is None
+        assert len(cache) == 0
+
+    def test_zero_ttl_disables_cache(self):
+        cache = APIKeyCache(timedelta(0))
+        cache.add(APIKey(key="abc", is_active=True))
+
+        assert cache.get("abc") is None
+
+    def test_verified_key_skips_database_until_expiry(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(security, "get_api_key_cache", lambda: cache)
+        cache = APIKeyCache(timedelta(minutes=1))
+
+        async def scenario() -> tuple[APIKey, APIKey]:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'keys.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            try:
+                async with async_sessionmaker(engine)() as db:
+                    db.add(APIKey(key="abc", is_active=True))
+                    await db.commit()
+                    first = await verify_api_key("abc", db)
+                    await db.execute(update(APIKey).values(is_active=False))
+                    await db.commit()
+                    second = await verify_api_key("abc", db)
+                    with pytest.raises(HTTPException):
+                        await verify_api_key("unknown", db)
+                    return first, second
+            finally:
+                await engine.dispose()
+
+        first, second = asyncio.run(scenario())
+
+        assert first is second
+        assert len(cache) == 1
@@ -0,0 +1,41 @@
+import asyncio
+import contextvars
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.timing import RequestTimings, span, start_request_timings
+
+
+class TestRequestTimings:
+    """Tests for span collection and the Server-Timing header."""
+
+    def test_repeated_spans_add_up_and_note_their_count(self):
+        timings = RequestTimings()
+        timings.record("upstream", 0.1)
+        timings.record("upstream", 0.05)
+        timings.record("auth", 0.002)
+
+        assert timings.header(total=0.2) == 'upstream;dur=150.0;desc="2x", auth;dur=2.0, total;dur=200.0'
+
+    def test_span_without_request_is_a_no_op(self):
+        with span("validation"):
+            pass
+
+    def test_spans_recorded_in_threadpool_reach_the_request(self):
+        def work() -> None:
+            with span("upstream"):
+                time.sleep(0.01)
+
+        async def handle() -> RequestTimings:
+            timings = start_request_timings()
+            await run_in_threadpool(work)
+            with span("serialization"):
+                pass
+            return timings
+
+        timings = contextvars.Context().run(asyncio.run, handle())
+
+        spans = timings.spans()
+        assert set(spans) == {"upstream", "serialization"}
+        assert spans["upstream"][0] >= 0.01
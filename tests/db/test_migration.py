@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Engine, create_engine, inspect, text
+
+from app.db.migration import HEAD_REVISION, current_revision, run_migrations
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path: Path) -> Engine:
+    return create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+
+class TestRunMigrations:
+    """Tests for run_migrations."""
+
+    def test_head_revision_matches_alembic(self):
+        script = ScriptDirectory.from_config(Config(str(PROJECT_ROOT / "alembic.ini")))
+        assert script.get_current_head() == HEAD_REVISION
+
+    def test_empty_database_is_upgraded_to_head(self, sqlite_engine: Engine):
+        with sqlite_engine.connect() as connection:
+            assert current_revision(connection) is None
+
+        run_migrations(sqlite_engine)
+
+        with sqlite_engine.connect() as connection:
+            assert current_revision(connection) == HEAD_REVISION
+            assert inspect(connection).has_table("bet_daily_rollups")
+
+    def test_up_to_date_database_skips_alembic(self, sqlite_engine: Engine, monkeypatch: pytest.MonkeyPatch):
+        run_migrations(sqlite_engine)
+
+        def fail(*args: object, **kwargs: object) -> None:
+            raise AssertionError("alembic should not run")
+
+        monkeypatch.setattr("alembic.command.upgrade", fail)
+        run_migrations(sqlite_engine)
+
+        with sqlite_engine.connect() as connection:
+            rows = connection.execute(text("SELECT count(*) FROM rollup_watermarks")).scalar()
+        assert rows == 1
@@ -0,0 +1,102 @@
+"""Test data and an upstream stand-in shared by the test and benchmark suites."""
+
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.services.bet_store import parse_timestamp
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_straight_bet(bet_id: int, **overrides: Any) -> dict[str, Any]:
+    settled = BASE + timedelta(minutes=bet_id)
+    bet: dict[str, Any] = {
+        "betId": bet_id,
+        "wagerNumber": 1,
+        "placedAt": (settled - timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "settledAt": settled.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "betStatus": "WON",
+        "betStatus2": "WON",
+        "betType": "MONEYLINE",
+        "win": 95.0,
+        "risk": 100.0,
+        "winLoss": 95.0,
+        "oddsFormat": "DECIMAL",
+        "updateSequence": 1,
+        "price": 1.95,
+        "isLive": False,
+        "eventStartTime": (settled - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sportId": 29,
+        "leagueId": 1980 + bet_id % 5,
+        "eventId": 1_600_000_000 + bet_id,
+        "handicap": None,
+        "teamName": f"Team {bet_id % 40}",
+        "team1": f"Team {bet_id % 40}",
+        "team2": f"Team {(bet_id + 1) % 40}",
+        "periodNumber": 0,
+    }
+    bet.update(overrides)
+    return bet
+
+
+class FakePinnacleClient:
+    """Stand-in for ``PinnacleClient`` with canned responses, counting the calls made to each method.
+
+    ``get_bets`` serves ``pages`` in turn when there are any, and otherwise ``bets`` as the straight bets
+    of a single page; with ``settled_in_range``, only those settled in the requested range, as upstream
+    does. Every call sleeps ``delay`` seconds first and raises the exception ``errors`` holds for it.
+    """
+
+    def __init__(
+        self,
+        bets: list[dict[str, Any]] | None = None,
+        *,
+        pages: list[dict[str, Any]] | None = None,
+        more_available: bool = False,
+        settled_in_range: bool = False,
+        delay: float = 0.0,
+    ) -> None:
+        self.bets = bets if bets is not None else []
+        self.pages = pages or []
+        self.more_available = more_available
+        self.settled_in_range = settled_in_range
+        self.delay = delay
+        self.balance: dict[str, Any] = {
+            "availableBalance": 100.0,
+            "outstandingTransactions": 0.0,
+            "currency": "USD",
+        }
+        self.leagues: list[dict[str, Any]] = [{"id": 1980, "name": "Premier League"}]
+        self.errors: dict[str, Exception] = {}
+        self.calls: Counter[str] = Counter()
+        self.bet_ranges: list[tuple[datetime, datetime]] = []
+        """The ``(from_date, to_date)`` of every ``get_bets`` call."""
+
+    def get_bets(self, *, from_date: datetime, to_date: datetime, **kwargs: Any) -> dict[str, Any]:
+        self._call("get_bets")
+        self.bet_ranges.append((from_date, to_date))
+        if self.pages:
+            return self.pages[(self.calls["get_bets"] - 1) % len(self.pages)]
+        bets = self.bets
+        if self.settled_in_range:
+            start, end = from_date.timestamp(), to_date.timestamp()
+            bets = [bet for bet in bets if start <= parse_timestamp(bet["settledAt"]) < end]
+        return {"moreAvailable": self.more_available, "straightBets": [dict(bet) for bet in bets]}
+
+    def get_client_balance(self) -> dict[str, Any]:
+        self._call("get_client_balance")
+        return dict(self.balance)
+
+    def get_leagues(self) -> list[dict[str, Any]]:
+        self._call("get_leagues")
+        return self.leagues
+
+    def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.delay:
+            time.sleep(self.delay)
+        error = self.errors.get(name)
+        if error is not None:
+            raise error
@@ -0,0 +1,215 @@
+"""Local stand-in for the Pinnacle API, for offline load tests.
+
+Serves ``/v3/bets``, ``/v3/leagues`` and ``/v1/client/balance`` with synthetic data. Bets are settled at
+a fixed rate from ``EPOCH`` on and derived from their index alone, so every range always returns the
+same bets. ``/v3/bets`` pages like upstream: at most ``pageSize`` bets from ``fromRecord`` on, with
+``moreAvailable`` set when the range holds more. Every call waits ``--latency`` +- ``--jitter`` seconds,
+and ``--throttle-rate`` of them are rejected with the 429 error upstream answers when throttling.
+
+Usage:
+    uv run python tests/scipts/fake_pinnacle.py --port 9100 --bets-per-day 2000 --latency 0.1
+
+Point the application at it with ``PS3838_API_BASE_URL=http://127.0.0.1:9100`` and any credentials.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BET_STATUSES = (
+    ("WON", "WON"),
+    ("LOSE", "LOST"),
+    ("WON", "WON"),
+    ("LOSE", "LOST"),
+    ("WON", "HALF_WON_HALF_PUSHED"),
+    ("LOSE", "HALF_LOST_HALF_PUSHED"),
+    ("REFUNDED", "REFUNDED"),
+)
+BET_TYPES = ("MONEYLINE", "SPREAD", "TOTAL_POINTS", "TEAM_TOTAL_POINTS")
+SPORT_IDS = (29, 4, 33, 3)
+LEAGUES_PER_SPORT = 25
+
+
+@dataclass(frozen=True, slots=True)
+class FakePinnacleConfig:
+    bets_per_day: int = 500
+    latency: float = 0.05
+    jitter: float = 0.02
+    throttle_rate: float = 0.0
+
+    @property
+    def bet_interval(self) -> timedelta:
+        return timedelta(days=1) / self.bets_per_day
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_bet(index: int, settled_at: datetime) -> dict[str, Any]:
+    status, status2 = BET_STATUSES[index % len(BET_STATUSES)]
+    risk = float(10 + index % 90)
+    price = 1.5 + (index % 15) / 10
+    win_loss = {
+        "WON": risk * (price - 1),
+        "LOST": -risk,
+        "HALF_WON_HALF_PUSHED": risk * (price - 1) / 2,
+        "HALF_LOST_HALF_PUSHED": -risk / 2,
+    }.get(status2, 0.0)
+    sport_id = SPORT_IDS[index % len(SPORT_IDS)]
+    return {
+        "betId": 1_000_000 + index,
+        "wagerNumber": 1,
+        "placedAt": _timestamp(settled_at - timedelta(hours=3)),
+        "settledAt": _timestamp(settled_at),
+        "betStatus": status,
+        "betStatus2": status2,
+        "betType": BET_TYPES[index % len(BET_TYPES)],
+        "win": round(risk * (price - 1), 2),
+        "risk": risk,
+        "winLoss": round(win_loss, 2),
+        "oddsFormat": "DECIMAL",
+        "updateSequence": 1,
+        "price": price,
+        "isLive": index % 3 == 0,
+        "eventStartTime": _timestamp(settled_at - timedelta(hours=2)),
+        "sportId": sport_id,
+        "leagueId": sport_id * 1000 + index % LEAGUES_PER_SPORT,
+        "eventId": 1_600_000_000 + index // 2,
+        "handicap": None,
+        "teamName": f"Team {index % 40}",
+        "team1": f"Team {index % 40}",
+        "team2": f"Team {(index + 1) % 40}",
+        "periodNumber": 0,
+    }
+
+
+def bets_page(
+    config: FakePinnacleConfig,
+    from_date: datetime,
+    to_date: datetime,
+    from_record: int,
+    page_size: int,
+    descending: bool = False,
+) -> dict[str, Any]:
+    interval = config.bet_interval
+    first = max(0, math.ceil((from_date - EPOCH) / interval))
+    end = max(first, math.ceil((to_date - EPOCH) / interval))
+    indices = range(first, end)
+    if descending:
+        indices = indices[::-1]
+    page = indices[from_record : from_record + page_size]
+    return {
+        "moreAvailable": from_record + len(page) < len(indices),
+        "pageSize": page_size,
+        "fromRecord": from_record,
+        "toRecord": from_record + len(page) - 1 if page else from_record,
+        "straightBets": [make_bet(index, EPOCH + index * interval) for index in page],
+        "parlayBets": [],
+        "teaserBets": [],
+        "specialBets": [],
+        "manualBets": [],
+    }
+
+
+def _parse_date(value: str) -> datetime:
+    moment = datetime.fromisoformat(value)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def create_app(config: FakePinnacleConfig) -> FastAPI:
+    app = FastAPI(title="Fake Pinnacle API")
+
+    async def upstream_call() -> JSONResponse | None:
+        """Wait like upstream does, and answer with its throttling error now and then."""
+        await asyncio.sleep(
+            max(0.0, random.uniform(config.latency - config.jitter, config.latency + config.jitter))
+        )
+        if config.throttle_rate and random.random() < config.throttle_rate:
+            return JSONResponse(
+                {"code": "TOO_MANY_REQUESTS", "message": "Too many requests, slow down."}, status_code=429
+            )
+        return None
+
+    async def get_bets(request: Request) -> Any:
+        throttled = await upstream_call()
+        if throttled is not None:
+            return throttled
+        params = request.query_params
+        if "fromDate" not in params or "toDate" not in params:
+            return JSONResponse(
+                {"code": "INVALID_REQUEST", "message": "fromDate and toDate are required"}, 400
+            )
+        return bets_page(
+            config,
+            _parse_date(params["fromDate"]),
+            _parse_date(params["toDate"]),
+            from_record=int(params.get("fromRecord", 0)),
+            page_size=int(params.get("pageSize", 1000)),
+            descending=params.get("sortDir") == "DESC",
+        )
+
+    async def get_leagues(request: Request) -> Any:
+        throttled = await upstream_call()
+        if throttled is not None:
+            return throttled
+        sport_id = int(request.query_params.get("sportId", SPORT_IDS[0]))
+        return {
+            "leagues": [
+                {"id": sport_id * 1000 + index, "name": f"League {index}", "hasOfferings": True}
+                for index in range(LEAGUES_PER_SPORT)
+            ]
+        }
+
+    async def get_client_balance() -> Any:
+        throttled = await upstream_call()
+        if throttled is not None:
+            return throttled
+        return {
+            "availableBalance": 1000.0,
+            "outstandingTransactions": 0.0,
+            "givenCredit": 0.0,
+            "currency": "USD",
+        }
+
+    app.add_api_route("/v3/bets", get_bets)
+    app.add_api_route("/v3/leagues", get_leagues)
+    app.add_api_route("/v1/client/balance", get_client_balance)
+    return app
+
+
+def main() -> None:
+    defaults = FakePinnacleConfig()
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--bets-per-day", type=int, default=defaults.bets_per_day)
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="seconds per call")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="seconds")
+    parser.add_argument(
+        "--throttle-rate", type=float, default=defaults.throttle_rate, help="fraction of calls"
+    )
+    args = parser.parse_args()
+
+    config = FakePinnacleConfig(
+        bets_per_day=args.bets_per_day,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
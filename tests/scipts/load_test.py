@@ -0,0 +1,351 @@
+"""End-to-end load test of the API against the local Pinnacle stand-in.
+
+Starts ``fake_pinnacle.py`` and the application under uvicorn, migrates a throwaway SQLite database
+(or ``--database-url``) and provisions an API key, then drives a weighted mix of requests at each
+concurrency level for a fixed duration. Reports throughput, p50/p95/p99 latency per level and per
+scenario, and the peak RSS of the application's processes.
+
+Usage:
+    uv run --group test python tests/scipts/load_test.py --concurrency 1,10,50 --duration 30
+    uv run --group test python tests/scipts/load_test.py --workers 4 --latency 0.2 --throttle-rate 0.01
+
+Any other setting of the application, e.g. ``BET_CACHE_ENABLED=false``, is taken from the environment.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+FAKE_PINNACLE = Path(__file__).parent / "fake_pinnacle.py"
+
+type RequestFactory = Callable[[], tuple[str, dict[str, Any]]]
+
+
+def _closed_range(days: int) -> dict[str, Any]:
+    """A range of ``days`` ending at a random midnight of the last year, old enough to be cacheable."""
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    end -= timedelta(days=random.randint(2, 365))
+    return {"from_date": (end - timedelta(days=days)).isoformat(), "to_date": end.isoformat()}
+
+
+SCENARIOS: dict[str, RequestFactory] = {
+    "bets_1d": lambda: ("/get_bets", {"days": 1}),
+    "bets_7d": lambda: ("/get_bets", {"days": 7}),
+    "bets_closed_30d": lambda: ("/get_bets", _closed_range(30)),
+    "bets_closed_180d": lambda: ("/get_bets", _closed_range(180)),
+    "balance": lambda: ("/get_client_balance", {}),
+    "leagues": lambda: ("/get_leagues", {}),
+}
+DEFAULT_MIX = "bets_1d=40,bets_7d=20,bets_closed_30d=15,bets_closed_180d=5,balance=15,leagues=5"
+
+
+@dataclass(slots=True)
+class LevelResult:
+    concurrency: int
+    duration: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=dict[str, list[float]])
+    errors: dict[str, int] = field(default_factory=dict[str, int])
+    error_statuses: Counter[str] = field(default_factory=Counter[str])
+    peak_rss: int | None = None
+
+    def record(self, scenario: str, seconds: float, status: int | None) -> None:
+        """Record one request; ``status`` is None when it failed without a response."""
+        self.latencies.setdefault(scenario, []).append(seconds)
+        if status != 200:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+            self.error_statuses[str(status or "transport")] += 1
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    """p50, p95 and p99 in milliseconds."""
+    if len(latencies) < 2:
+        value = latencies[0] * 1000 if latencies else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+def _children(pid: int) -> list[int]:
+    children: list[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children.extend(int(child) for child in (task / "children").read_text().split())
+        except OSError:
+            continue
+    return children
+
+
+def tree_rss(pid: int) -> int | None:
+    """Resident memory of ``pid`` and all its descendants in bytes, or None without ``/proc``."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+        except OSError:
+            if current == pid:
+                return None
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1]) * 1024
+        pending.extend(_children(current))
+    return total
+
+
+class RssSampler:
+    """Samples the memory of a process tree in the background, keeping the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.2) -> None:
+        self._pid = pid
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.peak: int | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            rss = tree_rss(self._pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+        time.sleep(0.1)
+
+
+@contextmanager
+def running(command: list[str], env: dict[str, str], ready_url: str) -> Iterator[subprocess.Popen[bytes]]:
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+    try:
+        wait_until_ready(ready_url)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run_level(
+    base_url: str, api_key: str, mix: dict[str, int], concurrency: int, duration: float
+) -> LevelResult:
+    result = LevelResult(concurrency)
+    names = list(mix)
+    weights = list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def user(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            scenario = random.choices(names, weights)[0]
+            path, body = SCENARIOS[scenario]()
+            started = time.perf_counter()
+            status: int | None = None
+            try:
+                status = (await client.post(path, json=body)).status_code
+            except httpx.HTTPError:
+                pass
+            result.record(scenario, time.perf_counter() - started, status)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"X-API-Key": api_key}, limits=limits, timeout=120.0
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        result.duration = time.perf_counter() - started
+    return result
+
+
+def _format_row(label: str, latencies: list[float], errors: int, duration: float, rss: str) -> str:
+    p50, p95, p99 = percentiles(latencies)
+    throughput = len(latencies) / duration if duration else 0.0
+    return (
+        f"{label:<22}{len(latencies):>9}{errors:>8}{throughput:>10.1f}"
+        f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{rss:>12}"
+    )
+
+
+def report(results: list[LevelResult]) -> None:
+    columns = ("requests", 9), ("errors", 8), ("req/s", 10), ("p50 ms", 10), ("p95 ms", 10), ("p99 ms", 10)
+    print(" " * 22 + "".join(f"{name:>{width}}" for name, width in columns) + f"{'peak RSS':>12}")
+    for result in results:
+        everything = [latency for latencies in result.latencies.values() for latency in latencies]
+        rss = f"{result.peak_rss / 2**20:.0f} MiB" if result.peak_rss is not None else "n/a"
+        errors = sum(result.errors.values())
+        print(_format_row(f"concurrency {result.concurrency}", everything, errors, result.duration, rss))
+        for scenario, latencies in sorted(result.latencies.items()):
+            errors = result.errors.get(scenario, 0)
+            print(_format_row(f"  {scenario}", latencies, errors, result.duration, ""))
+        if result.error_statuses:
+            statuses = ", ".join(
+                f"{status}: {count}" for status, count in result.error_statuses.most_common()
+            )
+            print(f"  errors by status: {statuses}")
+
+
+def as_json(results: list[LevelResult]) -> list[dict[str, Any]]:
+    levels: list[dict[str, Any]] = []
+    for result in results:
+        scenarios: dict[str, Any] = {}
+        for scenario, latencies in result.latencies.items():
+            p50, p95, p99 = percentiles(latencies)
+            scenarios[scenario] = {
+                "requests": len(latencies),
+                "errors": result.errors.get(scenario, 0),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+            }
+        requests = sum(len(latencies) for latencies in result.latencies.values())
+        levels.append(
+            {
+                "concurrency": result.concurrency,
+                "duration_s": result.duration,
+                "requests": requests,
+                "throughput_rps": requests / result.duration if result.duration else 0.0,
+                "peak_rss_bytes": result.peak_rss,
+                "error_statuses": dict(result.error_statuses),
+                "scenarios": scenarios,
+            }
+        )
+    return levels
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix: dict[str, int] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}"
+            )
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="scenario=weight,...")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the application")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite database")
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--bets-per-day", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fake_url = f"http://127.0.0.1:{args.fake_port}"
+        app_url = f"http://127.0.0.1:{args.app_port}"
+        env = {
+            **os.environ,
+            "DATABASE_URL": args.database_url or f"sqlite:///{workdir}/load_test.db",
+            "PS3838_API_BASE_URL": fake_url,
+            "PS3838_LOGIN": "load-test",
+            "PS3838_PASSWORD": "load-test",
+        }
+        env.setdefault("API_GAINED_ACCESS", "2025-01-01T00:00:00Z")
+        # Background rollups would compete with the measured requests for the fake upstream.
+        env.setdefault("ROLLUPS_ENABLED", "false")
+
+        api_key = f"load-test-{secrets.token_hex(8)}"
+        subprocess.run([sys.executable, "-m", "app.db.migration"], cwd=PROJECT_ROOT, env=env, check=True)
+        subprocess.run(
+            [sys.executable, "manage_api_keys.py", "add", api_key],
+            cwd=PROJECT_ROOT,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+        fake_command = [
+            sys.executable,
+            str(FAKE_PINNACLE),
+            "--port",
+            str(args.fake_port),
+            "--bets-per-day",
+            str(args.bets_per_day),
+            "--latency",
+            str(args.latency),
+            "--jitter",
+            str(args.jitter),
+            "--throttle-rate",
+            str(args.throttle_rate),
+        ]
+        app_command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.app_port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ]
+        results: list[LevelResult] = []
+        with (
+            running(fake_command, env, f"{fake_url}/v1/client/balance"),
+            running(app_command, env, f"{app_url}/health") as app,
+        ):
+            for concurrency in (int(level) for level in args.concurrency.split(",")):
+                with RssSampler(app.pid) as sampler:
+                    result = asyncio.run(run_level(app_url, api_key, args.mix, concurrency, args.duration))
+                result.peak_rss = sampler.peak
+                results.append(result)
+
+    report(results)
+    if args.json is not None:
+        args.json.write_text(json.dumps(as_json(results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import asyncio
+import math
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.services.balance_history import (
+    balance_series,
+    is_closed_balance_range,
+    lttb,
+    min_max_buckets,
+    sample_balance,
+    sample_slot,
+)
+from tests.fakes import FakePinnacleClient
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+INTERVAL = timedelta(minutes=5)
+
+type Scenario = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@pytest.fixture
+def run_with_db(tmp_path: Path) -> Callable[[Scenario], Any]:
+    def run(scenario: Scenario) -> Any:
+        async def main() -> Any:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            try:
+                async with async_sessionmaker(engine)() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+class TestDownsampling:
+    """Tests for LTTB and min/max bucket downsampling."""
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        xs = [float(x) for x in range(1000)]
+        ys = [math.sin(x / 50) for x in xs]
+        ys[500] = 10.0
+
+        kept = lttb(xs, ys, 50)
+
+        assert len(kept) == 50
+        assert kept[0] == 0 and kept[-1] == 999
+        assert kept == sorted(kept)
+        assert 500 in kept
+
+    def test_lttb_short_series_is_untouched(self):
+        assert lttb([0.0, 1.0, 2.0], [1.0, 2.0, 3.0], 10) == [0, 1, 2]
+
+    def test_min_max_keeps_extremes_of_every_bucket(self):
+        xs = [float(x) for x in range(100)]
+        ys = [float(x % 10) for x in range(100)]
+        ys[42] = -5.0
+
+        kept = min_max_buckets(xs, ys, 20)
+
+        assert len(kept) <= 20
+        assert 42 in kept
+        assert kept == sorted(kept)
+        assert {ys[index] for index in kept} >= {-5.0, 9.0}
+
+
+class TestBalanceSampling:
+    """Tests for the balance sampler and the series read back from it."""
+
+    def test_slots_align_to_interval(self):
+        assert sample_slot(START + timedelta(minutes=7, seconds=3), INTERVAL) == START + timedelta(minutes=5)
+
+    def test_range_closes_an_interval_after_it_ends(self):
+        interval = timedelta(hours=1)
+        to_date = START + 3 * interval
+        assert not is_closed_balance_range(to_date, interval, now=to_date - timedelta(minutes=1))
+        assert not is_closed_balance_range(to_date, interval, now=to_date + timedelta(minutes=59))
+        assert is_closed_balance_range(to_date, interval, now=to_date + interval)
+
+    def test_interval_is_sampled_once(
+        self, run_with_db: Callable[[Scenario], Any], fake_pinnacle: FakePinnacleClient
+    ):
+        client: Any = fake_pinnacle
+
+        async def scenario(db: AsyncSession) -> list[bool]:
+            return [
+                await sample_balance(db, client, INTERVAL, START + timedelta(minutes=1)),
+                await sample_balance(db, client, INTERVAL, START + timedelta(minutes=4)),
+                await sample_balance(db, client, INTERVAL, START + timedelta(minutes=5)),
+            ]
+
+        assert run_with_db(scenario) == [True, False, True]
+        assert fake_pinnacle.calls["get_client_balance"] == 2
+
+    def test_series_is_downsampled_from_samples(
+        self, run_with_db: Callable[[Scenario], Any], fake_pinnacle: FakePinnacleClient
+    ):
+        client: Any = fake_pinnacle
+
+        async def scenario(db: AsyncSession) -> Any:
+            for step in range(100):
+                fake_pinnacle.balance["availableBalance"] = 100.0 + step
+                await sample_balance(db, client, INTERVAL, START + step * INTERVAL)
+            return await balance_series(db, START, START + 50 * INTERVAL, points=10)
+
+        series = run_with_db(scenario)
+
+        assert series.sample_count == 50
+        assert series.currency == "USD"
+        assert len(series.values) == 10
+        assert series.times[0] == START and series.values[0] == 100.0
+        assert series.times[-1] == START + 49 * INTERVAL and series.values[-1] == 149.0
+
+    def test_min_max_series_is_bucketed_in_the_database(
+        self, run_with_db: Callable[[Scenario], Any], fake_pinnacle: FakePinnacleClient
+    ):
+        client: Any = fake_pinnacle
+
+        async def scenario(db: AsyncSession) -> Any:
+            for step in range(60):
+                fake_pinnacle.balance["availableBalance"] = 500.0 if step == 17 else 100.0 - step % 7
+                await sample_balance(db, client, INTERVAL, START + step * INTERVAL)
+            return await balance_series(db, START, START + 60 * INTERVAL, points=6, method="minmax")
+
+        series = run_with_db(scenario)
+
+        assert series.sample_count == 60
+        assert len(series.values) <= 6
+        assert max(series.values) == 500.0
+        assert min(series.values) == 94.0
+        assert series.times == sorted(series.times)
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+from app.services.bet_cache import BetHistoryCache
+
+
+def utc(day: int) -> datetime:
+    return datetime(2026, 1, day, tzinfo=timezone.utc)
+
+
+class TestMissingRanges:
+    """Tests for BetHistoryCache.missing_ranges."""
+
+    def test_empty_cache_misses_everything(self):
+        cache = BetHistoryCache()
+        assert cache.missing_ranges(utc(1), utc(10)) == [(utc(1), utc(10))]
+
+    def test_fully_covered(self):
+        cache = BetHistoryCache()
+        cache.mark_covered(utc(1), utc(10))
+        assert cache.missing_ranges(utc(2), utc(5)) == []
+
+    def test_gaps_around_and_between_covered_ranges(self):
+        cache = BetHistoryCache()
+        cache.mark_covered(utc(3), utc(5))
+        cache.mark_covered(utc(7), utc(8))
+
+        assert cache.missing_ranges(utc(1), utc(10)) == [
+            (utc(1), utc(3)),
+            (utc(5), utc(7)),
+            (utc(8), utc(10)),
+        ]
+
+
+class TestMarkCovered:
+    """Tests for BetHistoryCache.mark_covered."""
+
+    def test_adjacent_ranges_merge(self):
+        cache = BetHistoryCache()
+        cache.mark_covered(utc(1), utc(3))
+        cache.mark_covered(utc(3), utc(5))
+        assert cache.covered == [(utc(1), utc(5))]
+
+    def test_overlapping_ranges_merge(self):
+        cache = BetHistoryCache()
+        cache.mark_covered(utc(4), utc(8))
+        cache.mark_covered(utc(1), utc(3))
+        cache.mark_covered(utc(2), utc(5))
+        assert cache.covered == [(utc(1), utc(8))]
+
+
+class TestBetsBetween:
+    """Tests for BetHistoryCache.bets_between."""
+
+    def test_returns_bets_in_range(self):
+        cache = BetHistoryCache()
+        cache.add_page(
+            {
+                "straightBets": [
+                    {"betId": 1, "settledAt": "2026-01-02T00:00:00Z", "betStatus": "WON"},
+                    {"betId": 2, "settledAt": "2026-01-06T00:00:00Z", "betStatus": "LOSE"},
+                ]
+            }
+        )
+
+        bets = cache.bets_between(utc(1), utc(5))
+        assert [bet["betId"] for bet in bets["straightBets"]] == [1]
@@ -0,0 +1,80 @@
+from typing import Any
+
+from app.services.bet_filters import BetFilter, project
+
+
+def straight(**fields: Any) -> dict[str, Any]:
+    bet: dict[str, Any] = {
+        "betId": 1,
+        "betStatus": "WON",
+        "betType": "SPREAD",
+        "sportId": 29,
+        "leagueId": 1980,
+        "risk": 100.0,
+        "winLoss": 90.0,
+    }
+    bet.update(fields)
+    return bet
+
+
+class TestBetFilter:
+    """Tests for BetFilter.matches."""
+
+    def test_empty_filter_matches_everything_but_not_accepted(self):
+        bet_filter = BetFilter()
+        assert bet_filter.matches("straightBets", straight().get)
+        assert not bet_filter.matches("straightBets", straight(betStatus="NOT_ACCEPTED").get)
+
+    def test_sport_and_league(self):
+        bet_filter = BetFilter(sport_ids=[29], league_ids=[1980, 1981])
+        assert bet_filter.matches("straightBets", straight().get)
+        assert not bet_filter.matches("straightBets", straight(sportId=4).get)
+        assert not bet_filter.matches("straightBets", straight(leagueId=5).get)
+
+    def test_bet_type_for_non_straight_kinds_comes_from_the_list(self):
+        bet_filter = BetFilter(bet_types=["PARLAY"])
+        assert bet_filter.matches("parlayBets", {"betId": 1}.get)
+        assert not bet_filter.matches("straightBets", straight().get)
+        assert not bet_filter.accepts_kind("teaserBets")
+
+    def test_status(self):
+        bet_filter = BetFilter(bet_statuses=["LOSE"])
+        assert bet_filter.matches("straightBets", straight(betStatus="LOSE").get)
+        assert not bet_filter.matches("straightBets", straight().get)
+
+    def test_ranges_are_inclusive(self):
+        bet_filter = BetFilter(min_risk=50, max_risk=100, min_win_loss=-100, max_win_loss=90)
+        assert bet_filter.matches("straightBets", straight().get)
+        assert not bet_filter.matches("straightBets", straight(risk=101.0).get)
+        assert not bet_filter.matches("straightBets", straight(winLoss=None).get)
+
+    def test_reads_bets(self):
+        assert not BetFilter().reads_bets("straightBets")
+        assert BetFilter(bet_types=["SPREAD"]).reads_bets("straightBets")
+        assert not BetFilter(bet_types=["PARLAY"]).reads_bets("parlayBets")
+        assert BetFilter(min_risk=10).reads_bets("parlayBets")
+
+
+class TestUpstreamParams:
+    """Tests for BetFilter.upstream_params."""
+
+    def test_no_filter(self):
+        assert BetFilter().upstream_params() == {}
+
+    def test_statuses_and_supported_bet_types_are_pushed_down(self):
+        params = BetFilter(bet_statuses=["WON", "LOSE"], bet_types=["SPREAD"]).upstream_params()
+        assert params == {"bet_statuses": ["LOSE", "WON"], "bet_type": ["SPREAD"]}
+
+    def test_unsupported_bet_types_are_filtered_locally(self):
+        assert BetFilter(bet_types=["SPREAD", "PARLAY"]).upstream_params() == {}
+
+
+class TestProject:
+    """Tests for project."""
+
+    def test_all_fields(self):
+        bet = straight()
+        assert project(bet, None) is bet
+
+    def test_selected_fields(self):
+        assert project(straight(), ["betId", "risk", "missing"]) == {"betId": 1, "risk": 100.0}
@@ -0,0 +1,226 @@
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.services.bet_cache import BetHistoryCache, snapshot_writer_lock
+from app.services.bet_snapshot import BetSnapshot, write_snapshot
+from app.services.bet_store import BetKind, BetStore
+from tests.fakes import BASE, make_straight_bet
+
+
+def snapshot_bets(store: BetStore) -> list[tuple[BetKind, float, dict[str, Any]]]:
+    return [(store.kind(index), store.settled_at(index), store.get(index)) for index in range(len(store))]
+
+
+def parlay_bet(bet_id: int) -> dict[str, Any]:
+    return {
+        "betId": bet_id,
+        "settledAt": (BASE + timedelta(minutes=bet_id)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "betStatus": "LOSE",
+        "legs": [{"legBetType": "MONEYLINE", "price": 2.1}],
+    }
+
+
+def covering(*bet_ids: int) -> list[tuple[float, float]]:
+    """A covered range holding the bets settled ``bet_ids`` minutes after ``BASE``."""
+    return [
+        (
+            (BASE + timedelta(minutes=min(bet_ids))).timestamp(),
+            (BASE + timedelta(minutes=max(bet_ids) + 1)).timestamp(),
+        )
+    ]
+
+
+class TestBetSnapshot:
+    """Tests for write_snapshot and BetSnapshot."""
+
+    def test_bets_read_back_equal(self, tmp_path: Path):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(3, extraField={"nested": [1, 2]}))
+        store.add("straightBets", make_straight_bet(1, eventId=2**70, teamName=None))
+        store.add("parlayBets", parlay_bet(2))
+        path = tmp_path / "bets.snapshot"
+
+        assert write_snapshot(path, snapshot_bets(store), covering(1, 3)) == 3
+        snapshot = BetSnapshot(path)
+
+        indices = snapshot.select(BASE.timestamp(), (BASE + timedelta(hours=1)).timestamp())
+        assert [snapshot.field(index, "betId") for index in indices] == [1, 2, 3]
+        assert [snapshot.get(index) for index in indices] == [
+            store.get(store.select(0, 2**40)[i]) for i in range(3)
+        ]
+        assert snapshot.get(indices[0])["eventId"] == 2**70
+        assert snapshot.get(indices[0], ["betId", "teamName", "missing"]) == {"betId": 1, "teamName": None}
+        assert snapshot.to_response(indices)["parlayBets"] == [parlay_bet(2)]
+
+    def test_key_order_and_int_values_survive_the_round_trip(self, tmp_path: Path):
+        bet = {"somethingNew": 1, **make_straight_bet(1, risk=10, price=2**60)}
+        path = tmp_path / "bets.snapshot"
+        write_snapshot(path, [("straightBets", BASE.timestamp(), bet)], covering(1))
+
+        restored = BetSnapshot(path).get(0)
+        assert list(restored.items()) == list(bet.items())
+        assert type(restored["risk"]) is int
+
+    def test_select_applies_predicate(self, tmp_path: Path):
+        store = BetStore()
+        for bet_id in range(1, 6):
+            store.add("straightBets", make_straight_bet(bet_id))
+        path = tmp_path / "bets.snapshot"
+        write_snapshot(path, snapshot_bets(store), covering(1, 5))
+        snapshot = BetSnapshot(path)
+
+        indices = snapshot.select(0, 2**40, lambda kind, get: get("leagueId") == 1982)
+        assert [snapshot.field(index, "betId") for index in indices] == [2]
+
+    def test_appending_to_a_base_snapshot(self, tmp_path: Path):
+        first, second = BetStore(), BetStore()
+        for bet_id in (2, 4):
+            first.add("straightBets", make_straight_bet(bet_id, betStatus="WON"))
+        for bet_id in (1, 3):
+            second.add("straightBets", make_straight_bet(bet_id, betStatus="LOSE", teamName="Newcomers"))
+        base_path, path = tmp_path / "base.snapshot", tmp_path / "bets.snapshot"
+        write_snapshot(base_path, snapshot_bets(first), covering(2, 4))
+
+        write_snapshot(path, snapshot_bets(second), covering(1, 4), base=BetSnapshot(base_path))
+        snapshot = BetSnapshot(path)
+
+        bets = snapshot.to_response(snapshot.select(0, 2**40))["straightBets"]
+        assert [(bet["betId"], bet["betStatus"], bet["teamName"]) for bet in bets] == [
+            (1, "LOSE", "Newcomers"),
+            (2, "WON", "Team 2"),
+            (3, "LOSE", "Newcomers"),
+            (4, "WON", "Team 4"),
+        ]
+        assert snapshot.covered == covering(1, 4)
+
+    def test_rejects_other_files(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            BetSnapshot(path)
+        path.write_bytes(b"not a snapshot" * 10)
+        with pytest.raises(ValueError):
+            BetSnapshot(path)
+
+
+class TestCacheSnapshots:
+    """Tests for saving the bet history cache to a snapshot and starting from one."""
+
+    def add(self, cache: BetHistoryCache, *bet_ids: int) -> None:
+        cache.add_page({"straightBets": [make_straight_bet(bet_id) for bet_id in bet_ids]})
+
+    def test_restart_from_snapshot(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        cache = BetHistoryCache()
+        self.add(cache, 1, 2, 3)
+        cache.mark_covered(BASE, BASE + timedelta(minutes=10))
+
+        assert cache.save_snapshot(path) == 3
+        assert cache.save_snapshot(path) is None
+        assert len(cache.store) == 0
+
+        restarted = BetHistoryCache()
+        snapshot = restarted.load_snapshot(path)
+        assert snapshot.watermark == (BASE + timedelta(minutes=10)).timestamp()
+        assert restarted.missing_ranges(BASE, BASE + timedelta(minutes=20)) == [
+            (BASE + timedelta(minutes=10), BASE + timedelta(minutes=20))
+        ]
+        assert restarted.bets_between(BASE, BASE + timedelta(minutes=20)) == cache.bets_between(
+            BASE, BASE + timedelta(minutes=20)
+        )
+
+    def test_only_covered_bets_are_saved(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        cache = BetHistoryCache()
+        self.add(cache, 1, 2, 30)
+        cache.mark_covered(BASE, BASE + timedelta(minutes=10))
+
+        assert cache.save_snapshot(path) == 2
+        assert [cache.store.field(index, "betId") for index in range(len(cache.store))] == [30]
+        assert len(BetSnapshot(path)) == 2
+
+    def test_later_bets_are_merged_in_settlement_order(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        cache = BetHistoryCache()
+        self.add(cache, 1, 5)
+        cache.mark_covered(BASE, BASE + timedelta(minutes=10))
+        cache.save_snapshot(path)
+
+        self.add(cache, 3, 12)
+        bets = cache.bets_between(BASE, BASE + timedelta(minutes=20))["straightBets"]
+        assert [bet["betId"] for bet in bets] == [1, 3, 5, 12]
+
+        cache.mark_covered(BASE + timedelta(minutes=10), BASE + timedelta(minutes=20))
+        assert cache.save_snapshot(path) == 4
+        assert cache.bets_between(BASE, BASE + timedelta(minutes=20))["straightBets"] == bets
+
+    def test_reload_maps_a_newer_snapshot(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        writer, reader = BetHistoryCache(), BetHistoryCache()
+        self.add(writer, 1, 2)
+        writer.mark_covered(BASE, BASE + timedelta(minutes=10))
+        writer.save_snapshot(path)
+        reader.load_snapshot(path)
+        assert reader.reload_snapshot(path) is None
+
+        self.add(writer, 12)
+        writer.mark_covered(BASE + timedelta(minutes=10), BASE + timedelta(minutes=20))
+        writer.save_snapshot(path)
+        self.add(reader, 12, 25)
+        replaced = reader.snapshot
+
+        snapshot = reader.reload_snapshot(path)
+        assert snapshot is not None and reader.snapshot is snapshot
+        with pytest.raises(ValueError):
+            replaced.settled_at(0)  # pyright: ignore[reportOptionalMemberAccess]
+        assert [reader.store.field(index, "betId") for index in range(len(reader.store))] == [25]
+        bets = reader.bets_between(BASE, BASE + timedelta(minutes=30))["straightBets"]
+        assert [bet["betId"] for bet in bets] == [1, 2, 12, 25]
+
+    def test_reload_keeps_a_snapshot_covering_more(self, tmp_path: Path):
+        path, other = tmp_path / "bets.snapshot", tmp_path / "other.snapshot"
+        cache = BetHistoryCache()
+        self.add(cache, 1)
+        cache.mark_covered(BASE, BASE + timedelta(minutes=10))
+        cache.save_snapshot(path)
+        narrower = BetHistoryCache()
+        self.add(narrower, 1)
+        narrower.mark_covered(BASE, BASE + timedelta(minutes=5))
+        narrower.save_snapshot(other)
+
+        assert cache.reload_snapshot(other) is None
+        assert cache.reload_snapshot(tmp_path / "missing.snapshot") is None
+        assert cache.snapshot is not None and cache.snapshot.path == path
+
+    def test_rejected_snapshot_is_not_mapped_again(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        path, other = tmp_path / "bets.snapshot", tmp_path / "other.snapshot"
+        cache = BetHistoryCache()
+        self.add(cache, 1)
+        cache.mark_covered(BASE, BASE + timedelta(minutes=10))
+        cache.save_snapshot(path)
+        narrower = BetHistoryCache()
+        self.add(narrower, 1)
+        narrower.mark_covered(BASE, BASE + timedelta(minutes=5))
+        narrower.save_snapshot(other)
+        mapped: list[Path] = []
+
+        def mapping(path: Path) -> BetSnapshot:
+            mapped.append(path)
+            return BetSnapshot(path)
+
+        monkeypatch.setattr("app.services.bet_cache.BetSnapshot", mapping)
+
+        assert cache.reload_snapshot(other) is None
+        assert cache.reload_snapshot(other) is None
+        assert mapped == [other]
+
+    def test_one_snapshot_writer_per_file(self, tmp_path: Path):
+        path = tmp_path / "bets.snapshot"
+        with snapshot_writer_lock(path) as first:
+            with snapshot_writer_lock(path) as second:
+                assert (first, second) == (True, False)
+        with snapshot_writer_lock(path) as again:
+            assert again
@@ -0,0 +1,186 @@
+import tracemalloc
+from datetime import timedelta
+
+from app.services.bet_store import BetStore, SymbolTable, parse_timestamp
+from tests.fakes import BASE, make_straight_bet
+
+
+class TestSymbolTable:
+    """Tests for SymbolTable."""
+
+    def test_same_string_same_index(self):
+        table = SymbolTable()
+        assert table.intern("WON") == table.intern("WON")
+        assert table.intern("LOSE") != table.intern("WON")
+        assert len(table) == 2
+
+    def test_lookup(self):
+        table = SymbolTable(["a", "b"])
+        assert table[table.intern("b")] == "b"
+
+
+class TestBetStore:
+    """Tests for BetStore."""
+
+    def test_straight_bet_round_trip(self):
+        """A straight bet reads back equal to the dict it was built from."""
+        store = BetStore()
+        bet = make_straight_bet(1)
+        store.add("straightBets", bet)
+
+        assert store.get(0) == bet
+
+    def test_unknown_fields_are_preserved(self):
+        """Keys outside the column schema and values of an unexpected type survive the round trip."""
+        store = BetStore()
+        bet = make_straight_bet(
+            1,
+            cancellationReason={"code": "X", "details": []},
+            periodNumber="0",
+            somethingNew=[1, 2],
+        )
+        store.add("straightBets", bet)
+
+        assert store.get(0) == bet
+
+    def test_key_order_and_int_values_survive_the_round_trip(self):
+        """Re-serializing a cached bet gives the same JSON as the upstream one."""
+        store = BetStore()
+        bet = {
+            "somethingNew": 1,
+            **make_straight_bet(1, risk=10, winLoss=-10, price=2**60),
+            "betStatus": "LOSE",
+        }
+        store.add("straightBets", bet)
+
+        restored = store.get(0)
+        assert list(restored.items()) == list(bet.items())
+        assert type(restored["risk"]) is int
+        assert type(restored["price"]) is int
+
+    def test_null_and_absent_fields_are_distinguished(self):
+        store = BetStore()
+        bet = make_straight_bet(1, winLoss=None)
+        del bet["team2"]
+        store.add("straightBets", bet)
+
+        restored = store.get(0)
+        assert restored["winLoss"] is None
+        assert "team2" not in restored
+
+    def test_other_bet_kinds_round_trip(self):
+        store = BetStore()
+        parlay = {"betId": 7, "placedAt": "2026-01-01T00:00:00Z", "legs": [{"legBetType": "SPREAD"}]}
+        store.add("parlayBets", parlay)
+
+        assert store.kind(0) == "parlayBets"
+        assert store.get(0) == parlay
+
+    def test_bets_without_id_or_timestamp_are_ignored(self):
+        store = BetStore()
+        assert not store.add("straightBets", {"uniqueRequestId": "x", "betStatus": "NOT_ACCEPTED"})
+        assert not store.add("straightBets", {"betId": 1})
+        assert len(store) == 0
+
+    def test_duplicate_bet_is_replaced_by_newer_update(self):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(1, updateSequence=1, winLoss=10.0))
+        store.add("straightBets", make_straight_bet(1, updateSequence=2, winLoss=20.0))
+        store.add("straightBets", make_straight_bet(1, updateSequence=1, winLoss=30.0))
+
+        assert len(store) == 1
+        assert store.get(0)["winLoss"] == 20.0
+
+    def test_same_id_in_different_kinds_is_not_a_duplicate(self):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(1))
+        store.add("parlayBets", {"betId": 1, "placedAt": "2026-01-01T00:00:00Z"})
+        assert len(store) == 2
+
+    def test_select_orders_by_settlement_time(self):
+        store = BetStore()
+        for bet_id in (5, 1, 3, 2, 4):
+            store.add("straightBets", make_straight_bet(bet_id))
+
+        start = (BASE + timedelta(minutes=2)).timestamp()
+        end = (BASE + timedelta(minutes=5)).timestamp()
+        selected = [store.get(index)["betId"] for index in store.select(start, end)]
+
+        assert selected == [2, 3, 4]
+
+    def test_select_after_add_sees_new_bets(self):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(1))
+        assert len(store.select(0, BASE.timestamp() + 86400)) == 1
+        store.add("straightBets", make_straight_bet(2))
+        assert len(store.select(0, BASE.timestamp() + 86400)) == 2
+
+    def test_select_with_predicate(self):
+        store = BetStore()
+        for bet_id in range(10):
+            store.add("straightBets", make_straight_bet(bet_id))
+
+        selected = store.select(0, BASE.timestamp() + 86400, lambda kind, get: get("leagueId") == 1980)
+        assert [store.get(index)["betId"] for index in selected] == [0, 5]
+
+    def test_get_projected_fields(self):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(1, somethingNew="x"))
+        store.add("parlayBets", {"betId": 2, "placedAt": "2026-01-01T00:00:00Z", "legs": []})
+
+        assert store.get(0, ["betId", "somethingNew", "team2"]) == {
+            "betId": 1,
+            "somethingNew": "x",
+            "team2": "Team 2",
+        }
+        assert store.get(1, ["betId", "risk"]) == {"betId": 2}
+
+    def test_field(self):
+        store = BetStore()
+        store.add("straightBets", make_straight_bet(1, somethingNew="x"))
+        assert store.field(0, "risk") == 100.0
+        assert store.field(0, "somethingNew") == "x"
+        assert store.field(0, "missing") is None
+
+    def test_to_response_groups_by_kind(self):
+        store = BetStore()
+        store.extend(
+            {
+                "straightBets": [make_straight_bet(1)],
+                "parlayBets": [{"betId": 2, "placedAt": "2026-01-01T00:00:00Z"}],
+            }
+        )
+        grouped = store.to_response(range(len(store)))
+
+        assert [bet["betId"] for bet in grouped["straightBets"]] == [1]
+        assert [bet["betId"] for bet in grouped["parlayBets"]] == [2]
+        assert grouped["manualBets"] == []
+
+    def test_uses_a_fraction_of_the_memory_of_dicts(self):
+        """The compact store should hold several times more bets than plain dicts for the same RAM."""
+        count = 5_000
+
+        tracemalloc.start()
+        bets = [make_straight_bet(bet_id) for bet_id in range(count)]
+        dicts_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        store = BetStore()
+        for bet in bets:
+            store.add("straightBets", bet)
+        store_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        assert len(store) == count
+        assert store_size * 3 < dicts_size
+
+
+class TestParseTimestamp:
+    """Tests for parse_timestamp."""
+
+    def test_zulu_suffix(self):
+        assert parse_timestamp("2026-01-01T00:00:00Z") == BASE.timestamp()
+
+    def test_naive_is_utc(self):
+        assert parse_timestamp("2026-01-01T00:00:00") == BASE.timestamp()
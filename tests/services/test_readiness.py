@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import readiness as readiness_module
+from app.services.leagues import LeaguesCache
+from app.services.readiness import Readiness, get_readiness, warm_up
+from tests.fakes import FakePinnacleClient
+
+
+async def succeed(*args: object) -> None:
+    pass
+
+
+async def fail(*args: object) -> None:
+    raise ConnectionError("unreachable")
+
+
+@pytest.fixture
+def readiness() -> Iterator[Readiness]:
+    state = get_readiness()
+    yield state
+    state.warmed_up = False
+    state.checks.clear()
+
+
+class TestReadiness:
+    """Tests for the readiness state and /ready."""
+
+    def test_status_follows_warm_up_and_checks(self):
+        readiness = Readiness()
+        assert readiness.status == "warming_up"
+
+        readiness.warmed_up = True
+        asyncio.run(readiness.run_check("database", fail))
+        assert readiness.status == "not_ready"
+        assert readiness.checks["database"].error == "ConnectionError('unreachable')"
+
+        asyncio.run(readiness.run_check("database", succeed))
+        asyncio.run(readiness.run_check("upstream", fail))
+        assert readiness.status == "degraded"
+        assert readiness.ready
+
+    def test_warm_up_survives_failing_steps(
+        self, monkeypatch: pytest.MonkeyPatch, fake_pinnacle: FakePinnacleClient
+    ):
+        monkeypatch.setattr(readiness_module, "warm_database_pool", fail)
+        monkeypatch.setattr(readiness_module, "warm_api_key_cache", fail)
+        monkeypatch.setattr(readiness_module, "warm_recent_bets", succeed)
+        monkeypatch.setattr(readiness_module, "check_database", succeed)
+        monkeypatch.setattr(readiness_module, "get_leagues_cache", lambda: leagues)
+        leagues = LeaguesCache(timedelta(hours=1))
+        fake_pinnacle.errors["get_client_balance"] = ConnectionError("upstream down")
+        readiness = Readiness()
+
+        asyncio.run(warm_up(readiness, lambda: fake_pinnacle))  # pyright: ignore[reportArgumentType]
+
+        assert readiness.status == "degraded"
+        assert fake_pinnacle.calls["get_leagues"] == 1
+
+    def test_ready_endpoint(self, readiness: Readiness):
+        client = TestClient(app)
+        assert client.get("/ready").status_code == 503
+
+        readiness.warmed_up = True
+        asyncio.run(readiness.run_check("database", succeed))
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert response.json()["checks"]["database"]["ok"] is True
+
+
+class TestLeaguesCache:
+    """Tests for the league list cache."""
+
+    def test_leagues_are_fetched_once_per_ttl(self, fake_pinnacle: FakePinnacleClient):
+        cache = LeaguesCache(timedelta(hours=1))
+        client: Any = fake_pinnacle
+
+        assert cache.get(client) == cache.get(client)
+        assert fake_pinnacle.calls["get_leagues"] == 1
+
+        expired = LeaguesCache(timedelta(0))
+        expired.get(client)
+        expired.get(client)
+        assert fake_pinnacle.calls["get_leagues"] == 3
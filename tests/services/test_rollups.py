@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.services.rollups import BetsSummary, Totals, aggregate_bets, rollup_key, split_range
+
+DAY = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+class TestAggregateBets:
+    """Tests for aggregate_bets."""
+
+    def test_groups_by_day_sport_league_and_type(self):
+        rollups = aggregate_bets(
+            {
+                "straightBets": [
+                    {
+                        "betId": 1,
+                        "settledAt": "2026-03-01T10:00:00Z",
+                        "sportId": 29,
+                        "leagueId": 1,
+                        "betType": "MONEYLINE",
+                        "risk": 100.0,
+                        "winLoss": 95.0,
+                        "betStatus": "WON",
+                    },
+                    {
+                        "betId": 2,
+                        "settledAt": "2026-03-01T23:59:59Z",
+                        "sportId": 29,
+                        "leagueId": 1,
+                        "betType": "MONEYLINE",
+                        "risk": 50.0,
+                        "winLoss": -50.0,
+                        "betStatus": "LOSE",
+                    },
+                    {
+                        "betId": 3,
+                        "settledAt": "2026-03-02T00:00:00Z",
+                        "sportId": 29,
+                        "leagueId": 1,
+                        "betType": "MONEYLINE",
+                        "risk": 10.0,
+                        "winLoss": 10.0,
+                        "betStatus": "WON",
+                    },
+                ],
+                "parlayBets": [
+                    {"betId": 4, "settledAt": "2026-03-01T12:00:00Z", "risk": 20.0, "winLoss": 0.0}
+                ],
+            }
+        )
+
+        assert rollups == {
+            (date(2026, 3, 1), 29, 1, "MONEYLINE"): Totals(2, 150.0, 45.0, 0.95 - 1.0),
+            (date(2026, 3, 2), 29, 1, "MONEYLINE"): Totals(1, 10.0, 10.0, 1.0),
+            (date(2026, 3, 1), 0, 0, "PARLAY"): Totals(1, 20.0, 0.0, 0.0),
+        }
+
+    def test_not_accepted_and_undated_bets_are_skipped(self):
+        assert (
+            rollup_key("straightBets", {"betId": 1, "betStatus": "NOT_ACCEPTED", "placedAt": "2026-03-01"})
+            is None
+        )
+        assert rollup_key("straightBets", {"betId": 1, "betStatus": "WON"}) is None
+
+    def test_missing_risk_counts_as_one_stake(self):
+        rollups = aggregate_bets(
+            {"manualBets": [{"betId": 1, "placedAt": "2026-03-01T00:00:00Z", "winLoss": 2.0}]}
+        )
+        assert rollups[(date(2026, 3, 1), 0, 0, "MANUAL")].profit_stakes == 2.0
+
+
+class TestSplitRange:
+    """Tests for split_range."""
+
+    def test_nothing_rolled_up(self):
+        assert split_range(DAY, DAY + timedelta(days=10), None) == (None, [(DAY, DAY + timedelta(days=10))])
+
+    def test_whole_days_from_rollups_and_edges_raw(self):
+        from_date = DAY + timedelta(hours=6)
+        to_date = DAY + timedelta(days=5, hours=3)
+
+        rollup_days, raw_ranges = split_range(from_date, to_date, DAY + timedelta(days=30))
+
+        assert rollup_days == (date(2026, 3, 2), date(2026, 3, 6))
+        assert raw_ranges == [(from_date, DAY + timedelta(days=1)), (DAY + timedelta(days=5), to_date)]
+
+    def test_days_after_watermark_are_raw(self):
+        rollup_days, raw_ranges = split_range(DAY, DAY + timedelta(days=10), DAY + timedelta(days=7))
+
+        assert rollup_days == (date(2026, 3, 1), date(2026, 3, 8))
+        assert raw_ranges == [(DAY + timedelta(days=7), DAY + timedelta(days=10))]
+
+    @pytest.mark.parametrize("hours", [1, 23])
+    def test_range_within_one_day_is_raw(self, hours: int):
+        to_date = DAY + timedelta(hours=hours)
+        assert split_range(DAY, to_date, DAY + timedelta(days=30)) == (None, [(DAY, to_date)])
+
+
+class TestBetsSummary:
+    """Tests for BetsSummary."""
+
+    def test_rollups_and_raw_tail_merge_into_one_group(self):
+        summary = BetsSummary()
+        summary.add((29,), Totals(10, 1000.0, 50.0, 0.5))
+        summary.add((29,), Totals(1, 100.0, -100.0, -1.0))
+        summary.add((4,), Totals(2, 20.0, 20.0, 2.0))
+
+        assert summary.groups[(29,)] == Totals(11, 1100.0, -50.0, -0.5)
+        assert summary.total == Totals(13, 1120.0, -30.0, 1.5)
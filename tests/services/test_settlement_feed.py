@@ -0,0 +1,128 @@
+import asyncio
+from datetime import timedelta
+from typing import cast
+
+from ps3838api.api import PinnacleClient
+
+from app.services.settlement_feed import FeedEvent, SettlementFeed, Subscription
+from tests.fakes import FakePinnacleClient
+
+
+def make_feed(
+    client: FakePinnacleClient, buffer_size: int = 10, poll_interval: timedelta = timedelta(milliseconds=10)
+) -> SettlementFeed:
+    return SettlementFeed(
+        client_factory=lambda: cast(PinnacleClient, client),
+        poll_interval=poll_interval,
+        lookback=timedelta(hours=1),
+        buffer_size=buffer_size,
+    )
+
+
+class TestPoll:
+    """Tests for SettlementFeed.poll."""
+
+    def test_first_poll_only_primes(self):
+        client = FakePinnacleClient()
+        client.bets = [{"betId": 1, "updateSequence": 1, "betStatus": "WON"}]
+        feed = make_feed(client)
+
+        assert feed.poll() == []
+
+    def test_new_and_updated_bets_are_emitted_once(self):
+        client = FakePinnacleClient()
+        client.bets = [{"betId": 1, "updateSequence": 1, "betStatus": "WON"}]
+        feed = make_feed(client)
+        feed.poll()
+
+        client.bets.append({"betId": 2, "updateSequence": 1, "betStatus": "LOSE"})
+        events = feed.poll()
+        assert [event.data["bet"]["betId"] for event in events] == [2]
+        assert feed.poll() == []
+
+        client.bets[0]["updateSequence"] = 2
+        events = feed.poll()
+        assert [event.data["bet"]["betId"] for event in events] == [1]
+
+    def test_not_accepted_bets_are_skipped(self):
+        client = FakePinnacleClient()
+        feed = make_feed(client)
+        feed.poll()
+
+        client.bets = [{"betId": 3, "betStatus": "NOT_ACCEPTED"}, {"uniqueRequestId": "x"}]
+        assert feed.poll() == []
+
+    def test_balance_change_is_emitted(self):
+        client = FakePinnacleClient()
+        feed = make_feed(client)
+        feed.poll()
+
+        client.balance["availableBalance"] = 50.0
+        events = feed.poll()
+        assert [event.event for event in events] == ["balance"]
+        assert events[0].data["availableBalance"] == 50.0
+
+
+class TestSubscription:
+    """Tests for Subscription."""
+
+    def test_drops_oldest_and_reports_lag(self):
+        async def scenario() -> list[FeedEvent]:
+            subscription = Subscription(buffer_size=2)
+            for bet_id in range(4):
+                subscription.publish(FeedEvent("bet", bet_id))
+            return [await subscription.get() for _ in range(3)]
+
+        events = asyncio.run(scenario())
+        assert events == [
+            FeedEvent("lagged", {"dropped": 2}),
+            FeedEvent("bet", 2),
+            FeedEvent("bet", 3),
+        ]
+
+    def test_encode(self):
+        assert FeedEvent("balance", {"a": 1}).encode() == b'event: balance\ndata: {"a":1}\n\n'
+
+
+class TestSubscribe:
+    """Tests for SettlementFeed.subscribe."""
+
+    def test_one_poller_fans_out_to_all_subscribers(self):
+        client = FakePinnacleClient()
+        feed = make_feed(client)
+
+        async def scenario() -> tuple[FeedEvent, FeedEvent]:
+            async with feed.subscribe() as first, feed.subscribe() as second:
+                await asyncio.sleep(0.05)
+                client.bets = [{"betId": 9, "updateSequence": 1, "betStatus": "WON"}]
+                received = await asyncio.wait_for(asyncio.gather(first.get(), second.get()), timeout=2)
+            return received[0], received[1]
+
+        first_event, second_event = asyncio.run(scenario())
+        assert first_event == second_event
+        assert first_event.data["bet"]["betId"] == 9
+
+    def test_subscribers_share_a_single_poll(self):
+        client = FakePinnacleClient()
+        feed = make_feed(client, poll_interval=timedelta(seconds=10))
+
+        async def scenario() -> None:
+            async with feed.subscribe(), feed.subscribe(), feed.subscribe():
+                await asyncio.sleep(0.05)
+                assert client.calls["get_bets"] == 1
+
+        asyncio.run(scenario())
+
+    def test_poller_stops_without_subscribers(self):
+        client = FakePinnacleClient()
+        feed = make_feed(client)
+
+        async def scenario() -> None:
+            async with feed.subscribe():
+                await asyncio.sleep(0.03)
+            calls = client.calls["get_bets"]
+            await asyncio.sleep(0.05)
+            assert client.calls["get_bets"] == calls
+            assert feed.subscriber_count == 0
+
+        asyncio.run(scenario())
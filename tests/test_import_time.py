@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+IMPORT_BUDGET_SECONDS = 0.75
+"""Time importing the application may take on top of the frameworks it is built on."""
+
+PROBE_RUNS = 5
+"""Fresh interpreters the import is timed in; the fastest one counts, so a busy machine does not fail it."""
+
+PROBE = """
+import json, sys, time
+import fastapi, pydantic, sqlalchemy.ext.asyncio, sqlalchemy.orm
+start = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - start
+from app.core.config import get_settings
+print(json.dumps({
+    "seconds": seconds,
+    "modules": sorted(sys.modules),
+    "settings_parsed": get_settings.cache_info().currsize > 0,
+}))
+"""
+
+
+@pytest.fixture(scope="module")
+def probe() -> dict[str, Any]:
+    """Import the application in fresh interpreters, without any configuration in the environment."""
+    env = {
+        name: value for name, value in os.environ.items() if name not in {"DATABASE_URL", "API_GAINED_ACCESS"}
+    }
+    runs: list[dict[str, Any]] = []
+    for _ in range(PROBE_RUNS):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(result.stdout.splitlines()[-1]))
+    return {**runs[0], "seconds": min(run["seconds"] for run in runs)}
+
+
+class TestImportTime:
+    """Guards for the cost of importing the application."""
+
+    def test_settings_are_parsed_on_first_use(self, probe: dict[str, Any]):
+        assert not probe["settings_parsed"]
+
+    @pytest.mark.parametrize("module", ["alembic", "psycopg2", "asyncpg"])
+    def test_heavy_modules_are_not_imported(self, probe: dict[str, Any], module: str):
+        assert module not in probe["modules"]
+
+    def test_import_budget(self, probe: dict[str, Any]):
+        assert probe["seconds"] < IMPORT_BUDGET_SECONDS
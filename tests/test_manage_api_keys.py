@@ -0,0 +1,82 @@
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+
+import manage_api_keys
+from app.db.database import Base
+from app.db.models import APIKey
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def active_keys(db: Session) -> list[str]:
+    return list(db.scalars(select(APIKey.key).where(APIKey.is_active.is_(True)).order_by(APIKey.id)))
+
+
+class TestBulkKeys:
+    """Tests for the bulk API key commands."""
+
+    def test_read_keys_skips_blanks_and_repeats(self):
+        assert manage_api_keys.read_keys(["a\n", "\n", "  b  \n", "a\n"]) == ["a", "b"]
+
+    def test_read_keys_rejects_overlong_keys(self):
+        with pytest.raises(SystemExit):
+            manage_api_keys.read_keys(["x" * 256])
+
+    def test_import_skips_existing_keys(self, db: Session):
+        manage_api_keys.import_keys(db, ["a", "b"])
+        assert manage_api_keys.import_keys(db, ["b", "c", "d"]) == 2
+        assert active_keys(db) == ["a", "b", "c", "d"]
+
+    def test_generate(self, db: Session):
+        keys = manage_api_keys.generate_keys(db, 3)
+        assert len(set(keys)) == 3
+        assert active_keys(db) == keys
+
+    def test_deactivate_by_pattern_and_age(self, db: Session):
+        manage_api_keys.import_keys(db, ["acme-1", "acme-2", "other-1"])
+        db.execute(
+            update(APIKey)
+            .where(APIKey.key.in_(["acme-1", "other-1"]))
+            .values(created_at=datetime.now(timezone.utc) - timedelta(days=100))
+        )
+        db.commit()
+
+        assert manage_api_keys.deactivate_keys(db, pattern="acme-%", dry_run=True) == 2
+        assert len(active_keys(db)) == 3
+        assert manage_api_keys.deactivate_keys(db, pattern="acme-%", older_than=timedelta(days=90)) == 1
+        assert active_keys(db) == ["acme-2", "other-1"]
+        assert manage_api_keys.deactivate_keys(db, older_than=timedelta(days=90)) == 1
+        assert active_keys(db) == ["acme-2"]
+
+    def test_list_formats(self, db: Session):
+        manage_api_keys.import_keys(db, ["a", "b"])
+
+        output = io.StringIO()
+        manage_api_keys.list_keys(db, "json", output)
+        assert [(key["key"], key["is_active"]) for key in json.loads(output.getvalue())] == [
+            ("a", True),
+            ("b", True),
+        ]
+
+        output = io.StringIO()
+        manage_api_keys.list_keys(db, "csv", output)
+        lines = output.getvalue().splitlines()
+        assert lines[0] == "id,key,is_active,created_at"
+        assert lines[1].startswith("1,a,True,")
+
+    def test_empty_json_list(self, db: Session):
+        output = io.StringIO()
+        manage_api_keys.list_keys(db, "json", output)
+        assert json.loads(output.getvalue()) == []